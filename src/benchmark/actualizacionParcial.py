@@ -0,0 +1,71 @@
+"""
+Compara actualizar_libro escribiendo la fila completa (libro armado desde cero, como
+antes) con la actualización de solo los campos modificados (libro leído con LibroDao),
+cuando solo cambia el precio: bytes enviados por sentencia y latencia. También mide
+el caso sin cambios, que no llega a la base de datos.
+
+Uso:
+    python -m src.benchmark.actualizacionParcial [libros] [actualizaciones]
+"""
+
+import os
+import random
+import sys
+import tempfile
+
+from src.benchmark import medicion
+from src.benchmark.catalogoSintetico import preparar_sqlite
+from src.datos.libroDao import LibroDao
+from src.dominio.libro import Libro
+
+
+def _bytes(sql: str, datos: tuple) -> int:
+    """Bytes aproximados de una sentencia: su texto más los parámetros (8 por número)."""
+    return len(sql.encode('utf-8')) + sum(len(valor.encode('utf-8')) if isinstance(valor, str) else 8
+                                          for valor in datos)
+
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    cantidad = int(argumentos[0]) if argumentos else 100_000
+    actualizaciones = int(argumentos[1]) if len(argumentos) > 1 else 5_000
+    preparar_sqlite(os.path.join(tempfile.gettempdir(), f'libros_{cantidad}.db'), cantidad)
+    LibroDao.usar_cache(None)
+    azar = random.Random(13)
+    codigos = [f'{azar.randint(1, cantidad):010d}' for _ in range(actualizaciones)]
+    leidos, _ = LibroDao.seleccionar_libros(codigos)
+
+    # Fila completa: libros sin seguimiento de cambios, como los arma un formulario
+    completos = []
+    for codigo in codigos:
+        libro = leidos[codigo]
+        completos.append(Libro(codigo=libro.codigo, nombre=libro.nombre, precio=round(azar.uniform(5, 80), 2),
+                               cantidad=libro.cantidad, autor=libro.autor, edicion=libro.edicion,
+                               Isbn=libro.Isbn))
+    # Parcial: los libros leídos con LibroDao (ya marcados como limpios), con otro precio
+    parciales = []
+    for codigo in dict.fromkeys(codigos):
+        libro = leidos[codigo]
+        libro.precio = round(azar.uniform(5, 80), 2)
+        parciales.append(libro)
+
+    ejemplo = completos[0]
+    bytes_completo = _bytes(LibroDao._UPDATE, (ejemplo.nombre, float(ejemplo.precio), int(ejemplo.cantidad),
+                                               ejemplo.autor, ejemplo.edicion, ejemplo.Isbn, ejemplo.codigo))
+    sql_parcial, _ = LibroDao._update_parcial(frozenset({'precio'}))
+    bytes_parcial = _bytes(sql_parcial, (float(ejemplo.precio), ejemplo.codigo))
+
+    latencias_completo = medicion.latencias(LibroDao.actualizar_libro, completos)
+    latencias_parcial = medicion.latencias(LibroDao.actualizar_libro, parciales)
+    latencias_sin_cambios = medicion.latencias(LibroDao.actualizar_libro, parciales)  # Ya grabados: no hay nada que enviar
+
+    print(f"{actualizaciones} cambios de precio sobre {cantidad} libros")
+    print(f"{'modo':<16} {'bytes/sentencia':>16} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for nombre, bytes_, latencias in (('fila completa', bytes_completo, latencias_completo),
+                                      ('solo el precio', bytes_parcial, latencias_parcial),
+                                      ('sin cambios', 0, latencias_sin_cambios)):
+        print(f"{nombre:<16} {bytes_:>16} {medicion.percentil(latencias, 0.5):>9.4f} {medicion.percentil(latencias, 0.99):>9.4f}")
+
+
+if __name__ == '__main__':
+    main()
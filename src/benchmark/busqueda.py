@@ -0,0 +1,60 @@
+"""
+Mide la latencia de LibroDao.buscar_libros a distintas profundidades de página y la
+compara con la paginación por OFFSET. Con la paginación por llave la página 1000 debe
+costar lo mismo que la primera; con OFFSET el costo crece con la profundidad.
+
+Uso:
+    python -m src.benchmark.busqueda [cantidad_de_libros] [ruta_sqlite]
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+
+from src.benchmark import medicion
+from src.benchmark.catalogoSintetico import preparar_sqlite
+from src.datos.libroDao import LibroDao
+
+_PAGINA = 50
+_PROFUNDIDADES = (1, 10, 100, 1000, 5000)
+
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    cantidad = int(argumentos[0]) if argumentos else 300_000
+    ruta = argumentos[1] if len(argumentos) > 1 else os.path.join(tempfile.gettempdir(), f'libros_{cantidad}.db')
+
+    print(f"Preparando {cantidad} libros en {ruta}...")
+    preparar_sqlite(ruta, cantidad)
+    LibroDao.crear_indices_busqueda()
+
+    # Recorre las páginas con el marcador y guarda el de cada profundidad a medir
+    marcadores = {1: None}
+    despues, pagina = None, 1
+    while pagina < max(_PROFUNDIDADES):
+        _, despues = LibroDao.buscar_libros('', limite=_PAGINA, despues=despues)
+        if despues is None:
+            break
+        pagina += 1
+        marcadores[pagina] = despues
+
+    directa = sqlite3.connect(ruta)
+    print(f"{'página':>8} {'keyset (ms)':>12} {'offset (ms)':>12}")
+    for profundidad in _PROFUNDIDADES:
+        if profundidad not in marcadores:
+            break
+        keyset = medicion.mediana(lambda: LibroDao.buscar_libros('', limite=_PAGINA, despues=marcadores[profundidad]))
+        offset = medicion.mediana(lambda: directa.execute(
+            'select Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn from Libro '
+            'order by Nombre, Codigo limit ? offset ?', (_PAGINA, (profundidad - 1) * _PAGINA)).fetchall())
+        print(f"{profundidad:>8} {keyset:>12.3f} {offset:>12.3f}")
+    directa.close()
+
+    prefijo = medicion.mediana(lambda: LibroDao.buscar_libros('García', campo='autor', limite=_PAGINA))
+    contiene = medicion.mediana(lambda: LibroDao.buscar_libros('soledad', modo='contiene', limite=_PAGINA))
+    print(f"Prefijo de autor 'García': {prefijo:.3f} ms; nombre que contiene 'soledad': {contiene:.3f} ms")
+
+
+if __name__ == '__main__':
+    main()
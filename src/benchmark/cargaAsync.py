@@ -0,0 +1,102 @@
+"""
+Prueba de carga de AsyncLibroDao: lanza muchas búsquedas por código con distintos
+niveles de concurrencia y reporta solicitudes por segundo. Usa SQLite local; con
+--latencia cada consulta espera además unos milisegundos, imitando la ida y vuelta de
+red a un servidor, que es donde la concurrencia rinde.
+
+Uso:
+    python -m src.benchmark.cargaAsync [--libros N] [--solicitudes N] [--latencia ms]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+from src.benchmark.catalogoSintetico import preparar_sqlite
+from src.datos.asyncLibroDao import AsyncLibroDao
+from src.datos.backends import BackendSqlite
+from src.datos.conexiones import Conexiones
+
+
+class _CursorConLatencia:
+    """Cursor de sqlite3 que espera `latencia` segundos antes de cada consulta."""
+
+    def __init__(self, cursor, latencia):
+        self._cursor = cursor
+        self._latencia = latencia
+
+    def execute(self, *args):
+        time.sleep(self._latencia)
+        self._cursor.execute(*args)
+        return self
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+
+class _ConexionConLatencia:
+    """Conexión de sqlite3 cuyos cursores simulan la latencia de red."""
+
+    def __init__(self, conexion, latencia):
+        self._conexion = conexion
+        self._latencia = latencia
+
+    def cursor(self):
+        return _CursorConLatencia(self._conexion.cursor(), self._latencia)
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
+
+
+class _BackendConLatencia(BackendSqlite):
+    """BackendSqlite cuyas conexiones simulan la latencia de red."""
+
+    def __init__(self, ruta, latencia):
+        super().__init__(ruta)
+        self.latencia = latencia
+
+    def conectar(self):
+        return _ConexionConLatencia(super().conectar(), self.latencia)
+
+
+async def _carga(codigos, concurrencia: int) -> float:
+    """Ejecuta todas las búsquedas con `concurrencia` tareas y retorna solicitudes/segundo."""
+    cola = iter(codigos)
+
+    async def trabajador():
+        for codigo in cola:
+            await AsyncLibroDao.seleccionar_libro(codigo)
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    return len(codigos) / (time.perf_counter() - inicio)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Prueba de carga de AsyncLibroDao.")
+    parser.add_argument('--libros', type=int, default=50_000)
+    parser.add_argument('--solicitudes', type=int, default=2_000)
+    parser.add_argument('--latencia', type=float, default=2.0, help="Milisegundos simulados por consulta")
+    parser.add_argument('--concurrencias', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    args = parser.parse_args(argumentos)
+
+    ruta = os.path.join(tempfile.gettempdir(), f'libros_{args.libros}.db')
+    preparar_sqlite(ruta, args.libros)
+    latencia = args.latencia / 1000
+    maximo = max(args.concurrencias)
+    Conexiones.configurar(backend=_BackendConLatencia(ruta, latencia), maximo=maximo)
+    AsyncLibroDao.configurar(max_hilos=maximo)
+
+    azar = random.Random(7)
+    codigos = [f'{azar.randint(1, args.libros):010d}' for _ in range(args.solicitudes)]
+    print(f"{'concurrencia':>12} {'solicitudes/s':>14}")
+    for concurrencia in args.concurrencias:
+        print(f"{concurrencia:>12} {asyncio.run(_carga(codigos, concurrencia)):>14,.0f}")
+    AsyncLibroDao.cerrar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Catálogo sintético para pruebas de rendimiento: genera libros reproducibles (misma
+semilla, mismos datos) y prepara una base SQLite local con ellos, para medir sin
+depender del servidor SQL Server.
+"""
+
+import random
+
+from src.datos.backends import BackendSqlite
+from src.datos.conexiones import Conexiones
+from src.datos.libroDao import LibroDao
+from src.dominio.libro import Libro
+
+_PALABRAS = ('amor', 'tiempo', 'cien', 'años', 'soledad', 'ciudad', 'perros', 'casa',
+             'espíritus', 'noche', 'mar', 'viejo', 'historia', 'sombra', 'viento', 'río',
+             'guerra', 'paz', 'jardín', 'memoria', 'laberinto', 'ficciones', 'rayuela', 'sol',
+             'otoño', 'patriarca', 'crónica', 'muerte', 'anunciada', 'cólera', 'túnel', 'aleph',
+             'pedro', 'páramo', 'región', 'transparente', 'tregua', 'detectives', 'salvajes',
+             'astillero', 'huasipungo', 'espejo', 'tinta', 'montaña', 'llanto', 'cantos', 'puerto',
+             'camino', 'silencio', 'fuego', 'agua', 'piedra', 'luna', 'selva', 'desierto', 'isla',
+             'invierno', 'verano', 'libro', 'arena', 'sueño', 'ceniza', 'raíz', 'ciego', 'reino')
+_AUTORES = ('García Márquez, Gabriel', 'Vargas Llosa, Mario', 'Borges, Jorge Luis',
+            'Cortázar, Julio', 'Allende, Isabel', 'Neruda, Pablo', 'Mistral, Gabriela',
+            'Paz, Octavio', 'Rulfo, Juan', 'Fuentes, Carlos', 'Benedetti, Mario',
+            'Bolaño, Roberto', 'Sabato, Ernesto', 'Onetti, Juan Carlos', 'Adoum, Jorge Enrique')
+_EDICIONES = ('Primera', 'Segunda', 'Tercera', 'Bolsillo', 'Conmemorativa')
+
+
+def generar_filas(cantidad: int, semilla: int = 42):
+    """
+    Genera filas (codigo, nombre, precio, cantidad, autor, edicion, Isbn) sin guardarlas
+    en memoria. Los códigos son consecutivos de 10 dígitos a partir de 0000000001 y los
+    ISBN-13 tienen su dígito de control correcto.
+    """
+    azar = random.Random(semilla)
+    for numero in range(1, cantidad + 1):
+        nombre = ' '.join(azar.choice(_PALABRAS) for _ in range(azar.randint(2, 4))).capitalize()
+        isbn = f'978{azar.randrange(10**9):09d}'
+        control = -(sum(map(int, isbn[0::2])) + 3 * sum(map(int, isbn[1::2]))) % 10
+        yield (f'{numero:010d}', nombre, round(azar.uniform(5, 80), 2), azar.randint(0, 200),
+               azar.choice(_AUTORES), azar.choice(_EDICIONES), f'{isbn}{control}')
+
+
+def generar_libros(cantidad: int, semilla: int = 42):
+    """Igual que generar_filas, pero entrega objetos Libro."""
+    for fila in generar_filas(cantidad, semilla):
+        yield LibroDao._libro_desde_fila(fila)
+
+
+def preparar_sqlite(ruta: str, cantidad: int, semilla: int = 42, maximo_pool: int = 4) -> None:
+    """
+    Crea (o reutiliza) una base SQLite en `ruta` con `cantidad` libros sintéticos y
+    configura Conexiones con BackendSqlite para que LibroDao trabaje sobre ella.
+    """
+    Conexiones.configurar(backend=BackendSqlite(ruta), maximo=maximo_pool)
+    with Conexiones.obtenerConexion() as conexion:
+        existentes = conexion.execute('select count(*) from Libro').fetchone()[0]
+        if existentes != cantidad:
+            conexion.execute('delete from Libro')
+            conexion.executemany('insert into Libro (Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn) '
+                                 'values (?, ?, ?, ?, ?, ?, ?)',
+                                 generar_filas(cantidad, semilla))
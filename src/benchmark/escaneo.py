@@ -0,0 +1,113 @@
+"""
+Simula un lector de códigos de barras sobre el modo escáner (ColaEscaneos) y mide el
+tiempo desde cada lectura hasta que el libro se muestra:
+
+    en serie       una búsqueda a la vez (un solo hilo de trabajo): cada lectura espera
+                   a que terminen las anteriores.
+    en paralelo    hasta --hilos búsquedas a la vez, mostradas en el orden de lectura.
+    con caché      además, las lecturas repetidas se responden desde la caché de
+                   lectura de LibroDao, sin lanzar la búsqueda.
+
+Las lecturas llegan a ritmo constante (--ritmo por segundo) y una parte repite un
+código leído hace poco (el mismo libro varias veces). Con --latencia cada consulta
+espera además unos milisegundos, imitando un servidor remoto. Los dos primeros casos
+se miden sin la caché de LibroDao.
+
+Uso:
+    python -m src.benchmark.escaneo [--ritmo 10] [--lecturas 200] [--latencia ms]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from src.benchmark.cargaAsync import _BackendConLatencia
+from src.benchmark.catalogoSintetico import preparar_sqlite
+from src.datos.cacheLibros import CacheTTL
+from src.datos.conexiones import Conexiones
+from src.datos.libroDao import LibroDao
+from src.servicio.escaneo import ColaEscaneos, HistogramaLatencia
+
+
+def _lecturas(cantidad, libros, repetidos, semilla=5):
+    azar = random.Random(semilla)
+    codigos = []
+    for _ in range(cantidad):
+        if codigos and azar.random() < repetidos:
+            codigos.append(azar.choice(codigos[-5:]))
+        else:
+            codigos.append(f'{azar.randint(1, libros):010d}')
+    return codigos
+
+
+def _simular(codigos, ritmo, hilos, cache) -> tuple:
+    """Retorna (histograma, lecturas fuera de orden)."""
+    ejecutor = ThreadPoolExecutor(max_workers=hilos)
+    mostrados = []
+    terminado = threading.Event()
+
+    def lanzar(codigo, al_terminar, al_fallar):
+        def buscar():
+            try:
+                al_terminar(LibroDao.seleccionar_libro(codigo))
+            except Exception as e:
+                al_fallar(str(e))
+        ejecutor.submit(buscar)
+
+    def mostrar(codigo, libro, error, milisegundos):
+        mostrados.append(codigo)
+        if len(mostrados) == len(codigos):
+            terminado.set()
+
+    histograma = HistogramaLatencia()
+    LibroDao.usar_cache(CacheTTL(500, ttl=10, ttl_ausentes=2) if cache else None)
+    cola = ColaEscaneos(lanzar, mostrar, histograma=histograma)
+    inicio = time.perf_counter()
+    for numero, codigo in enumerate(codigos):
+        # Ritmo constante del lector, sin acumular el retraso de cada espera
+        time.sleep(max(0.0, inicio + numero / ritmo - time.perf_counter()))
+        cola.escanear(codigo)
+    terminado.wait(60)
+    ejecutor.shutdown()
+    LibroDao.usar_cache(None)
+    return histograma, sum(1 for esperado, visto in zip(codigos, mostrados) if esperado != visto)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Latencia del modo escáner.")
+    parser.add_argument('--libros', type=int, default=100_000)
+    parser.add_argument('--lecturas', type=int, default=200)
+    parser.add_argument('--ritmo', type=float, default=10.0, help="Lecturas por segundo")
+    parser.add_argument('--repetidos', type=float, default=0.3, help="Fracción de lecturas repetidas")
+    parser.add_argument('--latencia', type=float, default=0.0, help="ms por consulta")
+    parser.add_argument('--hilos', type=int, default=4)
+    parser.add_argument('--histograma', action='store_true', help="Muestra el histograma de cada caso")
+    args = parser.parse_args(argumentos)
+    ruta = os.path.join(tempfile.gettempdir(), f'libros_{args.libros}.db')
+    preparar_sqlite(ruta, args.libros)
+    if args.latencia:
+        Conexiones.configurar(backend=_BackendConLatencia(ruta, args.latencia / 1000), maximo=args.hilos)
+    codigos = _lecturas(args.lecturas, args.libros, args.repetidos)
+
+    print(f"{args.lecturas} lecturas a {args.ritmo:g}/s, {args.latencia:g} ms por consulta")
+    print(f"{'modo':<14} {'p50 ms':>8} {'p99 ms':>8} {'máx ms':>8} {'<= 50 ms':>9} {'desorden':>9}")
+    correcto = True
+    for nombre, hilos, cache in (('en serie', 1, False), ('en paralelo', args.hilos, False),
+                                 ('con caché', args.hilos, True)):
+        histograma, desorden = _simular(codigos, args.ritmo, hilos, cache)
+        print(f"{nombre:<14} {histograma.percentil(0.5):>8.2f} {histograma.percentil(0.99):>8.2f} "
+              f"{histograma.percentil(1.0):>8.2f} {histograma.fraccion_bajo(50):>9.1%} {desorden:>9}")
+        if args.histograma:
+            print(histograma.texto())
+        correcto = correcto and desorden == 0
+    Conexiones.cerrar()
+    return 0 if correcto else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Mide el feed de cambios de LibroDao (FeedCambios):
+
+    publicación   latencia de actualizar_libro sin feed, con feed en memoria, con archivo
+                  y con archivo sincronizado a disco (fsync por evento).
+    retraso       un hilo escribe mientras un consumidor sigue el feed por lotes; se mide
+                  cuánto tarda cada evento en llegar al consumidor.
+    sondeo        lo que cuesta cada consulta completa de la tabla que hace hoy quien
+                  sondea, frente a leer un lote del feed.
+
+Uso:
+    python -m src.benchmark.feedCambios [libros] [operaciones]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from src.benchmark import medicion
+from src.benchmark.catalogoSintetico import preparar_sqlite
+from src.datos.conexiones import Conexiones
+from src.datos.feedCambios import FeedCambios
+from src.datos.libroDao import LibroDao
+
+
+def _libros(cantidad, operaciones, semilla=1):
+    azar = random.Random(semilla)
+    libros, _ = LibroDao.seleccionar_libros(f'{azar.randint(1, cantidad):010d}' for _ in range(operaciones))
+    return list(libros.values())
+
+
+def _actualizar(libros) -> list:
+    """Cambia la cantidad de cada libro con actualizar_libro y retorna las latencias en ms."""
+    latencias = []
+    for libro in libros:
+        libro.cantidad = int(libro.cantidad) + 1
+        inicio = time.perf_counter()
+        LibroDao.actualizar_libro(libro)
+        latencias.append((time.perf_counter() - inicio) * 1000)
+    return latencias
+
+
+def _publicacion(cantidad, operaciones, directorio):
+    print(f"{'publicación':<22} {'p50 ms':>8} {'p99 ms':>8}")
+    libros = _libros(cantidad, operaciones)
+    for nombre, crear in (('sin feed', None),
+                          ('feed en memoria', lambda: FeedCambios()),
+                          ('feed con archivo', lambda: FeedCambios(os.path.join(directorio, 'feed_a.jsonl'))),
+                          ('archivo con fsync', lambda: FeedCambios(os.path.join(directorio, 'feed_b.jsonl'),
+                                                                    sincronizar=True))):
+        feed = crear() if crear else None
+        if feed is not None:
+            feed.conectar()
+        try:
+            latencias = _actualizar(libros)
+        finally:
+            if feed is not None:
+                feed.desconectar()
+        print(f"{nombre:<22} {medicion.percentil(latencias, 0.5):>8.3f} {medicion.percentil(latencias, 0.99):>8.3f}")
+
+
+def _retraso(cantidad, operaciones, directorio, tamano_lote, max_pendientes, costo_evento):
+    """Retorna (retraso p50 ms, retraso p99 ms, eventos por segundo del consumidor)."""
+    feed = FeedCambios(os.path.join(directorio, 'feed_retraso.jsonl'), max_pendientes=max_pendientes)
+    feed.conectar()
+    suscripcion = feed.suscribir()
+    libros = _libros(cantidad, operaciones, semilla=2)
+    retrasos = []
+    detener = threading.Event()
+
+    def procesar(lote):
+        time.sleep(costo_evento * len(lote))  # Trabajo del consumidor (ej. actualizar la tienda)
+        ahora = time.time()
+        retrasos.extend((ahora - evento.momento) * 1000 for evento in lote)
+        if len(retrasos) >= len(libros):
+            detener.set()
+
+    consumidor = threading.Thread(target=suscripcion.consumir, args=(procesar, tamano_lote, 0.1, detener))
+    consumidor.start()
+    inicio = time.perf_counter()
+    _actualizar(libros)
+    consumidor.join()
+    segundos = time.perf_counter() - inicio
+    suscripcion.cerrar()
+    feed.desconectar()
+    return medicion.percentil(retrasos, 0.5), medicion.percentil(retrasos, 0.99), len(retrasos) / segundos
+
+
+def _sondeo(directorio):
+    feed = FeedCambios(os.path.join(directorio, 'feed_retraso.jsonl'))
+    inicio = time.perf_counter()
+    filas = sum(1 for _ in LibroDao.recorrer_libros())
+    consulta = (time.perf_counter() - inicio) * 1000
+    inicio = time.perf_counter()
+    lote = feed.leer(max(0, feed.siguiente - 500), 500)
+    lectura = (time.perf_counter() - inicio) * 1000
+    print(f"sondeo: consulta completa de {filas:,} libros {consulta:.1f} ms; "
+          f"lote de {len(lote)} eventos del feed {lectura:.3f} ms")
+
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    cantidad = int(argumentos[0]) if argumentos else 100_000
+    operaciones = int(argumentos[1]) if len(argumentos) > 1 else 5_000
+    directorio = tempfile.mkdtemp(prefix='feed_')
+    preparar_sqlite(os.path.join(tempfile.gettempdir(), f'libros_{cantidad}.db'), cantidad)
+    LibroDao.usar_cache(None)
+
+    _publicacion(cantidad, operaciones, directorio)
+    print(f"\n{'retraso del consumidor':<34} {'p50 ms':>8} {'p99 ms':>8} {'eventos/s':>10}")
+    for nombre, tamano_lote, max_pendientes, costo in (('lotes de 1', 1, None, 0.0),
+                                                       ('lotes de 500', 500, None, 0.0),
+                                                       ('lento (50 µs/evento)', 500, None, 0.00005),
+                                                       ('lento con max_pendientes=1000', 500, 1000, 0.00005)):
+        p50, p99, por_segundo = _retraso(cantidad, operaciones, directorio, tamano_lote, max_pendientes, costo)
+        print(f"{nombre:<34} {p50:>8.3f} {p99:>8.3f} {por_segundo:>10,.0f}")
+    print()
+    _sondeo(directorio)
+    Conexiones.cerrar()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
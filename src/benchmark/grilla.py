@@ -0,0 +1,85 @@
+"""
+Mide lo que necesita el modo grilla (ModeloLibros) sobre un catálogo grande:
+
+    páginas       latencia de traer una página al principio, a la mitad y al final del
+                  catálogo: paginando por llave (seleccionar_pagina, lo que usa fetchMore)
+                  frente a OFFSET, que tiene que saltar todas las filas anteriores.
+    grabación     recibir un pedido de N títulos nuevos y M correcciones: un
+                  insertar_libro/actualizar_libro por fila (un commit cada uno, como el
+                  formulario) frente a LibroDao.grabar_cambios (una sola transacción).
+
+Uso:
+    python -m src.benchmark.grilla [--libros N] [--pedido N] [--pagina N]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from src.benchmark import medicion
+from src.benchmark.catalogoSintetico import preparar_sqlite
+from src.datos.conexiones import Conexiones
+from src.datos.libroDao import LibroDao
+from src.dominio.libro import Libro
+
+_OFFSET = ("select Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn from Libro "
+           "order by Codigo limit ? offset ?")
+
+
+def _por_offset(salto, pagina):
+    with Conexiones.obtenerCursor() as cursor:
+        return cursor.execute(_OFFSET, (pagina, salto)).fetchall()
+
+
+def _pedido(prefijo, cantidad):
+    return [Libro(codigo=f'{prefijo}{numero:08d}', nombre=f'Titulo recibido {numero}', precio=12.5,
+                  cantidad=10, autor='Proveedor', edicion='Primera', Isbn='9780000000000')
+            for numero in range(cantidad)]
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Paginación y grabación por lotes del modo grilla.")
+    parser.add_argument('--libros', type=int, default=1_000_000)
+    parser.add_argument('--pedido', type=int, default=500, help="Títulos nuevos del pedido")
+    parser.add_argument('--pagina', type=int, default=500, help="Filas por página")
+    args = parser.parse_args(argumentos)
+    preparar_sqlite(os.path.join(tempfile.gettempdir(), f'libros_{args.libros}.db'), args.libros)
+    LibroDao.usar_cache(None)
+
+    print(f"{'página en la posición':<24} {'por llave ms':>13} {'offset ms':>10}")
+    for fraccion in (0.0, 0.5, 0.99):
+        salto = int(args.libros * fraccion)
+        despues = f'{salto:010d}' if salto else None  # Los códigos sintéticos son la posición
+        llave = medicion.mejor(lambda: LibroDao.seleccionar_pagina(despues, args.pagina))
+        offset = medicion.mejor(lambda: _por_offset(salto, args.pagina))
+        print(f"{salto:<24,} {llave:>13.2f} {offset:>10.2f}")
+
+    correcciones, _ = LibroDao.seleccionar_libros(f'{numero:010d}' for numero in range(1, args.pedido // 5 + 1))
+    print(f"\ngrabar {args.pedido} títulos nuevos y {len(correcciones)} correcciones")
+    for nombre, prefijo in (('fila por fila', 'F'), ('grabar_cambios', 'G')):
+        nuevos = _pedido(prefijo, args.pedido)
+        for libro in correcciones.values():
+            libro.cantidad = int(libro.cantidad) + 1
+        inicio = time.perf_counter()
+        if prefijo == 'F':
+            for libro in nuevos:
+                LibroDao.insertar_libro(libro)
+            for libro in correcciones.values():
+                LibroDao.actualizar_libro(libro)
+        else:
+            resultado = LibroDao.grabar_cambios(nuevos, list(correcciones.values()))
+            if resultado is None or resultado.errores:
+                print(f"Error al grabar: {resultado and resultado.errores[:3]}")
+                return 1
+        segundos = time.perf_counter() - inicio
+        print(f"{nombre:<16} {segundos * 1000:>9.1f} ms")
+        with Conexiones.obtenerCursor() as cursor:
+            cursor.executemany('delete from Libro where Codigo = ?', [(libro.codigo,) for libro in nuevos])
+    Conexiones.cerrar()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+"""
+Mide el índice en memoria IndiceLibros según el tamaño del catálogo: tiempo de
+construcción, latencia de consulta (mediana y p99), y tiempo de guardar y cargar el
+snapshot frente a reconstruirlo.
+
+Uso:
+    python -m src.benchmark.indiceTexto [tamaño1 tamaño2 ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from src.benchmark import medicion
+from src.benchmark.catalogoSintetico import generar_filas
+from src.datos.indiceLibros import IndiceLibros
+
+_CONSULTAS = ('garcia marquez', 'cien años soledad', 'borges laberinto', 'sombra del vie',
+              'rayuela', 'allende casa espiritus', 'mar', 'neruda memoria')
+
+
+def medir(cantidad: int, repeticiones: int = 50) -> dict:
+    """Construye un índice con `cantidad` libros sintéticos y mide sus operaciones."""
+    indice = IndiceLibros()
+    inicio = time.perf_counter()
+    for codigo, nombre, _, _, autor, _, isbn in generar_filas(cantidad):
+        indice.agregar(codigo, nombre, autor, isbn)
+    construccion = time.perf_counter() - inicio
+
+    latencias = medicion.latencias(lambda consulta: indice.buscar(consulta, k=10), _CONSULTAS * repeticiones)
+
+    ruta = os.path.join(tempfile.gettempdir(), f'indice_{cantidad}.pkl')
+    inicio = time.perf_counter()
+    indice.guardar(ruta)
+    guardado = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    IndiceLibros.cargar(ruta)
+    carga = time.perf_counter() - inicio
+    os.remove(ruta)
+    return {'libros': cantidad, 'construccion_s': construccion, 'consulta_p50_ms': medicion.percentil(latencias, 0.5),
+            'consulta_p99_ms': medicion.percentil(latencias, 0.99), 'guardar_s': guardado, 'cargar_s': carga}
+
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    tamanos = [int(valor) for valor in argumentos] or [10_000, 100_000]
+    print(f"{'libros':>10} {'construir (s)':>14} {'p50 (ms)':>9} {'p99 (ms)':>9} "
+          f"{'guardar (s)':>12} {'cargar (s)':>11}")
+    for cantidad in tamanos:
+        r = medir(cantidad)
+        print(f"{r['libros']:>10} {r['construccion_s']:>14.2f} {r['consulta_p50_ms']:>9.3f} "
+              f"{r['consulta_p99_ms']:>9.3f} {r['guardar_s']:>12.2f} {r['cargar_s']:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
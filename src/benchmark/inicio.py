@@ -0,0 +1,86 @@
+"""
+Mide el arranque de la aplicación:
+
+    importación       costo de importar cada módulo (python -X importtime), agrupado
+                      por paquete, para LibroServicio y para la capa de datos sola.
+    primer pintado    procesos nuevos de `python -m src.principal --medir --salir`:
+                      milisegundos hasta importar Qt, importar LibroServicio, construir la
+                      ventana y recibir el primer evento de pintado, y si el controlador de
+                      la base (pyodbc o sqlite3) ya estaba importado en ese momento.
+
+Sin pantalla se usa la plataforma 'offscreen' de Qt.
+
+Uso:
+    python -m src.benchmark.inicio [repeticiones]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+
+
+def _importtime(modulo: str) -> list:
+    """Retorna [(microsegundos propios, acumulados, módulo)] de importar `modulo` en un proceso nuevo."""
+    salida = subprocess.run([sys.executable, '-X', 'importtime', '-c', f'import {modulo}'],
+                            capture_output=True, text=True)
+    if salida.returncode != 0:
+        raise RuntimeError(salida.stderr.strip().splitlines()[-1])
+    filas = []
+    for linea in salida.stderr.splitlines():
+        if not linea.startswith('import time:') or 'self [us]' in linea:
+            continue
+        propio, acumulado, nombre = (parte.strip() for parte in linea[len('import time:'):].split('|'))
+        filas.append((int(propio), int(acumulado), nombre))
+    return filas
+
+
+def _importacion(modulo: str):
+    try:
+        filas = _importtime(modulo)
+    except RuntimeError as e:
+        print(f"{modulo}: no se pudo importar ({e})")
+        return
+    total = max(acumulado for _, acumulado, _ in filas)
+    print(f"\nimportar {modulo}: {total / 1000:.1f} ms")
+    grupos = {}
+    for propio, _, nombre in filas:
+        raiz = nombre.split('.')[0] if not nombre.startswith('src.') else '.'.join(nombre.split('.')[:3])
+        grupos[raiz] = grupos.get(raiz, 0) + propio
+    for raiz, propio in sorted(grupos.items(), key=lambda grupo: -grupo[1])[:12]:
+        print(f"  {raiz:<32} {propio / 1000:>8.1f} ms")
+
+
+def _primer_pintado(repeticiones: int):
+    entorno = dict(os.environ)
+    entorno.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    medidas = {}
+    controlador = []
+    for _ in range(repeticiones):
+        salida = subprocess.run([sys.executable, '-m', 'src.principal', '--medir', '--salir'],
+                                capture_output=True, text=True, env=entorno, timeout=60)
+        lineas = [linea for linea in salida.stdout.splitlines() if '=' in linea]
+        if salida.returncode != 0 or not lineas:
+            print(f"\nprimer pintado: la aplicación no arrancó ({(salida.stderr.strip().splitlines() or ['?'])[-1]})")
+            return
+        for par in lineas[0].split():
+            nombre, valor = par.split('=')
+            medidas.setdefault(nombre, []).append(float(valor))
+        controlador.append(lineas[-1].split('=')[1])
+    print(f"\nprimer pintado ({repeticiones} arranques, mediana ms desde el inicio de src.principal):")
+    for nombre, valores in medidas.items():
+        print(f"  {nombre:<16} {statistics.median(valores):>8.1f}")
+    print(f"  controlador de la base importado al pintar: {', '.join(sorted(set(controlador)))}")
+
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    repeticiones = int(argumentos[0]) if argumentos else 5
+    _importacion('src.datos.libroDao')
+    _importacion('src.servicio.libro')
+    _primer_pintado(repeticiones)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
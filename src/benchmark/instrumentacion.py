@@ -0,0 +1,62 @@
+"""
+Mide el costo de la instrumentación de la capa de datos: microsegundos por
+seleccionar_libro sin instrumentación, con SumideroMemoria y con SumideroPrometheus,
+y el costo de la comprobación que se hace en cada préstamo cuando está desactivada.
+
+Uso:
+    python -m src.benchmark.instrumentacion [libros] [llamadas]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import timeit
+
+from src.benchmark.catalogoSintetico import preparar_sqlite
+from src.datos.instrumentacion import Instrumentacion, SumideroMemoria, SumideroPrometheus
+from src.datos.libroDao import LibroDao
+
+
+def _microsegundos_por_llamada(codigos, rondas=5) -> float:
+    """Mejor de varias rondas, en microsegundos por seleccionar_libro."""
+    mejor = float('inf')
+    for _ in range(rondas):
+        inicio = time.perf_counter()
+        for codigo in codigos:
+            LibroDao.seleccionar_libro(codigo)
+        mejor = min(mejor, (time.perf_counter() - inicio) / len(codigos) * 1e6)
+    return mejor
+
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    cantidad = int(argumentos[0]) if argumentos else 100_000
+    llamadas = int(argumentos[1]) if len(argumentos) > 1 else 20_000
+    preparar_sqlite(os.path.join(tempfile.gettempdir(), f'libros_{cantidad}.db'), cantidad)
+    LibroDao.usar_cache(None)
+    azar = random.Random(11)
+    codigos = [f'{azar.randint(1, cantidad):010d}' for _ in range(llamadas)]
+    ruta_prom = os.path.join(tempfile.gettempdir(), 'libreria.prom')
+
+    Instrumentacion.desactivar()
+    _microsegundos_por_llamada(codigos[:1000], rondas=1)  # Calentamiento
+    base = _microsegundos_por_llamada(codigos)
+    print(f"{'modo':<24} {'µs/llamada':>11} {'sobrecosto':>11}")
+    print(f"{'desactivada':<24} {base:>11.2f} {'-':>11}")
+    for nombre, sumidero in (('SumideroMemoria', SumideroMemoria()),
+                             ('SumideroPrometheus', SumideroPrometheus(ruta_prom, intervalo=1.0))):
+        Instrumentacion.activar(sumidero)
+        medido = _microsegundos_por_llamada(codigos)
+        Instrumentacion.desactivar()
+        print(f"{nombre:<24} {medido:>11.2f} {(medido - base) / base:>+11.1%}")
+    comprobacion = timeit.timeit('Instrumentacion.activa()', globals=globals(), number=1_000_000) * 1000
+    print(f"Comprobación con la instrumentación desactivada: {comprobacion:.1f} ns por préstamo "
+          f"({comprobacion / (base * 1000):.3%} de una llamada)")
+    if os.path.exists(ruta_prom):
+        os.remove(ruta_prom)
+
+
+if __name__ == '__main__':
+    main()
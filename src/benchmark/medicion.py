@@ -0,0 +1,42 @@
+"""
+Utilidades de medición compartidas por los benchmarks: latencias de una función
+llamada muchas veces, sus percentiles y el tiempo de una operación repetida.
+"""
+
+import time
+
+
+def percentil(valores, fraccion: float) -> float:
+    """Valor de `valores` en la fracción indicada (0.5 = mediana, 1.0 = máximo)."""
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(len(ordenados) * fraccion))]
+
+
+def latencias(funcion, argumentos) -> list:
+    """Llama a `funcion(argumento)` por cada argumento y retorna las latencias en ms."""
+    resultado = []
+    for argumento in argumentos:
+        inicio = time.perf_counter()
+        funcion(argumento)
+        resultado.append((time.perf_counter() - inicio) * 1000)
+    return resultado
+
+
+def tiempos(funcion, repeticiones: int = 5) -> list:
+    """Milisegundos de cada una de `repeticiones` llamadas a `funcion()`."""
+    resultado = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        resultado.append((time.perf_counter() - inicio) * 1000)
+    return resultado
+
+
+def mediana(funcion, repeticiones: int = 5) -> float:
+    """Mediana en ms de `repeticiones` llamadas a `funcion()`."""
+    return percentil(tiempos(funcion, repeticiones), 0.5)
+
+
+def mejor(funcion, repeticiones: int = 5) -> float:
+    """Mejor tiempo en ms de `repeticiones` llamadas a `funcion()`."""
+    return min(tiempos(funcion, repeticiones))
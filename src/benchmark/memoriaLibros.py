@@ -0,0 +1,58 @@
+"""
+Compara memoria y tiempo de construcción de N libros como objetos Libro (con
+__slots__), como objetos con __dict__ por instancia (la representación anterior) y
+como un LoteLibros por columnas.
+
+Uso:
+    python -m src.benchmark.memoriaLibros [cantidad]
+"""
+
+import sys
+import time
+import tracemalloc
+
+from src.benchmark.catalogoSintetico import generar_filas
+from src.dominio.libro import Libro
+from src.dominio.loteLibros import LoteLibros
+
+
+class _LibroConDict(Libro):
+    """Subclase sin __slots__: cada objeto vuelve a tener su __dict__, como antes."""
+
+
+def _medir(construir, filas):
+    """Retorna (bytes por libro, segundos) de construir la colección a partir de las filas."""
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    coleccion = construir(filas)
+    segundos = time.perf_counter() - inicio
+    memoria, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del coleccion
+    return memoria / len(filas), segundos
+
+
+def _objetos(clase):
+    def construir(filas):
+        return [clase(codigo=f[0], nombre=f[1], precio=f[2], cantidad=f[3], autor=f[4], edicion=f[5], Isbn=f[6])
+                for f in filas]
+    return construir
+
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    cantidad = int(argumentos[0]) if argumentos else 200_000
+    # Las filas se generan antes de medir; sus cadenas son compartidas por las tres
+    # representaciones, así que se mide solo lo que cada una agrega.
+    filas = list(generar_filas(cantidad))
+    print(f"{cantidad} libros")
+    print(f"{'representación':<22} {'bytes/libro':>12} {'construcción (s)':>17}")
+    for nombre, construir in (('Libro con __dict__', _objetos(_LibroConDict)),
+                              ('Libro con __slots__', _objetos(Libro)),
+                              ('LoteLibros', LoteLibros.desde_filas)):
+        por_libro, segundos = _medir(construir, filas)
+        print(f"{nombre:<22} {por_libro:>12.1f} {segundos:>17.3f}")
+
+
+if __name__ == '__main__':
+    main()
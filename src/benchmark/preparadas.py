@@ -0,0 +1,88 @@
+"""
+Mide cuánto cuesta analizar y planificar las sentencias de LibroDao en cada llamada y
+cuánto se ahorra con SentenciasPreparadas, sobre una base SQLite local:
+
+    sin preparar      sqlite3 sin caché de sentencias (cached_statements=0) y un cursor
+                      nuevo por llamada: cada llamada vuelve a analizar el SQL, como un
+                      controlador que no reutiliza nada.
+    caché sqlite3     la caché de sentencias de cada conexión (lo habitual en SQLite) y
+                      un cursor nuevo por llamada (obtenerCursor() sin sentencia).
+    registro          el cursor preparado de cada sentencia (obtenerCursor(sql)).
+
+Se miden seleccionar_libro (sin caché de lectura), actualizar_libro y ajustar_cantidad.
+La diferencia entre 'sin preparar' y 'registro' es el análisis y la planificación que se
+ahorra cada llamada. En SQL Server, con pyodbc, el ahorro del registro incluye además no
+volver a enviar ni preparar el texto de la sentencia.
+
+Uso:
+    python -m src.benchmark.preparadas [--libros N] [--llamadas N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+from src.benchmark.catalogoSintetico import preparar_sqlite
+from src.datos.backends import BackendSqlite
+from src.datos.conexiones import Conexiones
+from src.datos.libroDao import LibroDao
+from src.datos.sentenciasPreparadas import SentenciasPreparadas
+from src.dominio.libro import Libro
+
+
+def _medir(funcion, argumentos) -> float:
+    """Microsegundos por llamada (el mejor de 3 pasadas)."""
+    mejores = []
+    for _ in range(3):
+        inicio = time.perf_counter()
+        for argumento in argumentos:
+            funcion(argumento)
+        mejores.append((time.perf_counter() - inicio) / len(argumentos) * 1e6)
+    return min(mejores)
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Ahorro de las sentencias preparadas por conexión.")
+    parser.add_argument('--libros', type=int, default=100_000)
+    parser.add_argument('--llamadas', type=int, default=20_000)
+    args = parser.parse_args(argumentos)
+    ruta = os.path.join(tempfile.gettempdir(), f'libros_{args.libros}.db')
+    preparar_sqlite(ruta, args.libros)
+    LibroDao.usar_cache(None)
+    azar = random.Random(3)
+    codigos = [f'{azar.randint(1, args.libros):010d}' for _ in range(args.llamadas)]
+    libros = LibroDao.seleccionar_libros(codigos[:1000])[0]
+    # Un Libro nuevo por llamada: sin campos marcados se graba el UPDATE completo, siempre el mismo
+    filas = [(libro.codigo, libro.nombre, libro.precio, libro.cantidad, libro.autor, libro.edicion, libro.Isbn)
+             for libro in libros.values()]
+
+    operaciones = (('seleccionar_libro', LibroDao.seleccionar_libro, codigos),
+                   ('actualizar_libro', lambda fila: LibroDao.actualizar_libro(Libro(*fila)), filas),
+                   ('ajustar_cantidad', lambda codigo: LibroDao.ajustar_cantidad(codigo, 0), codigos))
+    casos = (('sin preparar', 0, False), ('caché sqlite3', 256, False), ('registro', 256, True))
+    tiempos = {}
+    for nombre, cache, registro in casos:
+        Conexiones.configurar(backend=BackendSqlite(ruta, sentencias_en_cache=cache), maximo=1)
+        SentenciasPreparadas.limpiar()
+        SentenciasPreparadas.activo = registro
+        for operacion, funcion, entrada in operaciones:
+            tiempos[(nombre, operacion)] = _medir(funcion, entrada)
+    estadisticas = SentenciasPreparadas.estadisticas()
+    SentenciasPreparadas.activo = True
+    Conexiones.cerrar()
+
+    print(f"{args.libros:,} libros, µs por llamada (menos es mejor)")
+    print(f"{'operación':<20}" + ''.join(f"{nombre:>15}" for nombre, _, _ in casos) + f"{'ahorro':>10}")
+    for operacion, _, _ in operaciones:
+        fila = [tiempos[(nombre, operacion)] for nombre, _, _ in casos]
+        print(f"{operacion:<20}" + ''.join(f"{valor:>15.1f}" for valor in fila) + f"{fila[0] - fila[-1]:>10.1f}")
+    print(f"\nregistro: {estadisticas['preparadas']} cursores preparados, "
+          f"{estadisticas['reutilizadas']:,} llamadas los reutilizaron")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
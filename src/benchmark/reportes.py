@@ -0,0 +1,60 @@
+"""
+Compara los motores del reporte de inventario (src.servicio.reportes): Python puro y
+NumPy sobre los mismos lotes, y la agregación en el servidor (sql).
+
+Primero mide solo el cálculo, con los lotes ya leídos en memoria, y después el reporte
+completo leyendo la tabla. Si NumPy no está instalado, ese motor se omite.
+
+Uso:
+    python -m src.benchmark.reportes [libros]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+from src.benchmark.catalogoSintetico import preparar_sqlite
+from src.datos.conexiones import Conexiones
+from src.datos.libroDao import LibroDao
+from src.servicio.reportes import generar_reporte, motor_predeterminado
+
+_UMBRAL = 5
+
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    cantidad = int(argumentos[0]) if argumentos else 1_000_000
+    preparar_sqlite(os.path.join(tempfile.gettempdir(), f'libros_{cantidad}.db'), cantidad)
+    motores = ('python', 'numpy') if motor_predeterminado() == 'numpy' else ('python',)
+    if 'numpy' not in motores:
+        print("NumPy no está instalado: se omite el motor 'numpy'")
+
+    inicio = time.perf_counter()
+    lotes = list(LibroDao.recorrer_lotes(50_000))
+    print(f"{cantidad:,} libros; leer la tabla en lotes por columnas: {time.perf_counter() - inicio:.2f} s")
+    print(f"\n{'solo cálculo':<14} {'segundos':>9} {'libros/s':>13}")
+    referencia = None
+    for motor in motores:
+        reporte = generar_reporte(_UMBRAL, motor, lotes=lotes)
+        print(f"{motor:<14} {reporte.segundos:>9.3f} {reporte.libros / reporte.segundos:>13,.0f}")
+        referencia = referencia or reporte
+    del lotes
+
+    print(f"\n{'completo':<14} {'segundos':>9} {'libros/s':>13} {'coincide':>9}")
+    correcto = True
+    for motor in motores + ('sql',):
+        reporte = generar_reporte(_UMBRAL, motor)
+        coincide = (reporte.libros == referencia.libros and reporte.unidades == referencia.unidades
+                    and abs(reporte.valor - referencia.valor) <= 1e-6 * max(1.0, referencia.valor)
+                    and reporte.percentiles == referencia.percentiles
+                    and reporte.bajo_stock == referencia.bajo_stock)
+        correcto = correcto and coincide
+        print(f"{motor:<14} {reporte.segundos:>9.3f} {reporte.libros / reporte.segundos:>13,.0f} "
+              f"{'sí' if coincide else 'NO':>9}")
+    Conexiones.cerrar()
+    return 0 if correcto else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
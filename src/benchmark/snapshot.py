@@ -0,0 +1,129 @@
+"""
+Mide el snapshot local de la tabla Libro (SnapshotLibros) frente a la base:
+
+    arranque      proceso nuevo hasta la primera búsqueda respondida: abriendo la
+                  conexión a la base (con --conexion ms de demora al conectarse y
+                  --latencia ms por consulta, imitando un servidor remoto) o abriendo
+                  el snapshot.
+    búsqueda      latencia p50/p99 de seleccionar_libro contra la base (sin caché) y
+                  contra el snapshot.
+    refresco      reconstruir el snapshot completo frente a aplicar los cambios del
+                  feed de cambios.
+
+Uso:
+    python -m src.benchmark.snapshot [--libros N] [--busquedas N] [--cambios N]
+"""
+
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.benchmark import medicion
+from src.benchmark.cargaAsync import _BackendConLatencia
+from src.benchmark.catalogoSintetico import preparar_sqlite
+from src.datos.conexiones import Conexiones
+from src.datos.feedCambios import FeedCambios
+from src.datos.libroDao import LibroDao
+from src.datos.snapshotLibros import SnapshotLibros
+
+
+class _BackendLento(_BackendConLatencia):
+    """Además de la latencia por consulta, tarda `conexion` segundos en conectarse."""
+
+    def __init__(self, ruta, latencia, conexion):
+        super().__init__(ruta, latencia)
+        self.conexion = conexion
+
+    def conectar(self):
+        time.sleep(self.conexion)
+        return super().conectar()
+
+
+def _hijo(modo, base, ruta_snapshot, latencia, conexion, codigo):
+    """Proceso nuevo: responde la primera búsqueda y avisa al padre."""
+    if modo == 'base':
+        Conexiones.configurar(backend=_BackendLento(base, latencia, conexion))
+        libro = LibroDao.seleccionar_libro(codigo)
+    else:
+        libro = SnapshotLibros.abrir(ruta_snapshot).seleccionar_libro(codigo)
+    print('listo' if libro is not None else 'ausente', flush=True)
+
+
+def _arranque(modo, args, base, ruta_snapshot, codigo) -> float:
+    """Milisegundos desde que se lanza el proceso hasta su primera respuesta."""
+    inicio = time.perf_counter()
+    salida = subprocess.run([sys.executable, '-m', 'src.benchmark.snapshot', '--hijo', modo, base, ruta_snapshot,
+                             str(args.latencia / 1000), str(args.conexion / 1000), codigo],
+                            capture_output=True, text=True, check=True).stdout
+    segundos = time.perf_counter() - inicio
+    if 'listo' not in salida:
+        raise RuntimeError(f"El proceso de prueba no encontró el libro: {salida!r}")
+    return segundos * 1000
+
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    if argumentos and argumentos[0] == '--hijo':
+        modo, base, ruta_snapshot, latencia, conexion, codigo = argumentos[1:]
+        _hijo(modo, base, ruta_snapshot, float(latencia), float(conexion), codigo)
+        return 0
+    parser = argparse.ArgumentParser(description="Snapshot local frente a la base de datos.")
+    parser.add_argument('--libros', type=int, default=100_000)
+    parser.add_argument('--busquedas', type=int, default=20_000)
+    parser.add_argument('--cambios', type=int, default=1_000, help="Escrituras antes de refrescar")
+    parser.add_argument('--latencia', type=float, default=1.0, help="ms por consulta en el arranque")
+    parser.add_argument('--conexion', type=float, default=50.0, help="ms para conectarse en el arranque")
+    parser.add_argument('--repeticiones', type=int, default=5)
+    args = parser.parse_args(argumentos)
+
+    base = os.path.join(tempfile.gettempdir(), f'libros_{args.libros}.db')
+    preparar_sqlite(base, args.libros)
+    LibroDao.usar_cache(None)
+    directorio = tempfile.mkdtemp(prefix='snapshot_')
+    ruta_snapshot = os.path.join(directorio, 'libros.snap')
+    feed = FeedCambios()
+    feed.conectar()
+
+    inicio = time.perf_counter()
+    snapshot = SnapshotLibros.construir(ruta_snapshot, offset_feed=feed.siguiente)
+    construccion = time.perf_counter() - inicio
+    print(f"construcción: {len(snapshot):,} libros en {construccion * 1000:.0f} ms, "
+          f"{os.path.getsize(ruta_snapshot) / 1e6:.1f} MB")
+
+    azar = random.Random(3)
+    codigos = [f'{azar.randint(1, args.libros):010d}' for _ in range(args.busquedas)]
+    print(f"\n{'arranque hasta la 1.ª búsqueda':<34} {'p50 ms':>8} {'mín ms':>8}")
+    for modo, nombre in (('base', f"base ({args.conexion:g} ms al conectar)"), ('snapshot', 'snapshot')):
+        tiempos = [_arranque(modo, args, base, ruta_snapshot, codigos[0]) for _ in range(args.repeticiones)]
+        print(f"{nombre:<34} {medicion.percentil(tiempos, 0.5):>8.1f} {min(tiempos):>8.1f}")
+
+    print(f"\n{'búsqueda por código':<34} {'p50 ms':>8} {'p99 ms':>8}")
+    for nombre, buscar in (('base local (sin caché)', LibroDao.seleccionar_libro),
+                           ('snapshot', snapshot.seleccionar_libro)):
+        latencias = medicion.latencias(buscar, codigos)
+        print(f"{nombre:<34} {medicion.percentil(latencias, 0.5):>8.4f} {medicion.percentil(latencias, 0.99):>8.4f}")
+
+    for codigo in azar.sample(codigos, min(args.cambios, len(codigos))):
+        LibroDao.ajustar_cantidad(codigo, 1)
+    inicio = time.perf_counter()
+    snapshot = snapshot.refrescar(feed)
+    refresco = time.perf_counter() - inicio
+    print(f"\nrefresco con {feed.siguiente:,} eventos: {refresco * 1000:.0f} ms "
+          f"(reconstruir: {construccion * 1000:.0f} ms)")
+
+    correcto = all(snapshot.fila(codigo)[3] == LibroDao.seleccionar_libro(codigo).cantidad
+                   for codigo in codigos[:1000])
+    if not correcto:
+        print("El snapshot refrescado no coincide con la base")
+    snapshot.cerrar()
+    feed.desconectar()
+    Conexiones.cerrar()
+    return 0 if correcto else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,231 @@
+"""
+Suite de rendimiento de la capa de datos y de servicio. Corre sobre una base SQLite
+local (BackendSqlite) con catálogos sintéticos del tamaño que se pida, así que no
+necesita el servidor SQL Server.
+
+Escenarios:
+    crud          insertar, seleccionar, actualizar y eliminar de a un libro (latencia).
+    lectura       búsquedas repetidas de unos pocos códigos, sin caché y con CacheLRU.
+    insercion     N libros con insertar_libro en un bucle frente a insertar_libros.
+    construccion  construcción de objetos Libro.
+    validacion    reglas de validacionLibros: de a una fila (formulario) y por lotes (importación).
+
+Los resultados se guardan en JSON con --guardar y se comparan con una línea base con
+--comparar: sale con código 1 si alguna métrica empeora más que la tolerancia. Las
+métricas que terminan en '_ms' son latencias (menos es mejor) y las que terminan en
+'_por_s' son rendimiento (más es mejor). Cada escenario se repite varias rondas y se
+conserva el mejor valor, que es el más estable entre corridas; el p99 se informa pero
+no se compara, porque depende demasiado de la carga del equipo.
+
+Uso:
+    python -m src.benchmark.suite --tamanos 1000 100000 --guardar resultados.json
+    python -m src.benchmark.suite --tamanos 1000 100000 --comparar linea_base.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import tempfile
+import time
+
+from src.benchmark import medicion
+from src.benchmark.catalogoSintetico import generar_filas, preparar_sqlite
+from src.datos.cacheLibros import CacheLRU
+from src.datos.conexiones import Conexiones
+from src.datos.libroDao import LibroDao
+from src.dominio.libro import Libro
+from src.dominio.validacionLibros import CAMPOS, VALIDADOR
+from src.servicio.catalogo import validar_fila
+
+_ESCENARIOS = ('crud', 'lectura', 'insercion', 'construccion', 'validacion')
+_FILAS_EN_MEMORIA = 50_000  # Filas de los escenarios que no usan la base de datos
+
+
+def _resumen(nombre, latencias) -> dict:
+    return {f'{nombre}_p50_ms': medicion.percentil(latencias, 0.5), f'{nombre}_p99_ms': medicion.percentil(latencias, 0.99)}
+
+
+def _por_segundo(funcion, cantidad) -> float:
+    """Ejecuta `funcion()` (que procesa `cantidad` elementos) y retorna elementos por segundo."""
+    inicio = time.perf_counter()
+    funcion()
+    return cantidad / (time.perf_counter() - inicio)
+
+
+def _borrar_prefijo(prefijo):
+    """Elimina los libros de prueba agregados por un escenario (sus códigos empiezan con `prefijo`)."""
+    with Conexiones.obtenerCursor() as cursor:
+        cursor.execute('delete from Libro where Codigo like ?', (prefijo + '%',))
+
+
+def _libros_nuevos(prefijo, cantidad, semilla):
+    """Libros sintéticos con códigos que no chocan con el catálogo ('C0000000001', ...)."""
+    return [Libro(codigo=prefijo + fila[0], nombre=fila[1], precio=fila[2], cantidad=fila[3],
+                  autor=fila[4], edicion=fila[5], Isbn=fila[6])
+            for fila in generar_filas(cantidad, semilla)]
+
+
+def escenario_crud(tamano, operaciones) -> dict:
+    LibroDao.usar_cache(None)
+    libros = _libros_nuevos('C', operaciones, semilla=1)
+    try:
+        resultados = {}
+        resultados.update(_resumen('insertar', medicion.latencias(LibroDao.insertar_libro, libros)))
+        azar = random.Random(2)
+        codigos = [f'{azar.randint(1, tamano):010d}' for _ in range(operaciones)]
+        resultados.update(_resumen('seleccionar', medicion.latencias(LibroDao.seleccionar_libro, codigos)))
+        for libro in libros:
+            libro.cantidad = libro.cantidad + 1
+        resultados.update(_resumen('actualizar', medicion.latencias(LibroDao.actualizar_libro, libros)))
+        resultados.update(_resumen('eliminar', medicion.latencias(LibroDao.eliminar_libro,
+                                                          [libro.codigo for libro in libros])))
+    finally:
+        _borrar_prefijo('C')
+    return resultados
+
+
+def escenario_lectura(tamano, operaciones) -> dict:
+    # El 80 % de las búsquedas van a 20 códigos, como en una caja con los libros del momento
+    azar = random.Random(3)
+    calientes = [f'{azar.randint(1, tamano):010d}' for _ in range(20)]
+    codigos = [azar.choice(calientes) if azar.random() < 0.8 else f'{azar.randint(1, tamano):010d}'
+               for _ in range(operaciones * 5)]
+    LibroDao.usar_cache(None)
+    resultados = _resumen('sin_cache', medicion.latencias(LibroDao.seleccionar_libro, codigos))
+    LibroDao.usar_cache(CacheLRU(capacidad=1000))
+    try:
+        resultados.update(_resumen('con_cache', medicion.latencias(LibroDao.seleccionar_libro, codigos)))
+    finally:
+        LibroDao.usar_cache(None)
+    return resultados
+
+
+def escenario_insercion(tamano, operaciones) -> dict:
+    LibroDao.usar_cache(None)
+    cantidad = operaciones * 5
+    libros = _libros_nuevos('I', cantidad, semilla=4)
+    try:
+        bucle = _por_segundo(lambda: [LibroDao.insertar_libro(libro) for libro in libros], cantidad)
+        _borrar_prefijo('I')
+        lotes = _por_segundo(lambda: LibroDao.insertar_libros(libros), cantidad)
+    finally:
+        _borrar_prefijo('I')
+    return {'bucle_por_s': bucle, 'lotes_por_s': lotes}
+
+
+def escenario_construccion(tamano, operaciones) -> dict:
+    # No depende del tamaño del catálogo; se usa siempre el mismo número de filas
+    filas = list(generar_filas(_FILAS_EN_MEMORIA, semilla=5))
+    construir = lambda: [Libro(codigo=f[0], nombre=f[1], precio=f[2], cantidad=f[3], autor=f[4],
+                               edicion=f[5], Isbn=f[6]) for f in filas]
+    desde_fila = lambda: [LibroDao._libro_desde_fila(fila) for fila in filas]
+    return {'libro_por_s': _por_segundo(construir, len(filas)),
+            'desde_fila_por_s': _por_segundo(desde_fila, len(filas))}
+
+
+def escenario_validacion(tamano, operaciones) -> dict:
+    # Mismas reglas que LibroServicio.nuevo/actualizar; la ventana necesita pantalla, así
+    # que se miden con los textos tal como llegan del formulario: de a una fila con
+    # catalogo.validar_fila y todas juntas, como en la importación
+    filas = [dict(zip(CAMPOS, (fila[0], fila[1], str(fila[2]).replace('.', ','), str(fila[3]),
+                               fila[4], fila[5], fila[6])))
+             for fila in generar_filas(_FILAS_EN_MEMORIA, semilla=6)]
+    return {'filas_por_s': _por_segundo(lambda: [validar_fila(fila) for fila in filas], len(filas)),
+            'lote_por_s': _por_segundo(lambda: VALIDADOR.validar_filas(filas), len(filas))}
+
+
+def _mejor(metrica, a, b):
+    """El mejor de dos valores de una métrica: la menor latencia o el mayor rendimiento."""
+    return min(a, b) if metrica.endswith('_ms') else max(a, b)
+
+
+def ejecutar(tamanos, escenarios=_ESCENARIOS, operaciones=500, rondas=3, directorio=None) -> dict:
+    """
+    Ejecuta los escenarios con cada tamaño de catálogo.
+
+    Args:
+        tamanos (list): Número de libros de cada catálogo sintético.
+        escenarios (tuple): Nombres de los escenarios a ejecutar.
+        operaciones (int): Operaciones medidas por escenario (más da resultados más estables).
+        rondas (int): Veces que se repite cada escenario; se conserva el mejor valor.
+        directorio (str, opcional): Carpeta de las bases SQLite; se reutilizan entre corridas.
+
+    Returns:
+        dict: {'entorno': {...}, 'resultados': {'escenario/tamaño/métrica': valor}}.
+    """
+    directorio = directorio or tempfile.gettempdir()
+    resultados = {}
+    for tamano in tamanos:
+        preparar_sqlite(os.path.join(directorio, f'libros_{tamano}.db'), tamano)
+        for escenario in escenarios:
+            medir = globals()[f'escenario_{escenario}']
+            for _ in range(rondas):
+                for metrica, valor in medir(tamano, operaciones).items():
+                    clave = f'{escenario}/{tamano}/{metrica}'
+                    anterior = resultados.get(clave)
+                    resultados[clave] = round(valor if anterior is None else _mejor(metrica, anterior, valor), 6)
+    Conexiones.cerrar()
+    return {'entorno': {'python': platform.python_version(), 'plataforma': platform.platform(),
+                        'procesador': platform.processor(), 'fecha': time.strftime('%Y-%m-%d %H:%M:%S'),
+                        'operaciones': operaciones, 'rondas': rondas},
+            'resultados': resultados}
+
+
+def comparar(actual: dict, base: dict, tolerancia: float) -> list:
+    """
+    Compara dos resultados de `ejecutar` métrica por métrica.
+
+    Returns:
+        list: Tuplas (métrica, valor base, valor actual, cambio relativo) de las métricas
+        que empeoraron más que `tolerancia` (0.2 = 20 %).
+    """
+    regresiones = []
+    for metrica, valor in actual['resultados'].items():
+        anterior = base['resultados'].get(metrica)
+        if not anterior or metrica.endswith('_p99_ms'):
+            continue
+        cambio = (valor - anterior) / anterior
+        empeora = cambio > tolerancia if metrica.endswith('_ms') else cambio < -tolerancia
+        if empeora:
+            regresiones.append((metrica, anterior, valor, cambio))
+    return regresiones
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Suite de rendimiento de LibroDao y LibroServicio.")
+    parser.add_argument('--tamanos', type=int, nargs='+', default=[1_000, 100_000],
+                        help="Libros de cada catálogo sintético (de 1000 a 10 millones)")
+    parser.add_argument('--escenarios', nargs='+', choices=_ESCENARIOS, default=list(_ESCENARIOS))
+    parser.add_argument('--operaciones', type=int, default=500)
+    parser.add_argument('--rondas', type=int, default=3)
+    parser.add_argument('--directorio', help="Carpeta de las bases SQLite (por defecto la temporal)")
+    parser.add_argument('--guardar', help="Archivo JSON donde guardar los resultados")
+    parser.add_argument('--comparar', help="Archivo JSON de línea base con el que comparar")
+    parser.add_argument('--tolerancia', type=float, default=0.2,
+                        help="Empeoramiento relativo permitido antes de marcar una regresión")
+    args = parser.parse_args(argumentos)
+
+    actual = ejecutar(args.tamanos, args.escenarios, args.operaciones, args.rondas, args.directorio)
+    for metrica, valor in actual['resultados'].items():
+        print(f"{metrica:<48} {valor:>14,.3f}")
+    if args.guardar:
+        with open(args.guardar, 'w', encoding='utf-8') as archivo:
+            json.dump(actual, archivo, indent=2, ensure_ascii=False)
+        print(f"Resultados guardados en {args.guardar}")
+    if args.comparar:
+        with open(args.comparar, encoding='utf-8') as archivo:
+            base = json.load(archivo)
+        regresiones = comparar(actual, base, args.tolerancia)
+        for metrica, anterior, valor, cambio in regresiones:
+            print(f"REGRESIÓN {metrica}: {anterior:,.3f} -> {valor:,.3f} ({cambio:+.0%})")
+        if regresiones:
+            return 1
+        print(f"Sin regresiones respecto a {args.comparar} (tolerancia {args.tolerancia:.0%})")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
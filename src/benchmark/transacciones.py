@@ -0,0 +1,87 @@
+"""
+Compara el rendimiento de commits: una carga mixta de escrituras (70 % actualizar,
+20 % insertar, 10 % eliminar) con un commit por llamada a LibroDao, frente a la misma
+carga agrupada en UnidadDeTrabajo de distintos tamaños.
+
+Uso:
+    python -m src.benchmark.transacciones [libros] [operaciones]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from src.benchmark.catalogoSintetico import preparar_sqlite
+from src.datos.conexiones import Conexiones
+from src.datos.libroDao import LibroDao
+from src.datos.unidadTrabajo import UnidadDeTrabajo
+from src.dominio.libro import Libro
+
+_GRUPOS = (10, 100, 1000)
+
+
+def _carga(cantidad: int, operaciones: int, semilla: int) -> list:
+    """Lista de (método de LibroDao, argumento) con la mezcla de escrituras."""
+    azar = random.Random(semilla)
+    nuevos = []
+    carga = []
+    for numero in range(operaciones):
+        sorteo = azar.random()
+        if sorteo < 0.2 or (sorteo >= 0.9 and not nuevos):
+            libro = Libro(codigo=f'T{semilla}-{numero:07d}', nombre='Prueba de commits', precio=10.0,
+                          cantidad=1, autor='Autor', edicion='Primera', Isbn='9780000000000')
+            nuevos.append(libro.codigo)
+            carga.append((LibroDao.insertar_libro, libro))
+        elif sorteo < 0.9:
+            libro = Libro(codigo=f'{azar.randint(1, cantidad):010d}', nombre='Actualizado', precio=12.5,
+                          cantidad=azar.randint(0, 200), autor='Autor', edicion='Segunda', Isbn='9780000000000')
+            carga.append((LibroDao.actualizar_libro, libro))
+        else:
+            carga.append((LibroDao.eliminar_libro, nuevos.pop(azar.randrange(len(nuevos)))))
+    return carga
+
+
+def _limpiar():
+    with Conexiones.obtenerCursor() as cursor:
+        cursor.execute("delete from Libro where Codigo like 'T%'")
+
+
+def _por_llamada(carga) -> float:
+    inicio = time.perf_counter()
+    for metodo, argumento in carga:
+        metodo(argumento)
+    return len(carga) / (time.perf_counter() - inicio)
+
+
+def _agrupado(carga, tamano_grupo: int) -> float:
+    inicio = time.perf_counter()
+    for desde in range(0, len(carga), tamano_grupo):
+        with UnidadDeTrabajo():
+            for metodo, argumento in carga[desde:desde + tamano_grupo]:
+                metodo(argumento)
+    return len(carga) / (time.perf_counter() - inicio)
+
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    cantidad = int(argumentos[0]) if argumentos else 100_000
+    operaciones = int(argumentos[1]) if len(argumentos) > 1 else 10_000
+    preparar_sqlite(os.path.join(tempfile.gettempdir(), f'libros_{cantidad}.db'), cantidad)
+    LibroDao.usar_cache(None)
+
+    print(f"{operaciones} escrituras sobre {cantidad} libros")
+    print(f"{'modo':<26} {'operaciones/s':>14} {'commits':>9}")
+    _limpiar()
+    print(f"{'un commit por llamada':<26} {_por_llamada(_carga(cantidad, operaciones, 1)):>14,.0f} {operaciones:>9}")
+    for tamano_grupo in _GRUPOS:
+        _limpiar()
+        por_segundo = _agrupado(_carga(cantidad, operaciones, 1), tamano_grupo)
+        commits = -(-operaciones // tamano_grupo)
+        print(f"{f'UnidadDeTrabajo de {tamano_grupo}':<26} {por_segundo:>14,.0f} {commits:>9}")
+    _limpiar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+"""
+Mide la validación de libros (validacionLibros) sobre un catálogo sintético con los
+textos tal como llegan de un CSV:
+
+    por fila       catalogo.validar_fila una vez por libro (como el formulario).
+    lote python    ValidadorLibros.validar_filas sobre todo el catálogo, sin NumPy.
+    lote numpy     lo mismo con los dígitos de control y los negativos en NumPy, si
+                   está instalado.
+
+Una parte de las filas (--errores) trae un precio, una cantidad o un ISBN inválidos, y
+se comprueba que los tres caminos rechacen exactamente las mismas.
+
+Uso:
+    python -m src.benchmark.validacion [--libros 1000000] [--errores 0.01]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from src.benchmark.catalogoSintetico import generar_filas
+from src.dominio.validacionLibros import CAMPOS, ValidadorLibros
+from src.servicio.catalogo import validar_fila
+
+_INVALIDOS = (('precio', '12.5.0'), ('precio', '-3'), ('cantidad', 'diez'), ('isbn', '9780743273566'),
+              ('isbn', '12345'), ('nombre', ''))
+
+
+def _filas(cantidad, errores, semilla=8):
+    azar = random.Random(semilla)
+    filas = []
+    for fila in generar_filas(cantidad):
+        valores = dict(zip(CAMPOS, (fila[0], fila[1], str(fila[2]), str(fila[3]), fila[4], fila[5], fila[6])))
+        if azar.random() < errores:
+            campo, valor = azar.choice(_INVALIDOS)
+            valores[campo] = valor
+        filas.append(valores)
+    return filas
+
+
+def _por_fila(filas) -> set:
+    rechazadas = set()
+    for posicion, fila in enumerate(filas):
+        try:
+            validar_fila(fila)
+        except ValueError:
+            rechazadas.add(posicion)
+    return rechazadas
+
+
+def main(argumentos=None):
+    parser = argparse.ArgumentParser(description="Rendimiento de la validación de libros.")
+    parser.add_argument('--libros', type=int, default=1_000_000)
+    parser.add_argument('--errores', type=float, default=0.01, help="Fracción de filas inválidas")
+    args = parser.parse_args(argumentos)
+    filas = _filas(args.libros, args.errores)
+
+    casos = [('por fila', lambda: _por_fila(filas)),
+             ('lote python', lambda: set(ValidadorLibros(usar_numpy=False).validar_filas(filas).errores))]
+    try:
+        import numpy  # noqa: F401
+        casos.append(('lote numpy', lambda: set(ValidadorLibros(usar_numpy=True).validar_filas(filas).errores)))
+    except ImportError:
+        print("NumPy no está instalado: se omite 'lote numpy'")
+
+    print(f"{args.libros:,} libros, {args.errores:.1%} con errores")
+    print(f"{'camino':<12} {'segundos':>9} {'filas/s':>12} {'rechazadas':>11}")
+    esperadas = None
+    for nombre, validar in casos:
+        inicio = time.perf_counter()
+        rechazadas = validar()
+        segundos = time.perf_counter() - inicio
+        print(f"{nombre:<12} {segundos:>9.2f} {args.libros / segundos:>12,.0f} {len(rechazadas):>11,}")
+        if esperadas is not None and rechazadas != esperadas:
+            print(f"Los caminos no coinciden: {len(rechazadas ^ esperadas)} filas distintas")
+            return 1
+        esperadas = rechazadas
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+Prueba de estrés de ventas concurrentes: N cajas venden a la vez, de a una unidad, el
+mismo título hasta agotarlo. Compara LibroDao.ajustar_cantidad con la forma anterior
+(seleccionar_libro, restar y actualizar_libro) y verifica que las unidades vendidas
+coincidan con el stock inicial y que la cantidad nunca quede negativa.
+
+Sale con código 1 si ajustar_cantidad vende de más o de menos.
+
+Uso:
+    python -m src.benchmark.ventasConcurrentes [cajas] [stock]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from src.benchmark.catalogoSintetico import preparar_sqlite
+from src.datos.conexiones import Conexiones
+from src.datos.libroDao import LibroDao
+
+_CODIGO = '0000000001'
+
+
+def _fijar_stock(stock: int):
+    with Conexiones.obtenerCursor() as cursor:
+        cursor.execute('update Libro set Cantidad = ? where Codigo = ?', (stock, _CODIGO))
+
+
+def _vender_con_ajuste() -> bool:
+    return LibroDao.ajustar_cantidad(_CODIGO, -1) >= 0
+
+
+def _vender_leyendo() -> bool:
+    libro = LibroDao.seleccionar_libro(_CODIGO)
+    if int(libro.cantidad) <= 0:
+        return False
+    libro.cantidad = int(libro.cantidad) - 1
+    return LibroDao.actualizar_libro(libro) > 0
+
+
+def _simular(vender, cajas: int, stock: int) -> tuple:
+    """Retorna (unidades vendidas, cantidad final, ventas por segundo)."""
+    _fijar_stock(stock)
+    vendidas = [0] * cajas
+    barrera = threading.Barrier(cajas + 1)
+
+    def caja(numero):
+        barrera.wait()
+        while vender():
+            vendidas[numero] += 1
+
+    hilos = [threading.Thread(target=caja, args=(numero,)) for numero in range(cajas)]
+    for hilo in hilos:
+        hilo.start()
+    barrera.wait()
+    inicio = time.perf_counter()
+    for hilo in hilos:
+        hilo.join()
+    segundos = time.perf_counter() - inicio
+    final = int(LibroDao.seleccionar_libro(_CODIGO).cantidad)
+    return sum(vendidas), final, sum(vendidas) / segundos
+
+
+def main(argumentos=None):
+    argumentos = sys.argv[1:] if argumentos is None else argumentos
+    cajas = int(argumentos[0]) if argumentos else 32
+    stock = int(argumentos[1]) if len(argumentos) > 1 else 5_000
+    preparar_sqlite(os.path.join(tempfile.gettempdir(), 'libros_1000.db'), 1_000, maximo_pool=cajas)
+    LibroDao.usar_cache(None)
+
+    print(f"{cajas} cajas vendiendo {stock} unidades del mismo título")
+    print(f"{'método':<34} {'vendidas':>9} {'final':>6} {'ventas/s':>10} {'correcto':>9}")
+    correcto = True
+    for nombre, vender in (('seleccionar + actualizar_libro', _vender_leyendo),
+                           ('ajustar_cantidad', _vender_con_ajuste)):
+        vendidas, final, por_segundo = _simular(vender, cajas, stock)
+        ok = vendidas == stock and final == 0
+        print(f"{nombre:<34} {vendidas:>9} {final:>6} {por_segundo:>10,.0f} {'sí' if ok else 'NO':>9}")
+        if vender is _vender_con_ajuste:
+            correcto = ok
+    return 0 if correcto else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,180 @@
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from src.datos.conexiones import Conexiones
+from src.datos.libroDao import LibroDao, ResultadoLote
+from src.dominio.libro import Libro
+
+
+class CargaInterrumpida(TimeoutError):
+    """
+    Se lanza cuando vence el tiempo límite de una carga por lotes. La carga ya se detuvo:
+    en `resultado` trae el ResultadoLote con los libros que quedaron grabados.
+    """
+    def __init__(self, resultado: ResultadoLote):
+        super().__init__(f"Carga detenida por tiempo límite; {resultado.procesados} libros grabados.")
+        self.resultado = resultado
+
+
+class AsyncLibroDao:
+    """
+    Versión asíncrona (asyncio) de LibroDao para usarla desde un servidor web sin
+    bloquear el bucle de eventos.
+
+    Cada llamada se ejecuta en un grupo acotado de hilos que usa las conexiones del pool
+    de Conexiones, con el mismo número de hilos que conexiones máximas, de modo que
+    ningún hilo se queda esperando una conexión. Los métodos devuelven lo mismo que en
+    LibroDao.
+
+    Cancelación y tiempo límite: si la corrutina se cancela (o vence `tiempo_limite`)
+    antes de que un hilo tome la llamada, la consulta nunca se ejecuta. Si ya estaba en
+    curso, la corrutina termina de inmediato y la consulta concluye en segundo plano,
+    devolviendo después su conexión al pool. Las cargas por lotes (insertar_libros,
+    actualizar_libros, upsert_libros) en cambio se detienen: el lote en curso termina y
+    se confirma, no se envía ninguno más y la corrutina espera a que el hilo quede libre.
+    """
+
+    _TIEMPO_LIMITE = 30  # Segundos por llamada; 0 = sin límite
+    _ejecutor = None  # Grupo de hilos compartido, creado en el primer uso
+    _bloqueo = threading.Lock()
+
+    @classmethod
+    def configurar(cls, max_hilos: int | None = None, tiempo_limite: float | None = None):
+        """
+        Cambia el número de hilos y/o el tiempo límite por defecto. Cierra el grupo de
+        hilos anterior, si existía, después de que terminen sus llamadas pendientes.
+
+        Args:
+            max_hilos (int, opcional): Hilos del grupo; por defecto el máximo del pool de Conexiones.
+            tiempo_limite (float, opcional): Segundos por llamada; 0 desactiva el límite.
+        """
+        with cls._bloqueo:
+            anterior = cls._ejecutor
+            cls._ejecutor = ThreadPoolExecutor(max_workers=max_hilos or Conexiones._POOL_MAXIMO,
+                                               thread_name_prefix='AsyncLibroDao')
+            if tiempo_limite is not None:
+                cls._TIEMPO_LIMITE = tiempo_limite
+        if anterior is not None:
+            anterior.shutdown(wait=False)
+
+    @classmethod
+    def _obtener_ejecutor(cls) -> ThreadPoolExecutor:
+        if cls._ejecutor is None:
+            with cls._bloqueo:
+                if cls._ejecutor is None:
+                    cls._ejecutor = ThreadPoolExecutor(max_workers=Conexiones._POOL_MAXIMO,
+                                                       thread_name_prefix='AsyncLibroDao')
+        return cls._ejecutor
+
+    @classmethod
+    async def _ejecutar(cls, funcion, *args, tiempo_limite=None, **kwargs):
+        """
+        Ejecuta una función bloqueante de LibroDao en el grupo de hilos.
+
+        Raises:
+            TimeoutError: Si la llamada no termina dentro del tiempo límite.
+            asyncio.CancelledError: Si la corrutina se cancela.
+        """
+        bucle = asyncio.get_running_loop()
+        futuro = bucle.run_in_executor(cls._obtener_ejecutor(),
+                                       functools.partial(funcion, *args, **kwargs))
+        limite = cls._TIEMPO_LIMITE if tiempo_limite is None else tiempo_limite
+        if not limite:
+            return await futuro
+        return await asyncio.wait_for(futuro, limite)
+
+    @classmethod
+    async def _ejecutar_lotes(cls, funcion, libros, tamano_lote, resultado, tiempo_limite) -> ResultadoLote:
+        """
+        Ejecuta una carga por lotes de LibroDao en el grupo de hilos y la detiene entre
+        lotes si la corrutina se cancela o vence el tiempo límite.
+
+        Raises:
+            CargaInterrumpida: Si vence el tiempo límite.
+            asyncio.CancelledError: Si la corrutina se cancela; lo grabado queda en `resultado`.
+        """
+        resultado = ResultadoLote() if resultado is None else resultado
+        detener = threading.Event()
+        tarea = cls._obtener_ejecutor().submit(funcion, libros, tamano_lote, resultado, detener)
+        limite = cls._TIEMPO_LIMITE if tiempo_limite is None else tiempo_limite
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(tarea), limite or None)
+        except TimeoutError:
+            detener.set()
+            await asyncio.wait([asyncio.wrap_future(tarea)])
+            raise CargaInterrumpida(resultado) from None
+        except asyncio.CancelledError:
+            detener.set()
+            await asyncio.wait([asyncio.wrap_future(tarea)])
+            raise
+
+    @classmethod
+    def cerrar(cls):
+        """Cierra el grupo de hilos; las llamadas en curso terminan normalmente."""
+        with cls._bloqueo:
+            ejecutor, cls._ejecutor = cls._ejecutor, None
+        if ejecutor is not None:
+            ejecutor.shutdown(wait=True)
+
+    # --- Operaciones de una fila ---
+
+    @classmethod
+    async def insertar_libro(cls, libro: Libro, tiempo_limite: float | None = None) -> int:
+        """Ver LibroDao.insertar_libro."""
+        return await cls._ejecutar(LibroDao.insertar_libro, libro, tiempo_limite=tiempo_limite)
+
+    @classmethod
+    async def seleccionar_libro(cls, codigo: str, tiempo_limite: float | None = None) -> Libro | None:
+        """Ver LibroDao.seleccionar_libro."""
+        return await cls._ejecutar(LibroDao.seleccionar_libro, codigo, tiempo_limite=tiempo_limite)
+
+    @classmethod
+    async def actualizar_libro(cls, libro: Libro, tiempo_limite: float | None = None) -> int:
+        """Ver LibroDao.actualizar_libro."""
+        return await cls._ejecutar(LibroDao.actualizar_libro, libro, tiempo_limite=tiempo_limite)
+
+    @classmethod
+    async def eliminar_libro(cls, codigo: str, version=None, tiempo_limite: float | None = None) -> int:
+        """Ver LibroDao.eliminar_libro."""
+        return await cls._ejecutar(LibroDao.eliminar_libro, codigo, version, tiempo_limite=tiempo_limite)
+
+    # --- Operaciones por lotes ---
+
+    @classmethod
+    async def seleccionar_libros(cls, codigos, tiempo_limite: float | None = None) -> tuple[dict, list] | None:
+        """Ver LibroDao.seleccionar_libros."""
+        return await cls._ejecutar(LibroDao.seleccionar_libros, list(codigos), tiempo_limite=tiempo_limite)
+
+    @classmethod
+    async def buscar_libros(cls, texto: str, campo: str = 'nombre', modo: str = 'prefijo',
+                            limite: int = 50, despues: tuple | None = None,
+                            tiempo_limite: float | None = None) -> tuple[list, tuple | None] | None:
+        """Ver LibroDao.buscar_libros."""
+        return await cls._ejecutar(LibroDao.buscar_libros, texto, campo, modo, limite, despues,
+                                   tiempo_limite=tiempo_limite)
+
+    @classmethod
+    async def insertar_libros(cls, libros, tamano_lote: int | None = None, resultado: ResultadoLote | None = None,
+                              tiempo_limite: float | None = None) -> ResultadoLote:
+        """
+        Ver LibroDao.insertar_libros. Si vence el tiempo límite o se cancela, la carga se
+        detiene después del lote en curso; los lotes ya confirmados quedan grabados.
+
+        Raises:
+            CargaInterrumpida: Si vence el tiempo límite (trae el resultado parcial).
+        """
+        return await cls._ejecutar_lotes(LibroDao.insertar_libros, libros, tamano_lote, resultado, tiempo_limite)
+
+    @classmethod
+    async def actualizar_libros(cls, libros, tamano_lote: int | None = None, resultado: ResultadoLote | None = None,
+                                tiempo_limite: float | None = None) -> ResultadoLote:
+        """Ver LibroDao.actualizar_libros e insertar_libros (cancelación)."""
+        return await cls._ejecutar_lotes(LibroDao.actualizar_libros, libros, tamano_lote, resultado, tiempo_limite)
+
+    @classmethod
+    async def upsert_libros(cls, libros, tamano_lote: int | None = None, resultado: ResultadoLote | None = None,
+                            tiempo_limite: float | None = None) -> ResultadoLote:
+        """Ver LibroDao.upsert_libros e insertar_libros (cancelación)."""
+        return await cls._ejecutar_lotes(LibroDao.upsert_libros, libros, tamano_lote, resultado, tiempo_limite)
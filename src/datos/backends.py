@@ -0,0 +1,243 @@
+import os
+
+
+class Backend:
+    """
+    Motor de base de datos que usan Conexiones y LibroDao.
+
+    Un backend sabe abrir conexiones, preparar la base la primera vez que se usa y
+    reemplazar las sentencias de LibroDao que en su dialecto se escriben distinto
+    (el resto de sentencias es SQL común a todos los motores).
+    """
+
+    nombre = 'base'
+    # Sentencias de LibroDao que este motor reemplaza, por nombre del atributo (ej. '_UPSERT')
+    sentencias = {}
+    # Máximo de parámetros por sentencia (para las consultas IN de seleccionar_libros)
+    max_parametros = 999
+    # Niveles de aislamiento que acepta UnidadDeTrabajo
+    AISLAMIENTOS = ('read uncommitted', 'read committed', 'repeatable read', 'serializable')
+    # Puntos de guardado (SQL estándar); None si el motor no necesita liberarlos
+    _PUNTO_GUARDADO = "savepoint {nombre}"
+    _VOLVER_A_PUNTO = "rollback to savepoint {nombre}"
+    _LIBERAR_PUNTO = "release savepoint {nombre}"
+
+    def conectar(self):
+        """Abre y retorna una conexión DB-API nueva."""
+        raise NotImplementedError
+
+    def inicializar(self, conexion):
+        """Se llama una vez, con la primera conexión del pool, antes de usar la base."""
+
+    def limitar(self, limite: int) -> tuple[str, str]:
+        """
+        Retorna (prefijo, sufijo) para limitar un select a `limite` filas: el prefijo va
+        después de 'select ' y el sufijo al final de la sentencia.
+        """
+        return '', f' limit {int(limite)}'
+
+    def parametros_despues(self, valor, codigo) -> tuple:
+        """Parámetros de la condición de paginación _BUSCAR_DESPUES de este motor."""
+        return valor, valor, codigo
+
+    def validar_aislamiento(self, aislamiento: str | None) -> str | None:
+        """Retorna el nivel en minúsculas, o lanza ValueError si el motor no lo admite."""
+        if aislamiento is None:
+            return None
+        nivel = ' '.join(aislamiento.lower().split())
+        if nivel not in self.AISLAMIENTOS:
+            raise ValueError(f"Nivel de aislamiento no válido para {self.nombre}: {aislamiento}")
+        return nivel
+
+    def iniciar_transaccion(self, conexion, aislamiento: str | None):
+        """Prepara una conexión recién prestada para una transacción explícita."""
+
+    def terminar_transaccion(self, conexion, aislamiento: str | None):
+        """Deja la conexión como estaba antes de devolverla al pool (tras commit o rollback)."""
+
+    def ejecutar_punto(self, conexion, plantilla: str | None, nombre: str):
+        """Ejecuta una de las sentencias de punto de guardado, si el motor la necesita."""
+        if plantilla is not None:
+            cursor = conexion.cursor()
+            try:
+                cursor.execute(plantilla.format(nombre=nombre))
+            finally:
+                cursor.close()
+
+    def es_conflicto(self, excepcion: BaseException) -> bool:
+        """Indica si el error es un interbloqueo o un conflicto que vale la pena reintentar."""
+        return False
+
+    def __repr__(self):
+        return f"{type(self).__name__}()"
+
+
+class BackendSqlServer(Backend):
+    """SQL Server a través de pyodbc y el controlador ODBC Driver 17."""
+
+    nombre = 'sqlserver'
+    max_parametros = 2000  # SQL Server admite 2100; se deja margen por seguridad
+    AISLAMIENTOS = Backend.AISLAMIENTOS + ('snapshot',)
+    _PUNTO_GUARDADO = "save transaction {nombre}"
+    _VOLVER_A_PUNTO = "rollback transaction {nombre}"
+    _LIBERAR_PUNTO = None  # SQL Server los libera al terminar la transacción
+
+    def __init__(self, servidor='ALVAREZBUSTAMANTE\\SQL_BUSTAMANTE', bbdd='Libreria',
+                 usuario='sa', password='123456789', controlador='ODBC Driver 17 for SQL Server'):
+        """
+        Args:
+            servidor (str): Dirección del servidor de la base de datos.
+            bbdd (str): Nombre de la base de datos.
+            usuario (str): Usuario para la conexión.
+            password (str): Contraseña del usuario.
+            controlador (str): Nombre del controlador ODBC instalado.
+        """
+        self.servidor = servidor
+        self.bbdd = bbdd
+        self.usuario = usuario
+        self.password = password
+        self.controlador = controlador
+
+    def conectar(self):
+        # pyodbc solo se importa si realmente se usa SQL Server
+        import pyodbc as bd
+        return bd.connect('DRIVER={' + self.controlador + '};SERVER=' + self.servidor +
+                          ';DATABASE=' + self.bbdd + ';UID=' + self.usuario + ';PWD=' + self.password
+                          + ';TrustServerCertificate=yes')
+
+    def limitar(self, limite: int) -> tuple[str, str]:
+        return f'top ({int(limite)}) ', ''
+
+    def _fijar_aislamiento(self, conexion, nivel):
+        cursor = conexion.cursor()
+        try:
+            cursor.execute(f"set transaction isolation level {nivel}")
+        finally:
+            cursor.close()
+
+    def iniciar_transaccion(self, conexion, aislamiento):
+        # pyodbc abre la transacción solo (autocommit desactivado); basta con fijar el nivel
+        if aislamiento is not None:
+            self._fijar_aislamiento(conexion, aislamiento)
+
+    def terminar_transaccion(self, conexion, aislamiento):
+        # El nivel queda en la sesión: se restablece para el siguiente que use la conexión
+        if aislamiento is not None and aislamiento != 'read committed':
+            self._fijar_aislamiento(conexion, 'read committed')
+
+    def es_conflicto(self, excepcion):
+        # 40001 / 1205: la transacción fue elegida víctima de un interbloqueo
+        args = getattr(excepcion, 'args', ())
+        return (bool(args) and args[0] == '40001') or '(1205)' in str(excepcion)
+
+    def __repr__(self):
+        return f"BackendSqlServer(servidor={self.servidor!r}, bbdd={self.bbdd!r})"
+
+
+class BackendSqlite(Backend):
+    """
+    Base SQLite embebida en un archivo, para sucursales sin servidor, pruebas y
+    mediciones de rendimiento.
+
+    Cada conexión usa modo WAL (los lectores no bloquean al escritor), sincronización
+    NORMAL y caché de sentencias preparadas de sqlite3. Al abrir el pool aplica las
+    migraciones pendientes de esquemaLibros: la tabla Libro (agrupada físicamente por
+    código), los índices de búsqueda y la columna de versión.
+    """
+
+    nombre = 'sqlite'
+    # SQLite no tiene rowversion: la versión es un entero que sube cada UPDATE de LibroDao
+    # en la misma escritura. El disparador de esquemaLibros solo la sube para los UPDATE
+    # que no la tocan (los hechos fuera de LibroDao), así no se escribe la fila dos veces.
+    sentencias = {
+        '_UPSERT': ("insert into Libro (Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn) "
+                    "values (?, ?, ?, ?, ?, ?, ?) on conflict (Codigo) do update set "
+                    "Nombre=excluded.Nombre, Precio=excluded.Precio, Cantidad=excluded.Cantidad, "
+                    "Autor=excluded.Autor, Edicion=excluded.Edicion, Isbn=excluded.Isbn, "
+                    "Version = Version + 1"),
+        '_UPDATE': ("update Libro set Nombre=?, Precio=?, Cantidad=?, "
+                    "Autor=?, Edicion=?, Isbn=?, Version = Version + 1 where Codigo=?"),
+        '_UPDATE_PARCIAL': "update Libro set {asignaciones}, Version = Version + 1 where Codigo=?",
+        '_AJUSTAR': ("update Libro set Cantidad = Cantidad + ?, Version = Version + 1 "
+                     "where Codigo = ? and Cantidad + ? >= 0 "
+                     "returning Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn"),
+        # Sin "with" al principio: sqlite3 solo abre la transacción implícita si la
+        # sentencia empieza con insert/update/delete, y si no, la confirmaría al instante
+        '_AJUSTAR_VARIOS': ("update Libro set Cantidad = Libro.Cantidad + V.column2, Version = Libro.Version + 1 "
+                            "from (values {valores}) as V "
+                            "where Libro.Codigo = V.column1 and Libro.Cantidad + V.column2 >= 0 "
+                            "returning Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn"),
+        '_UPDATE_VERSION': ("update Libro set {asignaciones}, Version = Version + 1 "
+                            "where Codigo=? and Version=? returning Version"),
+        # SQLite solo usa el índice para paginar si la condición es una comparación de tuplas
+        '_BUSCAR_DESPUES': "({columna}, Codigo) > (?, ?)",
+    }
+
+    def __init__(self, ruta='libreria.db', tiempo_espera=30.0, sentencias_en_cache=256):
+        """
+        Args:
+            ruta (str): Archivo de la base de datos.
+            tiempo_espera (float): Segundos que se espera si otra conexión tiene la base bloqueada.
+            sentencias_en_cache (int): Sentencias preparadas que guarda cada conexión.
+        """
+        self.ruta = ruta
+        self.tiempo_espera = tiempo_espera
+        self.sentencias_en_cache = sentencias_en_cache
+
+    def conectar(self):
+        # Como pyodbc, sqlite3 se importa recién al conectar (no retrasa el arranque)
+        import sqlite3
+        # check_same_thread=False: el pool garantiza que una conexión la usa un solo hilo a la vez
+        conexion = sqlite3.connect(self.ruta, timeout=self.tiempo_espera, check_same_thread=False,
+                                   cached_statements=self.sentencias_en_cache)
+        conexion.execute('pragma journal_mode=wal')
+        conexion.execute('pragma synchronous=normal')
+        conexion.execute('pragma cache_size=-32000')  # 32 MB de caché de páginas
+        return conexion
+
+    def inicializar(self, conexion):
+        # Crea la tabla Libro y sus índices, o aplica las migraciones que falten
+        from src.datos.esquemaLibros import EsquemaLibros
+        EsquemaLibros.migrar(conexion, self)
+        if hasattr(conexion, 'getlimit'):  # Python 3.11 o superior
+            import sqlite3
+            self.max_parametros = conexion.getlimit(sqlite3.SQLITE_LIMIT_VARIABLE_NUMBER)
+
+    def parametros_despues(self, valor, codigo) -> tuple:
+        return valor, codigo
+
+    def iniciar_transaccion(self, conexion, aislamiento):
+        # SQLite siempre es serializable. Con 'serializable' o 'repeatable read' se toma el
+        # bloqueo de escritura al empezar (begin immediate), así dos transacciones que leen
+        # y luego escriben no chocan al final; con el resto se toma en la primera escritura.
+        if aislamiento in ('serializable', 'repeatable read'):
+            conexion.execute('begin immediate')
+        else:
+            conexion.execute('begin')
+
+    def es_conflicto(self, excepcion):
+        import sqlite3
+        mensaje = str(excepcion).lower()
+        return isinstance(excepcion, sqlite3.OperationalError) and ('locked' in mensaje or 'busy' in mensaje)
+
+    def __repr__(self):
+        return f"BackendSqlite(ruta={self.ruta!r})"
+
+
+def backend_configurado() -> Backend:
+    """
+    Crea el backend indicado por las variables de entorno:
+        LIBRERIA_BACKEND: 'sqlserver' (por defecto) o 'sqlite'.
+        LIBRERIA_SQLITE: archivo de la base SQLite (por defecto 'libreria.db').
+        LIBRERIA_SERVIDOR, LIBRERIA_BBDD, LIBRERIA_USUARIO, LIBRERIA_PASSWORD: datos de
+        conexión a SQL Server (por defecto, los del servidor de la librería).
+    """
+    nombre = os.environ.get('LIBRERIA_BACKEND', BackendSqlServer.nombre).lower()
+    if nombre == BackendSqlite.nombre:
+        return BackendSqlite(os.environ.get('LIBRERIA_SQLITE', 'libreria.db'))
+    if nombre == BackendSqlServer.nombre:
+        opciones = {clave: os.environ[variable] for clave, variable in (
+            ('servidor', 'LIBRERIA_SERVIDOR'), ('bbdd', 'LIBRERIA_BBDD'),
+            ('usuario', 'LIBRERIA_USUARIO'), ('password', 'LIBRERIA_PASSWORD')) if variable in os.environ}
+        return BackendSqlServer(**opciones)
+    raise ValueError(f"Backend desconocido en LIBRERIA_BACKEND: {nombre}")
@@ -0,0 +1,153 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheLRU:
+    """
+    Caché acotada de filas de libros por código con desalojo LRU (se descarta la entrada
+    usada hace más tiempo cuando se supera la capacidad).
+
+    Guarda la fila tal como viene de la base de datos, no el objeto Libro, para que quien
+    modifique un libro leído no altere lo que ven los demás. También guarda los códigos
+    que no existen (caché negativa) para no repetir la consulta por ellos.
+
+    Es segura para usar desde varios hilos.
+    """
+
+    def __init__(self, capacidad=1000, cachear_ausentes=True):
+        """
+        Constructor de la caché.
+
+        Args:
+            capacidad (int): Número máximo de códigos guardados.
+            cachear_ausentes (bool): Si es True también se recuerdan los códigos inexistentes.
+        """
+        if capacidad < 1:
+            raise ValueError("La capacidad de la caché debe ser al menos 1.")
+        self._capacidad = capacidad
+        self._cachear_ausentes = cachear_ausentes
+        self._entradas = OrderedDict()  # codigo -> (fila o None, instante de expiración o None)
+        self._bloqueo = threading.Lock()
+        self._generacion = 0  # Aumenta con cada invalidación
+        self._aciertos = 0
+        self._aciertos_ausentes = 0
+        self._fallos = 0
+        self._desalojos = 0
+        self._expirados = 0
+        self._invalidaciones = 0
+
+    def _vencimiento(self, fila):
+        """Instante en que expira una entrada nueva; None significa que no expira."""
+        return None
+
+    def generacion(self) -> int:
+        """
+        Retorna un contador que cambia con cada invalidación. Se lee antes de consultar
+        la base de datos y se pasa a `guardar()`, que descarta la fila si mientras tanto
+        otro hilo modificó algún libro.
+        """
+        return self._generacion
+
+    def obtener(self, codigo):
+        """
+        Busca un código en la caché.
+
+        Returns:
+            tuple: (encontrado, fila). Si encontrado es True y fila es None, el código
+                   se sabe inexistente.
+        """
+        clave = str(codigo)
+        with self._bloqueo:
+            entrada = self._entradas.get(clave)
+            if entrada is None:
+                self._fallos += 1
+                return False, None
+            fila, vence = entrada
+            if vence is not None and vence <= time.monotonic():
+                del self._entradas[clave]
+                self._expirados += 1
+                self._fallos += 1
+                return False, None
+            self._entradas.move_to_end(clave)
+            if fila is None:
+                self._aciertos_ausentes += 1
+            else:
+                self._aciertos += 1
+            return True, fila
+
+    def guardar(self, codigo, fila, generacion=None):
+        """
+        Guarda la fila de un libro (o None si el código no existe).
+
+        Args:
+            codigo: Código del libro.
+            fila (tuple | None): Fila leída de la base de datos.
+            generacion (int, opcional): Valor de `generacion()` leído antes de la consulta.
+        """
+        if fila is None and not self._cachear_ausentes:
+            return
+        clave = str(codigo)
+        with self._bloqueo:
+            if generacion is not None and generacion != self._generacion:
+                return  # La fila pudo quedar obsoleta por una escritura concurrente
+            self._entradas[clave] = (fila, self._vencimiento(fila))
+            self._entradas.move_to_end(clave)
+            while len(self._entradas) > self._capacidad:
+                self._entradas.popitem(last=False)
+                self._desalojos += 1
+
+    def invalidar(self, codigo):
+        """Elimina un código de la caché (se llama al insertar, actualizar o eliminar)."""
+        with self._bloqueo:
+            self._generacion += 1
+            self._invalidaciones += 1
+            self._entradas.pop(str(codigo), None)
+
+    def limpiar(self):
+        """Vacía la caché por completo."""
+        with self._bloqueo:
+            self._generacion += 1
+            self._entradas.clear()
+
+    def estadisticas(self) -> dict:
+        """Retorna los contadores de aciertos, fallos, desalojos e invalidaciones."""
+        with self._bloqueo:
+            consultas = self._aciertos + self._aciertos_ausentes + self._fallos
+            return {
+                'entradas': len(self._entradas),
+                'capacidad': self._capacidad,
+                'aciertos': self._aciertos,
+                'aciertos_ausentes': self._aciertos_ausentes,
+                'fallos': self._fallos,
+                'tasa_aciertos': (self._aciertos + self._aciertos_ausentes) / consultas if consultas else 0.0,
+                'desalojos': self._desalojos,
+                'expirados': self._expirados,
+                'invalidaciones': self._invalidaciones,
+            }
+
+
+class CacheTTL(CacheLRU):
+    """
+    Caché LRU en la que además cada entrada expira a los `ttl` segundos. Sirve cuando
+    otros equipos también modifican la tabla y sus cambios no pasan por este proceso:
+    el tiempo de vida acota cuánto puede durar un dato desactualizado.
+    """
+
+    def __init__(self, capacidad=1000, ttl=60.0, ttl_ausentes=10.0, cachear_ausentes=True):
+        """
+        Constructor de la caché.
+
+        Args:
+            capacidad (int): Número máximo de códigos guardados.
+            ttl (float): Segundos de vida de un libro encontrado.
+            ttl_ausentes (float): Segundos de vida de un código inexistente, normalmente
+                                  menor para que un libro recién creado aparezca pronto.
+            cachear_ausentes (bool): Si es True también se recuerdan los códigos inexistentes.
+        """
+        super().__init__(capacidad, cachear_ausentes)
+        self._ttl = ttl
+        self._ttl_ausentes = ttl_ausentes
+
+    def _vencimiento(self, fila):
+        return time.monotonic() + (self._ttl if fila is not None else self._ttl_ausentes)
@@ -1,76 +1,255 @@
-import sys
-import pyodbc as bd
+import threading
+import time
+from contextlib import contextmanager
+
+from src.datos.backends import Backend, backend_configurado
+from src.datos.instrumentacion import Instrumentacion
+from src.datos.poolConexiones import PoolConexiones
+from src.datos.sentenciasPreparadas import SentenciasPreparadas
+
+
+class ConexionFallida(Exception):
+    """No se pudo abrir el pool de conexiones (servidor apagado, sin red, datos erróneos)."""
+
 
 class Conexiones:
     """
     Clase que gestiona la conexión a la base de datos y la obtención de un cursor.
+    Las conexiones se toman de un pool acotado (ver `PoolConexiones`) y las abre el
+    backend configurado: SQL Server o SQLite (ver `backends`).
     """
-    # Parámetros de conexión a la base de datos
-    _SERVIDOR = 'ALVAREZBUSTAMANTE\\SQL_BUSTAMANTE'  # Dirección del servidor de la base de datos
-    _BBDD = 'Libreria'  # Nombre de la base de datos
-    _USUARIO = 'sa'  # Usuario para la conexión a la base de datos
-    _PASSWORD = '123456789'  # Contraseña del usuario
-    _conexiones = None  # Almacena la instancia de la conexión a la base de datos
-    _cursor = None  # Almacena la instancia del cursor de la base de datos
+    # Parámetros del pool de conexiones
+    _POOL_MINIMO = 1  # Conexiones que se abren al iniciar
+    _POOL_MAXIMO = 10  # Máximo de conexiones abiertas al mismo tiempo
+    _POOL_TIEMPO_ESPERA = 30  # Segundos que se espera por una conexión libre
+    _POOL_MAX_INACTIVIDAD = 300  # Segundos antes de cerrar una conexión sin uso
+    _REINTENTO_CONEXION = 5  # Segundos en que un intento fallido se informa sin volver a conectar
+    _backend = None  # Motor de base de datos; si no se configura, se toma de las variables de entorno
+    _pool = None  # Almacena la instancia del pool de conexiones
+    _fallo = None  # (instante, excepción) del último intento fallido de crear el pool
+    _precalentando = None  # Hilo de precalentar(), si hay uno
+    # Evita crear dos pools si dos hilos llegan a la vez. Reentrante: obtenerPool llama a obtenerBackend
+    _bloqueo = threading.RLock()
+    _local = threading.local()  # UnidadDeTrabajo abierta en cada hilo, si hay una
+
+    @classmethod
+    def configurar(cls, backend: Backend | None = None, minimo=None, maximo=None, tiempo_espera=None,
+                   max_inactividad=None):
+        """
+        Cambia el backend y/o el tamaño del pool. Si ya existía un pool, se cierra y se
+        creará uno nuevo con la nueva configuración en el próximo uso.
+
+        Args:
+            backend (Backend, opcional): Motor de base de datos, por ejemplo BackendSqlite('libreria.db').
+            minimo (int, opcional): Conexiones mínimas del pool.
+            maximo (int, opcional): Conexiones máximas del pool.
+            tiempo_espera (float, opcional): Segundos de espera por una conexión libre.
+            max_inactividad (float, opcional): Segundos antes de cerrar una conexión sin uso.
+        """
+        with cls._bloqueo:
+            if backend is not None:
+                cls._backend = backend
+            if minimo is not None:
+                cls._POOL_MINIMO = minimo
+            if maximo is not None:
+                cls._POOL_MAXIMO = maximo
+            if tiempo_espera is not None:
+                cls._POOL_TIEMPO_ESPERA = tiempo_espera
+            if max_inactividad is not None:
+                cls._POOL_MAX_INACTIVIDAD = max_inactividad
+            if cls._pool is not None:
+                cls._pool.cerrar()
+                cls._pool = None
+            cls._fallo = None
+
+    @classmethod
+    def obtenerBackend(cls) -> Backend:
+        """
+        Retorna el backend configurado. Si no se llamó a configurar, lo crea según las
+        variables de entorno (ver `backends.backend_configurado`).
+        """
+        if cls._backend is None:
+            with cls._bloqueo:
+                if cls._backend is None:
+                    cls._backend = backend_configurado()
+        return cls._backend
+
+    @classmethod
+    def obtenerPool(cls) -> PoolConexiones:
+        """
+        Obtiene y retorna el pool de conexiones a la base de datos.
+        Si el pool no existe, lo crea abriendo las conexiones mínimas y deja que el
+        backend prepare la base (por ejemplo, SQLite crea la tabla si no existe).
+
+        Si no se puede conectar, lanza ConexionFallida y el programa sigue: cada método
+        de LibroDao la trata como cualquier otro error de base de datos. Durante
+        _REINTENTO_CONEXION segundos se repite el mismo error sin volver a intentarlo,
+        para que cada clic no espere de nuevo el tiempo de conexión.
+
+        :return: La instancia del pool de conexiones.
+        :rtype: PoolConexiones
+        :raises ConexionFallida: Si no se pudo conectar.
+        """
+        if cls._pool is None:
+            with cls._bloqueo:
+                if cls._pool is None:
+                    fallo = cls._fallo
+                    if fallo is not None and time.monotonic() - fallo[0] < cls._REINTENTO_CONEXION:
+                        raise ConexionFallida(f"Sin conexión a la base de datos: {fallo[1]}") from fallo[1]
+                    pool = None
+                    try:
+                        # Intenta crear el pool, que abre las conexiones mínimas
+                        backend = cls.obtenerBackend()
+                        pool = PoolConexiones(backend.conectar,
+                                              minimo=cls._POOL_MINIMO,
+                                              maximo=cls._POOL_MAXIMO,
+                                              tiempo_espera=cls._POOL_TIEMPO_ESPERA,
+                                              max_inactividad=cls._POOL_MAX_INACTIVIDAD,
+                                              al_cerrar=SentenciasPreparadas.olvidar)
+                        with pool.conexion() as conexion:
+                            backend.inicializar(conexion)
+                        for nombre, sql in backend.sentencias.items():
+                            if isinstance(sql, str):
+                                Instrumentacion.registrar(nombre, sql)
+                        cls._pool = pool
+                        cls._fallo = None
+                    except Exception as e:
+                        # Captura y maneja cualquier excepción que ocurra durante la conexión
+                        print(f"Error al conectar a la base de datos: {e}")
+                        if pool is not None:
+                            # Falló la preparación de la base (por ejemplo, una migración):
+                            # no quedan abiertas las conexiones mínimas en cada reintento
+                            pool.cerrar()
+                        cls._fallo = (time.monotonic(), e)
+                        raise ConexionFallida(f"No se pudo conectar a la base de datos: {e}") from e
+        return cls._pool
+
+    @classmethod
+    def precalentar(cls) -> bool:
+        """
+        Crea el pool en un hilo aparte, para que la primera consulta no espere la
+        conexión. Los errores solo se informan (ver obtenerPool).
+
+        Returns:
+            bool: True si se lanzó el hilo; False si el pool ya existe o ya se está creando.
+        """
+        with cls._bloqueo:
+            if cls._pool is not None or (cls._precalentando is not None and cls._precalentando.is_alive()):
+                return False
+
+            def conectar():
+                try:
+                    cls.obtenerPool()
+                except ConexionFallida:
+                    pass  # obtenerPool ya informó el error
+
+            cls._precalentando = threading.Thread(target=conectar, name='Conexiones-precalentar', daemon=True)
+            cls._precalentando.start()
+            return True
+
+    @classmethod
+    def conectado(cls) -> bool:
+        """True si el pool ya está creado (no intenta conectarse)."""
+        return cls._pool is not None
 
     @classmethod
+    @contextmanager
     def obtenerConexion(cls):
         """
-        Obtiene y retorna la conexión a la base de datos.
-        Si la conexión no existe, la crea utilizando los parámetros definidos en la clase.
-        En caso de error durante la conexión, imprime el error y termina la ejecución del programa.
+        Presta una conexión del pool durante el bloque `with` y la devuelve al salir.
+        Hace commit si el bloque termina bien y rollback si ocurre una excepción.
+        Dentro de una UnidadDeTrabajo entrega su conexión y no hace commit.
 
-        :return: La instancia de la conexión a la base de datos.
+        Con la instrumentación activa se mide la espera por la conexión y la conexión
+        entregada mide sus sentencias (ver `Instrumentacion`).
+
+        :return: Gestor de contexto que entrega una conexión a la base de datos.
         :rtype: pyodbc.Connection
         """
-        if cls._conexiones is None:
-            try:
-                # Intenta establecer la conexión a la base de datos
-                cls._conexiones = bd.connect('DRIVER={ODBC Driver 17 for SQL Server};SERVER=' +
-                                             cls._SERVIDOR + ';DATABASE=' + cls._BBDD + ';UID=' + cls._USUARIO + ';PWD=' + cls._PASSWORD
-                                             + ';TrustServerCertificate=yes')
-                # log.debug(f'Conexión exitosa: {cls._conexión}') # Línea para depuración (comentada)
-                return cls._conexiones
-            except Exception as e:
-                # Captura y maneja cualquier excepción que ocurra durante la conexión
-                # log.error(f'Ocurrió una excepción al obtener la conexión: {e}') # Línea para depuración (comentada)
-                print(f"Error al conectar a la base de datos: {e}")
-                sys.exit(1) # Termina el programa con un código de error
-        else:
-            # Si la conexión ya existe, la retorna
-            return cls._conexiones
+        unidad = getattr(cls._local, 'unidad', None)
+        if unidad is not None:
+            # Dentro de una UnidadDeTrabajo: su conexión, sin commit hasta que termine
+            with unidad._usar() as conexion:
+                yield conexion
+            return
+        pool = cls.obtenerPool()
+        if not Instrumentacion.activa():
+            with pool.conexion() as conexion:
+                yield conexion
+            return
+        inicio = time.perf_counter()
+        prestada = False
+        try:
+            with pool.conexion() as conexion:
+                prestada = True
+                Instrumentacion._prestamo(time.perf_counter() - inicio)
+                yield Instrumentacion.envolver(conexion)
+        except Exception as e:
+            if not prestada:
+                Instrumentacion._error('prestamo', e)
+            raise
 
     @classmethod
-    def obtenerCursor(cls):
+    @contextmanager
+    def obtenerCursor(cls, sql: str | None = None):
         """
-        Obtiene y retorna un cursor para ejecutar comandos SQL en la base de datos.
-        Si el cursor no existe, lo crea a partir de la conexión existente (o la crea si no existe).
-        En caso de error al obtener el cursor, imprime el error y termina la ejecución del programa.
+        Entrega un cursor sobre una conexión prestada del pool durante el bloque `with`.
+        Al salir se cierra el cursor, se hace commit (o rollback si hubo una excepción)
+        y la conexión vuelve al pool, de modo que cada operación usa su propia conexión
+        en lugar de un cursor compartido por todo el proceso.
 
-        :return: La instancia del cursor de la base de datos.
+        Con `sql` (una sentencia de texto fijo que el bloque va a ejecutar) se entrega el
+        cursor ya preparado para ella en esa conexión y no se cierra al salir (ver
+        SentenciasPreparadas). Con la instrumentación activa se usa un cursor común, para
+        que la conexión medida registre la sentencia.
+
+        :return: Gestor de contexto que entrega un cursor de la base de datos.
         :rtype: pyodbc.Cursor
         """
-        if cls._cursor is None:
+        with cls.obtenerConexion() as conexion:
+            if sql is not None and SentenciasPreparadas.activo and not Instrumentacion.activa():
+                cursor = SentenciasPreparadas.cursor(conexion, sql)
+                try:
+                    yield cursor
+                finally:
+                    SentenciasPreparadas.liberar(cursor)
+                return
+            cursor = conexion.cursor()
             try:
-                # Obtiene la conexión (la creará si no existe) y luego crea un cursor
-                cls._cursor = cls.obtenerConexion().cursor()
-                # log.debug(f'Se abrió correctamente el cursor: {cls._cursor}') # Línea para depuración (comentada)
-                return cls._cursor
-            except Exception as e:
-                # Captura y maneja cualquier excepción que ocurra al obtener el cursor
-                # log.error(f'Ocurrió una excepción al obtener el cursor: {e}') # Línea para depuración (comentada)
-                print(f"Error al obtener el cursor de la base de datos: {e}")
-                sys.exit(1) # Termina el programa con un código de error
-        else:
-            # Si el cursor ya existe, lo retorna
-            return cls._cursor
+                yield cursor
+            finally:
+                cursor.close()
+
+    @classmethod
+    def transaccion_actual(cls):
+        """Retorna la UnidadDeTrabajo abierta en este hilo, o None."""
+        return getattr(cls._local, 'unidad', None)
+
+    @classmethod
+    def _fijar_transaccion(cls, unidad):
+        cls._local.unidad = unidad
+
+    @classmethod
+    def estadisticas(cls) -> dict:
+        """Retorna los contadores de uso del pool (ver `PoolConexiones.estadisticas`)."""
+        return cls.obtenerPool().estadisticas()
+
+    @classmethod
+    def cerrar(cls):
+        """Cierra el pool y todas sus conexiones libres."""
+        with cls._bloqueo:
+            if cls._pool is not None:
+                cls._pool.cerrar()
+                cls._pool = None
 
 if __name__ == '__main__':
     # Este bloque se ejecuta solo si el script se ejecuta directamente (no cuando se importa como módulo)
     print("Intentando obtener conexión a la base de datos...")
-    conexion = Conexiones.obtenerConexion()
-    print(f"Objeto de conexión: {conexion}")
+    with Conexiones.obtenerConexion() as conexion:
+        print(f"Objeto de conexión: {conexion}")
 
     print("\nIntentando obtener cursor de la base de datos...")
-    cursor = Conexiones.obtenerCursor()
-    print(f"Objeto de cursor: {cursor}")
+    with Conexiones.obtenerCursor() as cursor:
+        print(f"Objeto de cursor: {cursor}")
+
+    print(f"\nEstadísticas del pool: {Conexiones.estadisticas()}")
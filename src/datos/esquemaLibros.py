@@ -0,0 +1,213 @@
+"""
+Esquema de la tabla Libro: la crea y la lleva a la última versión con migraciones
+numeradas, una lista por motor (SQL Server y SQLite). Es el único lugar con el DDL de
+la tabla; LibroDao.crear_indices_busqueda y crear_columna_version aplican las
+migraciones correspondientes.
+
+La tabla EsquemaVersion guarda qué migraciones ya se aplicaron; cada una se aplica una
+sola vez, en orden, y se confirma junto con su registro (SQLite confirma el DDL al
+instante). Las sentencias además comprueban si el objeto ya existe, así que repetir una
+migración a medias no falla, y una base creada antes de este módulo (con la tabla y los
+índices hechos a mano) solo queda registrada.
+
+SQLite se migra sola al abrir el pool (BackendSqlite.inicializar). En SQL Server, donde
+hacen falta permisos de DDL, se ejecuta a mano:
+
+    python -m src.datos.esquemaLibros            (aplica las migraciones pendientes)
+    python -m src.datos.esquemaLibros --estado   (solo muestra la versión)
+"""
+
+import argparse
+import sys
+import time
+
+from src.datos.backends import Backend
+
+_CREAR_VERSIONES = {
+    'sqlserver': ("if object_id(N'dbo.EsquemaVersion', N'U') is null "
+                  "create table dbo.EsquemaVersion (Version int not null constraint PK_EsquemaVersion primary key, "
+                  "Descripcion nvarchar(200) not null, Aplicada varchar(32) not null)"),
+    'sqlite': ("create table if not exists EsquemaVersion (Version integer primary key, "
+               "Descripcion varchar(200) not null, Aplicada varchar(32) not null)"),
+}
+# Sin "if not exists" propio de cada motor: así lo aceptan los dos
+_REGISTRAR = ("insert into EsquemaVersion (Version, Descripcion, Aplicada) select ?, ?, ? "
+              "where not exists (select 1 from EsquemaVersion where Version = ?)")
+_VERSIONES = "select Version from EsquemaVersion"
+
+
+def _indice_sqlserver(nombre: str, columnas: str) -> str:
+    return (f"if not exists (select 1 from sys.indexes where name = N'{nombre}' "
+            f"and object_id = object_id(N'dbo.Libro')) create index {nombre} on dbo.Libro ({columnas})")
+
+
+def _columna_version_sqlite(cursor):
+    # SQLite no tiene "add column if not exists": se consulta antes (la columna pudo
+    # crearse a mano, antes de esta migración)
+    columnas = [fila[1] for fila in cursor.execute("pragma table_info(Libro)").fetchall()]
+    if 'Version' not in columnas:
+        cursor.execute("alter table Libro add column Version integer not null default 1")
+
+
+# (versión, descripción, {motor: sentencias}). Cada sentencia es un texto o, para lo que
+# no se puede comprobar en SQL, una función que recibe el cursor. Las migraciones nuevas
+# van al final, con el número siguiente; nunca se modifica una que ya se publicó.
+MIGRACIONES = (
+    (1, "Tabla Libro con clave primaria agrupada por código", {
+        'sqlserver': (
+            "if object_id(N'dbo.Libro', N'U') is null "
+            "create table dbo.Libro (Codigo varchar(20) not null constraint PK_Libro primary key clustered, "
+            "Nombre nvarchar(200) not null, Precio decimal(10, 2) not null, Cantidad int not null, "
+            "Autor nvarchar(150) not null, Edicion nvarchar(50) not null, Isbn varchar(20) not null)",
+        ),
+        # without rowid: la tabla misma es el árbol ordenado por código, como un índice
+        # agrupado. Las columnas de búsqueda son nocase, como la intercalación habitual de
+        # SQL Server: así like 'texto%' no distingue mayúsculas y usa el índice
+        'sqlite': (
+            "create table if not exists Libro (Codigo varchar(20) primary key, "
+            "Nombre varchar(200) collate nocase not null, Precio decimal(10, 2) not null, "
+            "Cantidad int not null, Autor varchar(150) collate nocase not null, "
+            "Edicion varchar(50) not null, Isbn varchar(20) collate nocase not null) without rowid",
+        ),
+    }),
+    # Búsqueda por prefijo y paginación por llave de LibroDao.buscar_libros. El código va
+    # en cada índice para desempatar el orden
+    (2, "Índices de búsqueda por nombre, autor e ISBN", {
+        'sqlserver': (
+            _indice_sqlserver('IX_Libro_Nombre', 'Nombre, Codigo'),
+            _indice_sqlserver('IX_Libro_Autor', 'Autor, Codigo'),
+            _indice_sqlserver('IX_Libro_Isbn', 'Isbn, Codigo'),
+        ),
+        'sqlite': (
+            "create index if not exists IX_Libro_Nombre on Libro (Nombre collate nocase, Codigo)",
+            "create index if not exists IX_Libro_Autor on Libro (Autor collate nocase, Codigo)",
+            "create index if not exists IX_Libro_Isbn on Libro (Isbn collate nocase, Codigo)",
+        ),
+    }),
+    # Concurrencia optimista de LibroDao.usar_versiones: la versión cambia con cada UPDATE
+    (3, "Columna Version para la concurrencia optimista", {
+        # rowversion: SQL Server la cambia sola en cada UPDATE, venga de donde venga
+        'sqlserver': (
+            "if col_length(N'dbo.Libro', N'Version') is null alter table dbo.Libro add Version rowversion",
+        ),
+        # SQLite no tiene rowversion: es un entero que suben las sentencias UPDATE de LibroDao
+        # (ver BackendSqlite.sentencias) y el disparador solo para las que no la cambian
+        'sqlite': (
+            _columna_version_sqlite,
+            "create trigger if not exists TR_Libro_Version after update on Libro "
+            "when new.Version = old.Version begin "
+            "update Libro set Version = old.Version + 1 where Codigo = new.Codigo; end",
+        ),
+    }),
+)
+# Versiones que aplican LibroDao.crear_indices_busqueda y LibroDao.crear_columna_version
+INDICES_BUSQUEDA = 2
+COLUMNA_VERSION = 3
+
+
+class EsquemaLibros:
+    """Aplica y consulta las migraciones de MIGRACIONES sobre una conexión."""
+
+    @staticmethod
+    def _motor(backend: Backend) -> str:
+        if backend.nombre not in _CREAR_VERSIONES:
+            raise ValueError(f"No hay migraciones para el motor {backend.nombre}")
+        return backend.nombre
+
+    @classmethod
+    def version(cls, conexion, backend: Backend) -> int:
+        """Última versión aplicada (0 si la base no tiene EsquemaVersion o está vacía)."""
+        cls._motor(backend)
+        cursor = conexion.cursor()
+        try:
+            return max((fila[0] for fila in cursor.execute(_VERSIONES).fetchall()), default=0)
+        except Exception:
+            conexion.rollback()
+            return 0  # Todavía no existe EsquemaVersion
+        finally:
+            cursor.close()
+
+    @classmethod
+    def pendientes(cls, conexion, backend: Backend) -> list:
+        """Versiones de MIGRACIONES que todavía no se aplicaron."""
+        actual = cls.version(conexion, backend)
+        return [version for version, _, _ in MIGRACIONES if version > actual]
+
+    @classmethod
+    def migrar(cls, conexion, backend: Backend, hasta: int | None = None) -> list:
+        """
+        Aplica las migraciones pendientes, cada una con su propio commit.
+
+        Args:
+            conexion: Conexión DB-API (no hace falta que sea del pool).
+            backend (Backend): Motor de la conexión; elige las sentencias de cada migración.
+            hasta (int, opcional): Última versión que se aplica; por defecto, todas.
+
+        Returns:
+            list: Versiones aplicadas ahora (vacía si la base ya estaba al día).
+
+        Raises:
+            Exception: El error de la migración que falló, después del rollback; las
+                       anteriores quedan aplicadas.
+        """
+        motor = cls._motor(backend)
+        cursor = conexion.cursor()
+        aplicadas = []
+        try:
+            cursor.execute(_CREAR_VERSIONES[motor])
+            conexion.commit()
+            hechas = {fila[0] for fila in cursor.execute(_VERSIONES).fetchall()}
+            for version, descripcion, sentencias in MIGRACIONES:
+                if version in hechas or (hasta is not None and version > hasta):
+                    continue
+                try:
+                    for ddl in sentencias[motor]:
+                        if callable(ddl):
+                            ddl(cursor)
+                        else:
+                            cursor.execute(ddl)
+                    cursor.execute(_REGISTRAR, (version, descripcion, time.strftime('%Y-%m-%d %H:%M:%S'), version))
+                    conexion.commit()
+                except Exception:
+                    conexion.rollback()
+                    raise
+                aplicadas.append(version)
+        finally:
+            cursor.close()
+        return aplicadas
+
+
+def main(argumentos=None) -> int:
+    """Migra (o muestra la versión de) la base configurada en Conexiones."""
+    from src.datos.conexiones import Conexiones
+
+    parser = argparse.ArgumentParser(description="Crea o actualiza la tabla Libro.")
+    parser.add_argument('--estado', action='store_true', help="Solo muestra la versión y lo pendiente")
+    args = parser.parse_args(argumentos)
+    backend = Conexiones.obtenerBackend()
+    try:
+        # Conexión directa, sin el pool: abrirlo ya inicializaría la base
+        conexion = backend.conectar()
+    except Exception as e:
+        print(f"Error al conectar a la base de datos: {e}")
+        return 1
+    try:
+        if args.estado:
+            print(f"{backend!r}: versión {EsquemaLibros.version(conexion, backend)} de {MIGRACIONES[-1][0]}, "
+                  f"pendientes {EsquemaLibros.pendientes(conexion, backend) or 'ninguna'}")
+            return 0
+        aplicadas = EsquemaLibros.migrar(conexion, backend)
+    except Exception as e:
+        print(f"Error al migrar el esquema: {e}")
+        return 1
+    finally:
+        conexion.close()
+    descripciones = dict((version, descripcion) for version, descripcion, _ in MIGRACIONES)
+    for version in aplicadas:
+        print(f"Aplicada la versión {version}: {descripciones[version]}")
+    print(f"{backend!r}: esquema en la versión {MIGRACIONES[-1][0]}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,324 @@
+import bisect
+import json
+import os
+import threading
+import time
+from decimal import Decimal
+
+from src.datos.libroDao import LibroDao
+
+
+class FeedDesbordado(Exception):
+    """
+    Los eventos pedidos ya no están en el feed: se descartaron de memoria y no hay
+    archivo. El consumidor debe releer el catálogo completo y seguir desde
+    FeedCambios.siguiente.
+    """
+
+
+def _a_json(valor):
+    """Convierte los valores que json no conoce (Decimal de SQL Server, rowversion)."""
+    if isinstance(valor, Decimal):
+        return float(valor)
+    if isinstance(valor, (bytes, bytearray)):
+        return valor.hex()
+    raise TypeError(f"Valor no serializable en el feed: {valor!r}")
+
+
+class Evento:
+    """
+    Un cambio confirmado en la tabla Libro, tal como lo avisa LibroDao.suscribir:
+    operacion es 'insertar', 'actualizar', 'upsert', 'ajustar' o 'eliminar' y fila es la
+    tupla (codigo, nombre, precio, cantidad, autor, edicion, Isbn), o None al eliminar.
+    """
+    __slots__ = ('offset', 'operacion', 'codigo', 'fila', 'momento')
+
+    def __init__(self, offset: int, operacion: str, codigo: str, fila: tuple | None, momento: float):
+        self.offset = offset  # Número de orden en el feed, consecutivo desde 0
+        self.operacion = operacion
+        self.codigo = codigo
+        self.fila = fila
+        self.momento = momento  # time.time() al publicarse
+
+    def a_json(self) -> str:
+        return json.dumps([self.offset, self.operacion, self.codigo, self.fila, self.momento],
+                          ensure_ascii=False, separators=(',', ':'), default=_a_json)
+
+    @classmethod
+    def desde_json(cls, linea) -> 'Evento':
+        offset, operacion, codigo, fila, momento = json.loads(linea)
+        return cls(offset, operacion, codigo, tuple(fila) if fila is not None else None, momento)
+
+    def __repr__(self):
+        return f"Evento(offset={self.offset}, operacion={self.operacion!r}, codigo={self.codigo!r})"
+
+
+class Suscripcion:
+    """
+    Un consumidor del feed: recuerda el offset hasta el que procesó. Lo leído se
+    confirma después de procesarlo, así que si el consumidor se cae a mitad de un lote,
+    al volver lo recibe otra vez (cada evento llega al menos una vez).
+    """
+
+    def __init__(self, feed: 'FeedCambios', desde: int):
+        self.feed = feed
+        self.posicion = desde  # Offset del próximo evento por procesar
+        self._ignorada = False  # Dejó de frenar la publicación por estar demasiado atrasada
+
+    @property
+    def retraso(self) -> int:
+        """Eventos publicados que esta suscripción todavía no confirmó."""
+        return self.feed.siguiente - self.posicion
+
+    def leer(self, maximo: int = 500, espera: float | None = None) -> list:
+        """Retorna el siguiente lote sin confirmarlo (ver FeedCambios.leer)."""
+        return self.feed.leer(self.posicion, maximo, espera)
+
+    def confirmar(self, lote: list):
+        """Marca el lote como procesado; el siguiente leer continúa después de él."""
+        if lote:
+            self.feed._avanzar(self, lote[-1].offset + 1)
+
+    def consumir(self, funcion, maximo: int = 500, espera: float = 1.0, detener: threading.Event | None = None):
+        """
+        Lee lotes y llama `funcion(lote)` con cada uno hasta que se active `detener`. El
+        ritmo lo pone el consumidor: un lote nuevo se pide recién cuando `funcion` termina.
+        Si `funcion` lanza una excepción, el lote no se confirma y la excepción se propaga.
+        """
+        while detener is None or not detener.is_set():
+            lote = self.leer(maximo, espera)
+            if lote:
+                funcion(lote)
+                self.confirmar(lote)
+
+    def cerrar(self):
+        """Quita la suscripción del feed (deja de frenar la publicación)."""
+        self.feed._quitar(self)
+
+    def __repr__(self):
+        return f"Suscripcion(posicion={self.posicion}, retraso={self.retraso})"
+
+
+class FeedCambios:
+    """
+    Registro de cambios de la tabla Libro, de solo agregar. Cada escritura confirmada
+    por LibroDao se agrega como un Evento con un offset creciente, y los consumidores
+    (tienda en línea, índice de búsqueda, reportes) leen desde el último offset que
+    procesaron, por lotes, en lugar de consultar la tabla una y otra vez.
+
+        feed = FeedCambios('cambios.jsonl')
+        feed.conectar()
+        suscripcion = feed.suscribir(desde=0)
+        suscripcion.consumir(actualizar_tienda, maximo=500)
+
+    Los últimos `capacidad` eventos se guardan en memoria. Con `ruta`, además se agregan
+    a un archivo JSON Lines: un consumidor atrasado o recién iniciado puede leer desde
+    cualquier offset, y otro proceso puede seguir el archivo abriéndolo con
+    FeedCambios(ruta) sin conectar. Un solo proceso debe publicar en cada archivo.
+
+    Contrapresión: con `max_pendientes`, una escritura espera (hasta `espera_maxima`
+    segundos) mientras alguna suscripción tenga más eventos sin confirmar; pasado ese
+    tiempo la suscripción deja de frenar a las escrituras hasta que se ponga al día.
+
+    Solo registra las escrituras hechas con LibroDao en el proceso conectado; los cambios
+    hechos directamente en la base no aparecen.
+    """
+
+    _PASO_INDICE = 1024  # Cada cuántos eventos se anota su posición en el archivo
+    _ESPERA_ARCHIVO = 0.05  # Segundos entre revisiones del archivo al seguirlo desde otro proceso
+
+    def __init__(self, ruta: str | None = None, capacidad: int = 100_000, max_pendientes: int | None = None,
+                 espera_maxima: float = 5.0, sincronizar: bool = False):
+        """
+        Args:
+            ruta (str, opcional): Archivo del registro; sin él, el feed solo vive en memoria.
+            capacidad (int): Eventos recientes que se guardan en memoria.
+            max_pendientes (int, opcional): Eventos sin confirmar que se toleran antes de
+                                            frenar las escrituras; None para no frenarlas.
+            espera_maxima (float): Segundos que una escritura espera a un consumidor atrasado.
+            sincronizar (bool): Si es True, cada evento se fuerza a disco (os.fsync).
+        """
+        self.ruta = ruta
+        self.capacidad = capacidad
+        self.max_pendientes = max_pendientes
+        self.espera_maxima = espera_maxima
+        self.sincronizar = sincronizar
+        self._condicion = threading.Condition()
+        self._eventos = []  # Los más recientes; _eventos[0] tiene el offset _primero
+        self._primero = 0
+        self._indice = []  # Tuplas (offset, posición en bytes) cada _PASO_INDICE eventos
+        self._leido = 0  # Bytes del archivo ya incorporados
+        self._archivo = None  # Abierto para agregar mientras el feed está conectado
+        self._suscripciones = []
+        if ruta and os.path.exists(ruta):
+            self._leer_archivo()
+
+    @property
+    def siguiente(self) -> int:
+        """Offset que recibirá el próximo evento."""
+        return self._primero + len(self._eventos)
+
+    # --- Publicación ---
+
+    def conectar(self):
+        """Empieza a registrar las escrituras de LibroDao."""
+        with self._condicion:
+            if self.ruta and self._archivo is None:
+                self._leer_archivo()
+                self._archivo = open(self.ruta, 'ab')
+        LibroDao.suscribir(self.publicar)
+
+    def desconectar(self):
+        """Deja de registrar escrituras y cierra el archivo."""
+        LibroDao.desuscribir(self.publicar)
+        with self._condicion:
+            if self._archivo is not None:
+                self._archivo.close()
+                self._archivo = None
+
+    def publicar(self, operacion: str, codigo, fila: tuple | None):
+        """Agrega un evento. Es el observador que conectar() registra en LibroDao."""
+        with self._condicion:
+            if self.max_pendientes is not None and self._suscripciones:
+                self._esperar_consumidores()
+            evento = Evento(self.siguiente, operacion, str(codigo),
+                            tuple(fila) if fila is not None else None, time.time())
+            if self._archivo is not None:
+                linea = evento.a_json().encode('utf-8') + b'\n'
+                if evento.offset % self._PASO_INDICE == 0:
+                    self._indice.append((evento.offset, self._leido))
+                self._archivo.write(linea)
+                # flush en cada evento: quien sigue el archivo lo ve de inmediato
+                self._archivo.flush()
+                if self.sincronizar:
+                    os.fsync(self._archivo.fileno())
+                self._leido += len(linea)
+            self._agregar(evento)
+            self._condicion.notify_all()
+
+    def _agregar(self, evento: Evento):
+        self._eventos.append(evento)
+        # Se recorta de a bloques para no mover la lista en cada evento
+        if len(self._eventos) >= 2 * self.capacidad:
+            sobrantes = len(self._eventos) - self.capacidad
+            del self._eventos[:sobrantes]
+            self._primero += sobrantes
+
+    def _esperar_consumidores(self):
+        limite = time.monotonic() + self.espera_maxima
+        while True:
+            atrasadas = [suscripcion for suscripcion in self._suscripciones if not suscripcion._ignorada
+                         and self.siguiente - suscripcion.posicion >= self.max_pendientes]
+            if not atrasadas:
+                return
+            restante = limite - time.monotonic()
+            if restante <= 0:
+                for suscripcion in atrasadas:
+                    suscripcion._ignorada = True
+                print(f"Feed de cambios: {len(atrasadas)} consumidor(es) atrasado(s); se sigue sin esperarlos")
+                return
+            self._condicion.wait(restante)
+
+    # --- Lectura ---
+
+    def suscribir(self, desde: int | None = None) -> Suscripcion:
+        """
+        Crea una suscripción que lee desde el offset `desde` (por defecto, solo los
+        eventos que se publiquen de ahora en adelante).
+        """
+        with self._condicion:
+            suscripcion = Suscripcion(self, self.siguiente if desde is None else desde)
+            self._suscripciones.append(suscripcion)
+            return suscripcion
+
+    def _avanzar(self, suscripcion: Suscripcion, posicion: int):
+        with self._condicion:
+            suscripcion.posicion = max(suscripcion.posicion, posicion)
+            if suscripcion._ignorada and self.siguiente - suscripcion.posicion < (self.max_pendientes or 0):
+                suscripcion._ignorada = False
+            self._condicion.notify_all()
+
+    def _quitar(self, suscripcion: Suscripcion):
+        with self._condicion:
+            if suscripcion in self._suscripciones:
+                self._suscripciones.remove(suscripcion)
+                self._condicion.notify_all()
+
+    def leer(self, desde: int, maximo: int = 500, espera: float | None = None) -> list:
+        """
+        Retorna hasta `maximo` eventos a partir del offset `desde`, en orden.
+
+        Args:
+            desde (int): Offset del primer evento que se quiere.
+            maximo (int): Tamaño máximo del lote.
+            espera (float, opcional): Si no hay eventos nuevos, segundos que se espera a
+                                      que se publique alguno antes de retornar una lista vacía.
+
+        Raises:
+            FeedDesbordado: Si esos eventos ya no están en memoria y el feed no tiene archivo.
+        """
+        with self._condicion:
+            if desde >= self.siguiente and espera:
+                limite = time.monotonic() + espera
+                while desde >= self.siguiente:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    if self.ruta and self._archivo is None:
+                        # Lector de otro proceso: el archivo es la única fuente de eventos nuevos
+                        self._leer_archivo()
+                        if desde < self.siguiente:
+                            break
+                        self._condicion.wait(min(restante, self._ESPERA_ARCHIVO))
+                    else:
+                        self._condicion.wait(restante)
+            elif self.ruta and self._archivo is None:
+                self._leer_archivo()
+            if desde >= self._primero:
+                inicio = desde - self._primero
+                return self._eventos[inicio:inicio + maximo]
+            if not self.ruta:
+                raise FeedDesbordado(f"El evento {desde} ya no está en el feed (el más antiguo es {self._primero})")
+            entrada = bisect.bisect_right(self._indice, (desde, float('inf'))) - 1
+            posicion = self._indice[entrada][1] if entrada >= 0 else 0
+            maximo = min(maximo, self._primero - desde)
+        # El archivo se lee sin el bloqueo, para no frenar a las escrituras
+        return self._leer_de_disco(posicion, desde, maximo)
+
+    def _leer_archivo(self):
+        """Incorpora a memoria las líneas completas que se agregaron al archivo."""
+        if not os.path.exists(self.ruta):
+            return
+        with open(self.ruta, 'rb') as archivo:
+            archivo.seek(self._leido)
+            datos = archivo.read()
+        fin = datos.rfind(b'\n') + 1  # Una línea a medio escribir se deja para después
+        posicion = 0
+        while posicion < fin:
+            salto = datos.index(b'\n', posicion)
+            evento = Evento.desde_json(datos[posicion:salto])
+            if evento.offset % self._PASO_INDICE == 0:
+                self._indice.append((evento.offset, self._leido + posicion))
+            if not self._eventos:
+                self._primero = evento.offset
+            self._agregar(evento)
+            posicion = salto + 1
+        self._leido += fin
+
+    def _leer_de_disco(self, posicion: int, desde: int, maximo: int) -> list:
+        """Lee eventos antiguos del archivo desde `posicion` (el punto del índice más cercano)."""
+        eventos = []
+        with open(self.ruta, 'rb') as archivo:
+            archivo.seek(posicion)
+            while len(eventos) < maximo:
+                linea = archivo.readline()
+                if not linea.endswith(b'\n'):
+                    break
+                posicion += len(linea)
+                evento = Evento.desde_json(linea)
+                if evento.offset >= desde:
+                    eventos.append(evento)
+        return eventos
+
+    def __repr__(self):
+        return f"FeedCambios(ruta={self.ruta!r}, siguiente={self.siguiente})"
@@ -0,0 +1,282 @@
+import bisect
+import heapq
+import math
+import os
+import pickle
+import re
+import threading
+import unicodedata
+
+from src.datos.libroDao import LibroDao
+
+_NO_ALFANUMERICO = re.compile(r'[^0-9a-z]+')
+_NO_ISBN = re.compile(r'[^0-9X]+')
+
+
+def normalizar(texto) -> str:
+    """Pasa el texto a minúsculas y le quita los acentos ('Gabriel García' -> 'gabriel garcia')."""
+    return unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode('ascii').lower()
+
+
+def tokenizar(texto) -> list:
+    """Divide un texto normalizado en palabras alfanuméricas."""
+    return [token for token in _NO_ALFANUMERICO.split(normalizar(texto)) if token]
+
+
+def normalizar_isbn(isbn) -> str:
+    """Deja solo los dígitos (y la X final de un ISBN-10) para comparar ISBN con o sin guiones."""
+    return _NO_ISBN.sub('', str(isbn).upper())
+
+
+class IndiceLibros:
+    """
+    Índice invertido en memoria del catálogo para búsquedas aproximadas por nombre y
+    autor, con resultados ordenados por relevancia.
+
+    Cada palabra (en minúsculas y sin acentos) apunta a los libros que la contienen, con
+    más peso si aparece en el nombre que en el autor. La última palabra de la consulta
+    también se busca como prefijo, para poder buscar mientras se escribe. El ISBN y el
+    código se buscan de forma exacta.
+
+    El índice se construye leyendo la tabla con LibroDao.recorrer_libros y se mantiene
+    al día suscribiéndose a las escrituras de LibroDao. Puede guardarse en disco para
+    arrancar sin volver a leer toda la tabla.
+    """
+
+    _PESO_NOMBRE = 2.0
+    _PESO_AUTOR = 1.0
+    _FACTOR_PREFIJO = 0.7  # Una coincidencia por prefijo vale menos que una exacta
+    _MAX_EXPANSIONES = 64  # Palabras distintas que puede abarcar un prefijo
+    _VERSION_SNAPSHOT = 1
+
+    def __init__(self):
+        self._bloqueo = threading.RLock()
+        self._documentos = {}  # codigo -> (nombre, autor, isbn, ((palabra, peso), ...))
+        self._postings = {}  # palabra -> {codigo: peso}
+        self._isbn = {}  # isbn normalizado -> set de códigos
+        self._vocabulario = []  # Palabras ordenadas, para expandir prefijos con bisect
+
+    def __len__(self):
+        return len(self._documentos)
+
+    # --- Mantenimiento ---
+
+    def agregar(self, codigo, nombre, autor, isbn):
+        """Agrega un libro al índice o reemplaza su entrada si ya estaba."""
+        codigo = str(codigo)
+        pesos = {}
+        for palabra in tokenizar(nombre):
+            pesos[palabra] = pesos.get(palabra, 0.0) + self._PESO_NOMBRE
+        for palabra in tokenizar(autor):
+            pesos[palabra] = pesos.get(palabra, 0.0) + self._PESO_AUTOR
+        with self._bloqueo:
+            if codigo in self._documentos:
+                self._quitar(codigo)
+            self._documentos[codigo] = (nombre, autor, isbn, tuple(pesos.items()))
+            for palabra, peso in pesos.items():
+                posting = self._postings.get(palabra)
+                if posting is None:
+                    posting = self._postings[palabra] = {}
+                    bisect.insort(self._vocabulario, palabra)
+                posting[codigo] = peso
+            if isbn:
+                self._isbn.setdefault(normalizar_isbn(isbn), set()).add(codigo)
+
+    def eliminar(self, codigo):
+        """Quita un libro del índice; no hace nada si no estaba."""
+        with self._bloqueo:
+            if str(codigo) in self._documentos:
+                self._quitar(str(codigo))
+
+    def _quitar(self, codigo):
+        """Quita un libro presente en el índice. Debe llamarse con el bloqueo tomado."""
+        _, _, isbn, pesos = self._documentos.pop(codigo)
+        for palabra, _ in pesos:
+            posting = self._postings[palabra]
+            del posting[codigo]
+            if not posting:
+                del self._postings[palabra]
+                del self._vocabulario[bisect.bisect_left(self._vocabulario, palabra)]
+        if isbn:
+            clave = normalizar_isbn(isbn)
+            codigos = self._isbn.get(clave)
+            if codigos is not None:
+                codigos.discard(codigo)
+                if not codigos:
+                    del self._isbn[clave]
+
+    def _al_cambiar(self, operacion, codigo, fila):
+        """Observador de LibroDao: aplica cada escritura confirmada al índice."""
+        if operacion == 'ajustar':
+            return  # Solo cambió la cantidad, que no se indexa
+        if operacion == 'eliminar':
+            self.eliminar(codigo)
+        elif operacion == 'actualizar' and str(codigo) not in self._documentos:
+            return  # Un 'actualizar' masivo puede referirse a un código inexistente
+        else:
+            self.agregar(fila[0], fila[1], fila[4], fila[6])
+
+    def conectar(self):
+        """Se suscribe a las escrituras de LibroDao para mantenerse al día."""
+        LibroDao.suscribir(self._al_cambiar)
+
+    def desconectar(self):
+        """Deja de recibir las escrituras de LibroDao."""
+        LibroDao.desuscribir(self._al_cambiar)
+
+    def construir(self, tamano_lote: int | None = None) -> int:
+        """
+        Vacía el índice y lo llena leyendo toda la tabla Libro en bloques.
+
+        Returns:
+            int: Número de libros indexados.
+        """
+        with self._bloqueo:
+            self._documentos.clear()
+            self._postings.clear()
+            self._isbn.clear()
+            self._vocabulario.clear()
+        for codigo, nombre, _, _, autor, _, isbn in LibroDao.recorrer_libros(tamano_lote):
+            self.agregar(codigo, nombre, autor, isbn)
+        return len(self)
+
+    # --- Consultas ---
+
+    def buscar(self, consulta: str, k: int = 10) -> list:
+        """
+        Busca libros por palabras del nombre o del autor, o por ISBN o código exactos.
+
+        Los libros que contienen más palabras de la consulta van primero; entre ellos se
+        ordena por relevancia (palabras poco comunes y del nombre pesan más).
+
+        Args:
+            consulta (str): Texto libre, por ejemplo 'garcia marquez soledad'.
+            k (int): Número máximo de resultados.
+
+        Returns:
+            list: Tuplas (codigo, puntaje) de mayor a menor relevancia.
+        """
+        with self._bloqueo:
+            exactos = self._buscar_exacto(consulta)
+            if exactos:
+                return [(codigo, math.inf) for codigo in exactos[:k]]
+
+            palabras = list(dict.fromkeys(tokenizar(consulta)))
+            total = len(self._documentos)
+            # Por cada palabra: lista de (posting, multiplicador) de las palabras que la cubren
+            terminos = []
+            for posicion, palabra in enumerate(palabras):
+                candidatas = [(palabra, 1.0)] if palabra in self._postings else []
+                if not candidatas or posicion == len(palabras) - 1:
+                    candidatas.extend((otra, self._FACTOR_PREFIJO) for otra in self._expandir(palabra)
+                                      if otra != palabra)
+                if candidatas:
+                    terminos.append([(self._postings[candidata],
+                                      factor * math.log(1.0 + total / len(self._postings[candidata])))
+                                     for candidata, factor in candidatas])
+            if not terminos:
+                return []
+
+            # Camino rápido: si al menos k libros contienen todas las palabras, solo se
+            # puntúan esos (la intersección de conjuntos se hace en C, no en el bucle).
+            conjuntos = sorted((set().union(*(posting.keys() for posting, _ in termino))
+                                for termino in terminos), key=len)
+            todos = conjuntos[0].intersection(*conjuntos[1:])
+            if len(todos) >= k:
+                candidatos = todos
+            else:
+                candidatos = set().union(*conjuntos)
+
+            puntajes = {}
+            coincidencias = {}
+            for termino in terminos:
+                for codigo in candidatos:
+                    puntaje = 0.0
+                    for posting, multiplicador in termino:
+                        peso = posting.get(codigo)
+                        if peso is not None:
+                            puntaje += peso * multiplicador
+                    if puntaje:
+                        puntajes[codigo] = puntajes.get(codigo, 0.0) + puntaje
+                        coincidencias[codigo] = coincidencias.get(codigo, 0) + 1
+            mejores = heapq.nlargest(k, puntajes, key=lambda codigo: (coincidencias[codigo], puntajes[codigo]))
+            return [(codigo, puntajes[codigo]) for codigo in mejores]
+
+    def _buscar_exacto(self, consulta: str) -> list:
+        """Códigos cuyo código o ISBN coincide exactamente con la consulta."""
+        consulta = consulta.strip()
+        if consulta in self._documentos:
+            return [consulta]
+        isbn = normalizar_isbn(consulta)
+        if len(isbn) >= 10 and isbn in self._isbn:
+            return sorted(self._isbn[isbn])
+        return []
+
+    def _expandir(self, prefijo: str) -> list:
+        """Palabras del vocabulario que empiezan con el prefijo (hasta _MAX_EXPANSIONES)."""
+        inicio = bisect.bisect_left(self._vocabulario, prefijo)
+        palabras = []
+        for palabra in self._vocabulario[inicio:inicio + self._MAX_EXPANSIONES]:
+            if not palabra.startswith(prefijo):
+                break
+            palabras.append(palabra)
+        return palabras
+
+    def documento(self, codigo) -> tuple | None:
+        """Retorna (nombre, autor, isbn) de un libro indexado, o None."""
+        entrada = self._documentos.get(str(codigo))
+        return entrada[:3] if entrada is not None else None
+
+    # --- Snapshot en disco ---
+
+    def guardar(self, ruta: str):
+        """
+        Guarda el índice en un archivo para un arranque rápido. Se escribe en un archivo
+        temporal y luego se reemplaza, para no dejar un snapshot a medio escribir.
+        """
+        with self._bloqueo:
+            datos = {'version': self._VERSION_SNAPSHOT, 'documentos': self._documentos,
+                     'postings': self._postings, 'isbn': self._isbn}
+            temporal = ruta + '.tmp'
+            with open(temporal, 'wb') as archivo:
+                pickle.dump(datos, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporal, ruta)
+
+    @classmethod
+    def cargar(cls, ruta: str) -> 'IndiceLibros':
+        """
+        Carga un índice guardado con guardar(). Solo debe usarse con archivos generados
+        por la propia aplicación (pickle puede ejecutar código al cargar).
+
+        Raises:
+            ValueError: Si el archivo es de otra versión del formato.
+        """
+        with open(ruta, 'rb') as archivo:
+            datos = pickle.load(archivo)
+        if datos.get('version') != cls._VERSION_SNAPSHOT:
+            raise ValueError(f"Versión de snapshot no soportada: {datos.get('version')}")
+        indice = cls()
+        indice._documentos = datos['documentos']
+        indice._postings = datos['postings']
+        indice._isbn = datos['isbn']
+        indice._vocabulario = sorted(indice._postings)
+        return indice
+
+    @classmethod
+    def iniciar(cls, ruta_snapshot: str | None = None) -> 'IndiceLibros':
+        """
+        Crea el índice listo para usar: lo carga del snapshot si existe o lo construye desde
+        la base de datos, y lo suscribe a las escrituras de LibroDao. Los cambios hechos
+        por otros equipos después de guardar el snapshot no aparecen hasta reconstruirlo.
+        """
+        if ruta_snapshot and os.path.exists(ruta_snapshot):
+            indice = cls.cargar(ruta_snapshot)
+            indice.conectar()
+        else:
+            indice = cls()
+            # Se suscribe antes de leer la tabla para no perder escrituras simultáneas
+            indice.conectar()
+            indice.construir()
+            if ruta_snapshot:
+                indice.guardar(ruta_snapshot)
+        return indice
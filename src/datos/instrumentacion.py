@@ -0,0 +1,401 @@
+import bisect
+import collections
+import logging
+import os
+import re
+import string
+import threading
+import time
+
+
+class Histograma:
+    """
+    Histograma de duraciones (en segundos) con cubetas fijas, compatible con el formato
+    de Prometheus. Guarda solo conteos, así que su tamaño no crece con las observaciones.
+    """
+
+    LIMITES = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+    def __init__(self):
+        self.cubetas = [0] * (len(self.LIMITES) + 1)  # La última es +Inf
+        self.cuenta = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def observar(self, valor: float):
+        self.cubetas[bisect.bisect_left(self.LIMITES, valor)] += 1
+        self.cuenta += 1
+        self.suma += valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def percentil(self, fraccion: float) -> float:
+        """Límite superior de la cubeta que contiene el percentil pedido (0.5 = mediana)."""
+        if not self.cuenta:
+            return 0.0
+        objetivo = fraccion * self.cuenta
+        acumulado = 0
+        for indice, conteo in enumerate(self.cubetas):
+            acumulado += conteo
+            if acumulado >= objetivo:
+                return self.LIMITES[indice] if indice < len(self.LIMITES) else self.maximo
+        return self.maximo
+
+    def resumen(self) -> dict:
+        return {'cuenta': self.cuenta, 'promedio': self.suma / self.cuenta if self.cuenta else 0.0,
+                'p50': self.percentil(0.5), 'p99': self.percentil(0.99), 'maximo': self.maximo}
+
+
+class Sumidero:
+    """
+    Destino de las mediciones de Instrumentacion. Las subclases reemplazan los métodos
+    que les interesan; los demás no hacen nada. Se llaman desde los hilos que usan la
+    base de datos, así que deben ser rápidos y seguros entre hilos.
+    """
+
+    def consulta(self, nombre: str, segundos: float, filas: int):
+        """Una sentencia terminó: `filas` son las afectadas o leídas."""
+
+    def consulta_lenta(self, nombre: str, segundos: float, sql: str):
+        """Una sentencia tardó más que el umbral de consultas lentas."""
+
+    def prestamo(self, segundos: float):
+        """Se obtuvo una conexión del pool después de esperar `segundos`."""
+
+    def error(self, nombre: str, excepcion: Exception):
+        """Una sentencia (o el préstamo de una conexión, con nombre 'prestamo') falló."""
+
+
+class SumideroMemoria(Sumidero):
+    """Acumula las mediciones en memoria; instantanea() las devuelve como diccionario."""
+
+    def __init__(self, max_lentas: int = 100):
+        """
+        Args:
+            max_lentas (int): Consultas lentas recientes que se conservan.
+        """
+        self._bloqueo = threading.Lock()
+        self._max_lentas = max_lentas
+        self.limpiar()
+
+    def limpiar(self):
+        with self._bloqueo:
+            self.consultas = collections.defaultdict(Histograma)  # nombre -> Histograma
+            self.filas = collections.Counter()  # nombre -> filas
+            self.prestamos = Histograma()
+            self.errores = collections.Counter()  # (nombre, tipo de excepción) -> veces
+            self.lentas = collections.deque(maxlen=self._max_lentas)  # (hora, nombre, segundos, sql)
+            self.total_lentas = 0
+
+    def consulta(self, nombre, segundos, filas):
+        with self._bloqueo:
+            self.consultas[nombre].observar(segundos)
+            self.filas[nombre] += filas
+
+    def consulta_lenta(self, nombre, segundos, sql):
+        with self._bloqueo:
+            self.lentas.append((time.time(), nombre, segundos, sql))
+            self.total_lentas += 1
+
+    def prestamo(self, segundos):
+        with self._bloqueo:
+            self.prestamos.observar(segundos)
+
+    def error(self, nombre, excepcion):
+        with self._bloqueo:
+            self.errores[(nombre, type(excepcion).__name__)] += 1
+
+    def instantanea(self) -> dict:
+        """
+        Returns:
+            dict: 'consultas' (nombre -> resumen del histograma y filas), 'prestamos',
+                  'errores' ('nombre/Tipo' -> veces) y 'lentas' (las más recientes).
+        """
+        with self._bloqueo:
+            return {'consultas': {nombre: dict(histograma.resumen(), filas=self.filas[nombre])
+                                  for nombre, histograma in self.consultas.items()},
+                    'prestamos': self.prestamos.resumen(),
+                    'errores': {f'{nombre}/{tipo}': veces for (nombre, tipo), veces in self.errores.items()},
+                    'lentas': list(self.lentas)}
+
+
+class SumideroLogging(Sumidero):
+    """
+    Envía las mediciones al módulo logging: cada sentencia en DEBUG, las consultas
+    lentas en WARNING y los errores en ERROR.
+    """
+
+    def __init__(self, logger: logging.Logger | str = 'src.datos'):
+        self.logger = logging.getLogger(logger) if isinstance(logger, str) else logger
+
+    def consulta(self, nombre, segundos, filas):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("%s: %.3f ms, %d filas", nombre, segundos * 1000, filas)
+
+    def consulta_lenta(self, nombre, segundos, sql):
+        self.logger.warning("Consulta lenta %s: %.3f ms: %s", nombre, segundos * 1000, sql)
+
+    def prestamo(self, segundos):
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug("Conexión obtenida en %.3f ms", segundos * 1000)
+
+    def error(self, nombre, excepcion):
+        self.logger.error("Error en %s: %s: %s", nombre, type(excepcion).__name__, excepcion)
+
+
+class SumideroPrometheus(SumideroMemoria):
+    """
+    Acumula en memoria y escribe un archivo en formato de texto de Prometheus, para el
+    textfile collector de node_exporter. El archivo se reescribe como máximo cada
+    `intervalo` segundos (o al llamar a escribir()), reemplazándolo de una sola vez para
+    que nunca se lea a medio escribir.
+    """
+
+    def __init__(self, ruta: str, intervalo: float = 15.0, prefijo: str = 'libreria'):
+        """
+        Args:
+            ruta (str): Archivo .prom de destino.
+            intervalo (float): Segundos mínimos entre escrituras automáticas.
+            prefijo (str): Prefijo de los nombres de las métricas.
+        """
+        super().__init__()
+        self.ruta = ruta
+        self.intervalo = intervalo
+        self.prefijo = prefijo
+        self._ultima_escritura = time.monotonic()
+
+    def _quizas_escribir(self):
+        if time.monotonic() - self._ultima_escritura >= self.intervalo:
+            self.escribir()
+
+    def consulta(self, nombre, segundos, filas):
+        super().consulta(nombre, segundos, filas)
+        self._quizas_escribir()
+
+    def error(self, nombre, excepcion):
+        super().error(nombre, excepcion)
+        self._quizas_escribir()
+
+    def _histograma(self, lineas, metrica, histograma, etiquetas=''):
+        acumulado = 0
+        separador = ',' if etiquetas else ''
+        for limite, conteo in zip(Histograma.LIMITES + (None,), histograma.cubetas):
+            acumulado += conteo
+            le = '+Inf' if limite is None else repr(limite)
+            lineas.append(f'{metrica}_bucket{{{etiquetas}{separador}le="{le}"}} {acumulado}')
+        sufijo = f'{{{etiquetas}}}' if etiquetas else ''
+        lineas.append(f'{metrica}_sum{sufijo} {histograma.suma!r}')
+        lineas.append(f'{metrica}_count{sufijo} {histograma.cuenta}')
+
+    def texto(self) -> str:
+        """Retorna las métricas en formato de exposición de texto de Prometheus."""
+        p = self.prefijo
+        with self._bloqueo:
+            lineas = [f'# HELP {p}_consulta_segundos Duración de cada sentencia de LibroDao.',
+                      f'# TYPE {p}_consulta_segundos histogram']
+            for nombre, histograma in sorted(self.consultas.items()):
+                self._histograma(lineas, f'{p}_consulta_segundos', histograma, f'sentencia="{nombre}"')
+            lineas += [f'# HELP {p}_consulta_filas_total Filas afectadas o leídas por sentencia.',
+                       f'# TYPE {p}_consulta_filas_total counter']
+            lineas += [f'{p}_consulta_filas_total{{sentencia="{nombre}"}} {filas}'
+                       for nombre, filas in sorted(self.filas.items())]
+            lineas += [f'# HELP {p}_prestamo_segundos Espera por una conexión del pool.',
+                       f'# TYPE {p}_prestamo_segundos histogram']
+            self._histograma(lineas, f'{p}_prestamo_segundos', self.prestamos)
+            lineas += [f'# HELP {p}_errores_total Errores por sentencia y tipo de excepción.',
+                       f'# TYPE {p}_errores_total counter']
+            lineas += [f'{p}_errores_total{{sentencia="{nombre}",tipo="{tipo}"}} {veces}'
+                       for (nombre, tipo), veces in sorted(self.errores.items())]
+            lineas += [f'# HELP {p}_consultas_lentas_total Sentencias por encima del umbral.',
+                       f'# TYPE {p}_consultas_lentas_total counter',
+                       f'{p}_consultas_lentas_total {self.total_lentas}']
+        return '\n'.join(lineas) + '\n'
+
+    def escribir(self):
+        """Escribe el archivo de métricas ahora."""
+        self._ultima_escritura = time.monotonic()
+        temporal = f'{self.ruta}.{os.getpid()}.tmp'
+        with open(temporal, 'w', encoding='utf-8') as archivo:
+            archivo.write(self.texto())
+        os.replace(temporal, self.ruta)
+
+
+class _CursorMedido:
+    """
+    Envuelve un cursor y mide cada sentencia desde execute hasta la siguiente sentencia
+    o el cierre del cursor, incluyendo la lectura de las filas con fetch*.
+    """
+
+    def __init__(self, cursor):
+        object.__setattr__(self, '_cursor', cursor)
+        object.__setattr__(self, '_medida', None)  # [nombre, sql, segundos, filas]
+
+    def _terminar(self):
+        medida = self._medida
+        if medida is not None:
+            object.__setattr__(self, '_medida', None)
+            Instrumentacion._consulta(*medida)
+
+    def _ejecutar(self, metodo, sql, args):
+        self._terminar()
+        nombre = Instrumentacion.nombre_de(sql)
+        inicio = time.perf_counter()
+        try:
+            metodo(sql, *args)
+        except Exception as e:
+            Instrumentacion._error(nombre, e)
+            raise
+        segundos = time.perf_counter() - inicio
+        filas = self._cursor.rowcount
+        object.__setattr__(self, '_medida', [nombre, sql, segundos, filas if filas and filas > 0 else 0])
+        return self
+
+    def execute(self, sql, *args):
+        return self._ejecutar(self._cursor.execute, sql, args)
+
+    def executemany(self, sql, *args):
+        return self._ejecutar(self._cursor.executemany, sql, args)
+
+    def _leer(self, metodo, *args):
+        inicio = time.perf_counter()
+        resultado = metodo(*args)
+        medida = self._medida
+        if medida is not None:
+            medida[2] += time.perf_counter() - inicio
+            if isinstance(resultado, list):
+                medida[3] += len(resultado)
+            elif resultado is not None:
+                medida[3] += 1
+        return resultado
+
+    def fetchone(self):
+        return self._leer(self._cursor.fetchone)
+
+    def fetchall(self):
+        return self._leer(self._cursor.fetchall)
+
+    def fetchmany(self, *args):
+        return self._leer(self._cursor.fetchmany, *args)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def close(self):
+        self._terminar()
+        self._cursor.close()
+
+    def __getattr__(self, nombre):
+        return getattr(self._cursor, nombre)
+
+    def __setattr__(self, nombre, valor):
+        # Por ejemplo cursor.fast_executemany = True va al cursor real
+        setattr(self._cursor, nombre, valor)
+
+
+class _ConexionMedida:
+    """Envuelve una conexión para que sus cursores midan las sentencias."""
+
+    def __init__(self, conexion):
+        self._conexion = conexion
+
+    def cursor(self):
+        return _CursorMedido(self._conexion.cursor())
+
+    def __getattr__(self, nombre):
+        return getattr(self._conexion, nombre)
+
+
+class Instrumentacion:
+    """
+    Mediciones de la capa de datos: duración y filas de cada sentencia (identificada por
+    su nombre en LibroDao, como '_INSERT' o '_SELECT'), tiempo de espera por una conexión
+    del pool, errores por tipo de excepción y registro de consultas lentas.
+
+    Está desactivada por defecto. Con activar() las conexiones que entrega Conexiones se
+    envuelven para medir; desactivada, el único costo es comprobar activa() por cada
+    conexión prestada.
+    """
+
+    _sumideros = ()  # Tupla (no lista) para recorrerla sin bloqueo desde cualquier hilo
+    _umbral_lento = 0.5  # Segundos a partir de los cuales una consulta se considera lenta
+    _nombres = {}  # sql -> nombre, incluidas las variantes ya resueltas de las plantillas
+    _plantillas = []  # (expresión regular, nombre) de las sentencias con {campos}
+    _bloqueo = threading.Lock()
+
+    @classmethod
+    def activar(cls, *sumideros: Sumidero, umbral_lento: float | None = None):
+        """
+        Empieza a medir y envía las mediciones a los sumideros indicados.
+
+        Args:
+            sumideros (Sumidero): Por ejemplo SumideroMemoria() y SumideroLogging().
+            umbral_lento (float, opcional): Segundos a partir de los cuales se avisa
+                                            de una consulta lenta.
+        """
+        if umbral_lento is not None:
+            cls._umbral_lento = umbral_lento
+        cls._sumideros = tuple(sumideros)
+
+    @classmethod
+    def desactivar(cls):
+        cls._sumideros = ()
+
+    @classmethod
+    def activa(cls) -> bool:
+        """True si hay sumideros recibiendo mediciones (ver activar)."""
+        return bool(cls._sumideros)
+
+    @classmethod
+    def registrar(cls, nombre: str, sql: str):
+        """
+        Asocia una sentencia con el nombre con que aparece en las mediciones. Las
+        plantillas con campos ({marcadores}, {columna}...) se reconocen ya formateadas.
+        """
+        with cls._bloqueo:
+            if '{' not in sql:
+                cls._nombres[sql] = nombre
+                return
+            patron = ''.join(re.escape(literal) + ('.*?' if campo is not None else '')
+                             for literal, campo, _, _ in string.Formatter().parse(sql))
+            cls._plantillas.append((re.compile(patron, re.DOTALL), nombre))
+
+    @classmethod
+    def nombre_de(cls, sql: str) -> str:
+        """Nombre registrado de una sentencia, o su primera palabra si no se registró."""
+        nombre = cls._nombres.get(sql)
+        if nombre is None:
+            for patron, candidato in cls._plantillas:
+                if patron.fullmatch(sql):
+                    nombre = candidato
+                    break
+            else:
+                nombre = sql.split(None, 1)[0].lower() if sql.strip() else 'vacia'
+            with cls._bloqueo:
+                # Las variantes son pocas (IN con potencias de 2, TOP por página), pero se
+                # acota por si alguna sentencia se arma con valores literales
+                if len(cls._nombres) < 10_000:
+                    cls._nombres[sql] = nombre
+        return nombre
+
+    @classmethod
+    def envolver(cls, conexion):
+        """Envuelve una conexión para medir sus sentencias."""
+        return _ConexionMedida(conexion)
+
+    @classmethod
+    def _consulta(cls, nombre, sql, segundos, filas):
+        lenta = segundos >= cls._umbral_lento
+        for sumidero in cls._sumideros:
+            sumidero.consulta(nombre, segundos, filas)
+            if lenta:
+                sumidero.consulta_lenta(nombre, segundos, sql)
+
+    @classmethod
+    def _prestamo(cls, segundos):
+        for sumidero in cls._sumideros:
+            sumidero.prestamo(segundos)
+
+    @classmethod
+    def _error(cls, nombre, excepcion):
+        for sumidero in cls._sumideros:
+            sumidero.error(nombre, excepcion)
@@ -1,7 +1,92 @@
 
+import os
+from contextlib import nullcontext
+from itertools import islice
+
+from src.datos.cacheLibros import CacheLRU
 from src.datos.conexiones import Conexiones
+from src.datos.instrumentacion import Instrumentacion
+from src.datos.unidadTrabajo import TransaccionFallida, UnidadDeTrabajo
+from src.dominio.loteLibros import LoteLibros
 from src.dominio.libro import Libro # Asumiendo que la clase 'Libro' está definida en otro lugar
 
+
+class _AjusteRechazado(Exception):
+    """Interna: provoca el rollback de ajustar_cantidades con todo_o_nada."""
+
+
+def _en_lotes(iterable, tamano):
+    """
+    Recorre un iterable en bloques de `tamano` elementos sin cargarlo completo en memoria.
+
+    Yields:
+        tuple: (posición del primer elemento del bloque, lista con el bloque).
+    """
+    iterador = iter(iterable)
+    inicio = 0
+    while True:
+        lote = list(islice(iterador, tamano))
+        if not lote:
+            return
+        yield inicio, lote
+        inicio += len(lote)
+
+
+class ResultadoLote:
+    """
+    Resultado de una operación masiva de LibroDao: cuántos libros se grabaron y qué filas
+    fallaron. Un error en una fila no detiene la carga del resto.
+
+    Con `max_errores` solo se guardan los primeros errores (fallidos los cuenta todos), y
+    `al_fallar` recibe cada uno en el momento: así una carga enorme con muchas filas malas
+    no acumula sus errores en memoria.
+    """
+    def __init__(self, max_errores: int | None = None, al_fallar=None):
+        self.procesados = 0  # Filas ejecutadas sin error
+        self.errores = []  # Tuplas (posición en la entrada, código del libro, mensaje de error)
+        self.ultimo_error = None  # La última tupla registrada, aunque no quepa en errores
+        self.detenido = False  # True si la carga se detuvo antes de terminar (ver _ejecutar_lotes)
+        self._fallidos = 0
+        self._max_errores = max_errores
+        self._al_fallar = al_fallar
+
+    def agregar_error(self, indice, codigo, error):
+        """Registra la falla de una fila."""
+        self.ultimo_error = (indice, codigo, str(error))
+        self._fallidos += 1
+        if self._max_errores is None or len(self.errores) < self._max_errores:
+            self.errores.append(self.ultimo_error)
+        if self._al_fallar is not None:
+            self._al_fallar(*self.ultimo_error)
+
+    @property
+    def fallidos(self) -> int:
+        """Número de filas que no se pudieron grabar."""
+        return self._fallidos
+
+    def __repr__(self):
+        return f"ResultadoLote(procesados={self.procesados}, fallidos={self.fallidos})"
+
+
+class ConflictoVersion(int):
+    """
+    Resultado de actualizar_libro o eliminar_libro cuando el libro cambió en la base de
+    datos desde que se leyó (su versión ya no coincide) y por eso no se grabó nada.
+
+    Es un entero que vale LibroDao._CONFLICTO (-3), así que el código que solo compara
+    con _ERROR o con 0 lo sigue tratando como "no se grabó". En `actual` trae el libro
+    tal como está ahora en la base, con su versión nueva, para mostrarlo o reintentar.
+    """
+    def __new__(cls, codigo, actual: Libro):
+        conflicto = super().__new__(cls, -3)
+        conflicto.codigo = codigo
+        conflicto.actual = actual
+        return conflicto
+
+    def __repr__(self):
+        return f"ConflictoVersion(codigo={self.codigo!r}, version={self.actual.version!r})"
+
+
 class LibroDao:
     """
     Objeto de Acceso a Datos (DAO) para la entidad Libro.
@@ -18,6 +103,279 @@ class LibroDao:
     _UPDATE = ("update Libro set Nombre=?, Precio=?, Cantidad=?, "
                "Autor=?, Edicion=?, Isbn=? where Codigo=?")
     _DELETE = "delete from Libro where Codigo = ?"
+    # Actualización de solo los campos que cambiaron (ver actualizar_libro). Las sentencias
+    # se arman una vez por combinación de campos y se guardan en _updates_parciales.
+    _UPDATE_PARCIAL = "update Libro set {asignaciones} where Codigo=?"
+    _COLUMNAS_UPDATE = (('nombre', 'Nombre'), ('precio', 'Precio'), ('cantidad', 'Cantidad'),
+                        ('autor', 'Autor'), ('edicion', 'Edicion'), ('Isbn', 'Isbn'))
+    _updates_parciales = {}  # (plantilla, frozenset de campos) -> (sentencia, campos en orden)
+    # Concurrencia optimista (ver usar_versiones): la columna Version cambia con cada UPDATE
+    # de la fila, y se actualiza o elimina solo si sigue siendo la versión que se leyó. Así
+    # dos cajeros que editan el mismo libro no se pisan, sin bloquear la fila mientras editan.
+    _SELECT_VERSION = ("select Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn, Version from Libro "
+                       "where Codigo = ?")
+    _SELECT_VARIOS_VERSION = ("select Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn, Version "
+                              "from Libro where Codigo in ({marcadores})")
+    _UPDATE_VERSION = ("update Libro set {asignaciones} output inserted.Version "
+                       "where Codigo=? and Version=?")
+    _DELETE_VERSION = "delete from Libro where Codigo = ? and Version = ?"
+    _CONFLICTO = -3  # Valor de ConflictoVersion
+    _versionado = os.environ.get('LIBRERIA_VERSIONES') == '1'
+    # MERGE para insertar o actualizar en una sola sentencia; HOLDLOCK evita que dos cargas
+    # simultáneas inserten el mismo código.
+    _UPSERT = ("merge Libro with (holdlock) as destino "
+               "using (values (?, ?, ?, ?, ?, ?, ?)) "
+               "as origen (Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn) "
+               "on destino.Codigo = origen.Codigo "
+               "when matched then update set Nombre=origen.Nombre, Precio=origen.Precio, "
+               "Cantidad=origen.Cantidad, Autor=origen.Autor, Edicion=origen.Edicion, Isbn=origen.Isbn "
+               "when not matched then insert (Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn) "
+               "values (origen.Codigo, origen.Nombre, origen.Precio, origen.Cantidad, "
+               "origen.Autor, origen.Edicion, origen.Isbn);")
+    _SELECT_TODOS = ("select Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn from Libro "
+                     "order by Codigo")
+    # Página del catálogo ordenado por código, desde el código siguiente al último visto
+    _PAGINA = ("select {top}Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn from Libro "
+               "where Codigo > ? order by Codigo{limit}")
+    _PAGINA_VERSION = ("select {top}Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn, Version from Libro "
+                       "where Codigo > ? order by Codigo{limit}")
+    _SELECT_VARIOS = ("select Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn from Libro "
+                      "where Codigo in ({marcadores})")
+    # Ajuste de stock en una sola sentencia: la condición impide que la cantidad quede
+    # negativa aunque dos cajas vendan el mismo libro a la vez, y OUTPUT devuelve la fila
+    # ya actualizada sin una segunda consulta.
+    _AJUSTAR = ("update Libro set Cantidad = Cantidad + ? "
+                "output inserted.Codigo, inserted.Nombre, inserted.Precio, inserted.Cantidad, "
+                "inserted.Autor, inserted.Edicion, inserted.Isbn "
+                "where Codigo = ? and Cantidad + ? >= 0")
+    _AJUSTAR_VARIOS = ("update L set Cantidad = L.Cantidad + V.Delta "
+                       "output inserted.Codigo, inserted.Nombre, inserted.Precio, inserted.Cantidad, "
+                       "inserted.Autor, inserted.Edicion, inserted.Isbn "
+                       "from Libro as L join (values {valores}) as V (Codigo, Delta) on L.Codigo = V.Codigo "
+                       "where L.Cantidad + V.Delta >= 0")
+    _SELECT_CANTIDAD = "select Cantidad from Libro where Codigo = ?"
+    _SELECT_EXISTENTES = "select Codigo from Libro where Codigo in ({marcadores})"
+    _SIN_STOCK = -2  # Devuelto por ajustar_cantidad si el ajuste dejaría la cantidad negativa
+    # Búsqueda por texto con paginación por llave (keyset): cada página continúa después de
+    # la última fila de la anterior en lugar de saltar filas con OFFSET, así que la página
+    # 1000 cuesta lo mismo que la primera. El prefijo se busca con like 'texto%': los dos
+    # motores lo resuelven como un rango del índice calculado con la intercalación de la
+    # columna (sin distinguir mayúsculas). {top}/{limit} dependen del backend.
+    _BUSCAR = ("select {top}Codigo, Nombre, Precio, Cantidad, Autor, Edicion, Isbn from Libro "
+               "where {condiciones} order by {columna}, Codigo{limit}")
+    _BUSCAR_PREFIJO = "{columna} like ? escape '\\'"
+    _BUSCAR_CONTIENE = "{columna} like ? escape '\\'"
+    # SQL Server no tiene comparación de tuplas (BackendSqlite la reemplaza por una)
+    _BUSCAR_DESPUES = "({columna} > ? or ({columna} = ? and Codigo > ?))"
+    # Columna de la tabla y posición en la fila devuelta, por cada campo de búsqueda
+    _CAMPOS_BUSQUEDA = {'nombre': ('Nombre', 1), 'autor': ('Autor', 4), 'isbn': ('Isbn', 6)}
+    # Agregados del inventario calculados en el servidor (ver agregados_inventario)
+    _TOTALES = "select count(*), sum(Cantidad), sum(Precio * Cantidad) from Libro"
+    _TOTALES_POR = "select {columna}, count(*), sum(Cantidad), sum(Precio * Cantidad) from Libro group by {columna}"
+    _BAJO_STOCK = "select Codigo, Nombre, Cantidad from Libro where Cantidad <= ? order by Cantidad, Codigo"
+    # Precios en las posiciones pedidas (desde 0) del catálogo ordenado por precio, con
+    # un solo ordenamiento para todos los percentiles
+    _PRECIOS_EN_POSICIONES = ("select Posicion, Precio from (select Precio, "
+                              "row_number() over (order by Precio) - 1 as Posicion from Libro) as P "
+                              "where Posicion in ({marcadores})")
+    _TAMANO_LOTE = 1000  # Filas por lote (y por commit) en las operaciones masivas
+    _MAX_PARAMETROS = 2000  # Tope de parámetros por sentencia, además del límite del backend
+    _cache = None  # Caché de lectura opcional delante de seleccionar_libro (ver usar_cache)
+    _observadores = []  # Funciones avisadas después de cada escritura confirmada (ver suscribir)
+    _snapshot = None  # Copia local de solo lectura para seleccionar_libro (ver usar_snapshot)
+
+    @classmethod
+    def _sql(cls, nombre: str):
+        """
+        Retorna la sentencia `nombre` (por ejemplo '_UPSERT') en el dialecto del backend
+        configurado: la versión propia del backend si la tiene, o la de esta clase.
+        """
+        sentencia = Conexiones.obtenerBackend().sentencias.get(nombre)
+        return sentencia if sentencia is not None else getattr(cls, nombre)
+
+    @classmethod
+    def usar_cache(cls, cache: CacheLRU | None):
+        """
+        Activa una caché de lectura delante de seleccionar_libro, o la desactiva con None.
+        Las escrituras hechas por este DAO invalidan el código afectado; los cambios hechos
+        desde otros equipos solo se ven cuando la entrada expira (use CacheTTL en ese caso).
+
+        Args:
+            cache (CacheLRU | None): Instancia de CacheLRU o CacheTTL.
+        """
+        cls._cache = cache
+
+    @classmethod
+    def usar_snapshot(cls, snapshot):
+        """
+        Usa un SnapshotLibros como respaldo de seleccionar_libro, o lo quita con None.
+        Responde desde el snapshot mientras no hay conexión abierta (al arrancar, antes
+        de conectarse) y cuando la consulta a la base falla (sin red o sin servidor).
+        Sus libros pueden estar atrasados hasta el último refresco y no traen versión.
+
+        Args:
+            snapshot (SnapshotLibros | None): Snapshot abierto con SnapshotLibros.abrir.
+        """
+        cls._snapshot = snapshot
+
+    @classmethod
+    def _desde_snapshot(cls, codigo) -> tuple[bool, Libro | None]:
+        """Retorna (True, libro o None) si el snapshot puede responder, o (False, None)."""
+        snapshot = cls._snapshot
+        if snapshot is None:
+            return False, None
+        try:
+            return True, snapshot.seleccionar_libro(codigo)
+        except Exception as e:
+            print(f"Error al leer el snapshot: {e}")
+            return False, None
+
+    @classmethod
+    def usar_versiones(cls, activar: bool = True):
+        """
+        Activa (o desactiva) la concurrencia optimista. Con ella activa, seleccionar_libro
+        y seleccionar_libros traen la versión de cada fila, y actualizar_libro y
+        eliminar_libro fallan con un ConflictoVersion si otro la cambió mientras tanto.
+        Los libros sin versión (armados desde cero) se graban como siempre.
+
+        Requiere la columna Version (la crea la migración 3 de esquemaLibros, ver
+        crear_columna_version). También se activa al inicio con la variable de entorno
+        LIBRERIA_VERSIONES=1.
+        """
+        cls._versionado = bool(activar)
+        if cls._cache is not None:
+            cls._cache.limpiar()  # Las filas guardadas no tienen (o ya no necesitan) la versión
+
+    @classmethod
+    def crear_columna_version(cls) -> int:
+        """
+        Agrega a la tabla Libro la columna Version que usa usar_versiones, aplicando las
+        migraciones de esquemaLibros hasta esa versión. Si ya existe, se omite.
+
+        Returns:
+            int: Número de migraciones aplicadas, o _ERROR (-1) si alguna falló.
+        """
+        from src.datos.esquemaLibros import COLUMNA_VERSION
+        return cls._migrar(COLUMNA_VERSION)
+
+    @classmethod
+    def _migrar(cls, hasta: int) -> int:
+        """Aplica las migraciones de esquemaLibros hasta la versión `hasta` con una conexión del pool."""
+        from src.datos.esquemaLibros import EsquemaLibros
+        try:
+            with Conexiones.obtenerConexion() as conexion:
+                return len(EsquemaLibros.migrar(conexion, Conexiones.obtenerBackend(), hasta))
+        except Exception as e:
+            print(f"Error al migrar el esquema: {e}")
+            return cls._ERROR
+
+    @classmethod
+    def _invalidar(cls, *codigos):
+        """
+        Quita de la caché (si está activa) los códigos que se acaban de modificar. Dentro
+        de una UnidadDeTrabajo se vuelven a quitar al confirmarla, por si otro hilo los
+        leyó (con el valor anterior) antes del commit.
+        """
+        cache = cls._cache
+        if cache is not None:
+            for codigo in codigos:
+                cache.invalidar(codigo)
+            unidad = Conexiones.transaccion_actual()
+            if unidad is not None:
+                unidad.al_confirmar(lambda: [cache.invalidar(codigo) for codigo in codigos])
+
+    @classmethod
+    def _cache_lectura(cls) -> CacheLRU | None:
+        """La caché de lectura, salvo dentro de una UnidadDeTrabajo (sus datos aún pueden deshacerse)."""
+        return cls._cache if Conexiones.transaccion_actual() is None else None
+
+    @classmethod
+    def suscribir(cls, observador):
+        """
+        Registra una función que se llama después de cada escritura confirmada con
+        `observador(operacion, codigo, fila)`, donde operacion es 'insertar',
+        'actualizar', 'upsert', 'ajustar' (solo cambió la cantidad) o 'eliminar' y fila es la tupla
+        (codigo, nombre, precio, cantidad, autor, edicion, Isbn), o None al eliminar.
+
+        En las operaciones masivas se avisa por cada fila grabada; un 'actualizar' masivo
+        puede referirse a un código que no existía, ya que executemany no informa las
+        filas afectadas por cada registro.
+        """
+        if observador not in cls._observadores:
+            cls._observadores.append(observador)
+
+    @classmethod
+    def desuscribir(cls, observador):
+        """Quita un observador registrado con suscribir."""
+        if observador in cls._observadores:
+            cls._observadores.remove(observador)
+
+    @classmethod
+    def _notificar(cls, operacion: str, codigo, fila: tuple | None):
+        """
+        Avisa una escritura a los observadores; sus errores no afectan a la operación.
+        Dentro de una UnidadDeTrabajo el aviso espera a que se confirme.
+        """
+        unidad = Conexiones.transaccion_actual()
+        if unidad is not None:
+            unidad.al_confirmar(lambda: cls._avisar(operacion, codigo, fila))
+        else:
+            cls._avisar(operacion, codigo, fila)
+
+    @classmethod
+    def _avisar(cls, operacion: str, codigo, fila: tuple | None):
+        for observador in list(cls._observadores):
+            try:
+                observador(operacion, codigo, fila)
+            except Exception as e:
+                print(f"Error en observador de LibroDao: {e}")
+
+    @staticmethod
+    def _libro_desde_fila(fila) -> Libro:
+        """
+        Desempaqueta una fila (codigo, nombre, precio, cantidad, autor, edicion, Isbn) en
+        un Libro, marcado como limpio porque coincide con la base de datos. Si la fila
+        trae un octavo valor, es la versión (ver usar_versiones).
+        """
+        libro = Libro(
+            codigo=fila[0],
+            nombre=fila[1],
+            precio=fila[2],
+            cantidad=fila[3],
+            autor=fila[4],
+            edicion=fila[5],
+            Isbn=fila[6],
+        )
+        libro.marcar_limpio()
+        if len(fila) > 7:
+            libro.version = fila[7]
+        return libro
+
+    @classmethod
+    def _marcar_grabado(cls, libro: Libro, version=None):
+        """
+        Marca el libro como limpio ya grabado y, si se indica, le asigna su versión nueva
+        (dentro de una UnidadDeTrabajo, al confirmarla).
+        """
+        def marcar():
+            libro.marcar_limpio()
+            if version is not None:
+                libro.version = version
+        unidad = Conexiones.transaccion_actual()
+        if unidad is not None:
+            unidad.al_confirmar(marcar)
+        else:
+            marcar()
+
+    @classmethod
+    def _conflicto(cls, codigo, fila) -> int:
+        """
+        Resultado de un UPDATE o DELETE versionado que no afectó filas: 0 si el libro ya no
+        existe, o un ConflictoVersion con la fila actual si otro lo cambió.
+        """
+        if fila is None:
+            return 0
+        return ConflictoVersion(codigo, cls._libro_desde_fila(fila))
 
     @classmethod
     def insertar_libro(cls, libro: Libro) -> int:
@@ -33,19 +391,28 @@ class LibroDao:
                  o _ERROR (-1) si ocurre una excepción.
         """
         try:
-            # Utiliza un gestor de contexto para el cursor de la base de datos,
-            # asegurando que se cierre correctamente.
-            with Conexiones.obtenerCursor() as cursor:
+            # Utiliza un gestor de contexto que presta una conexión del pool, hace commit
+            # al salir y asegura que el cursor se cierre y la conexión se devuelva.
+            # El cursor de _INSERT ya está preparado en la conexión (ver SentenciasPreparadas)
+            with Conexiones.obtenerCursor(cls._INSERT) as cursor:
                 datos = (libro.codigo, libro.nombre, libro.precio, libro.cantidad,
                          libro.autor, libro.edicion, libro.Isbn)
                 retorno = cursor.execute(cls._INSERT, datos)
                 # rowcount devuelve el número de filas afectadas por la declaración DML.
-                return retorno.rowcount
+                filas = retorno.rowcount
+            # Ya se hizo commit al salir del bloque: se avisa a los observadores
+            if filas > 0:
+                cls._marcar_grabado(libro)
+                cls._notificar('insertar', libro.codigo, datos)
+            return filas
         except Exception as e:
             # Imprime la excepción para fines de depuración. En un sistema de producción,
             # considera usar un framework de logging adecuado.
             print(f"Error al insertar libro: {e}")
             return cls._ERROR
+        finally:
+            # Un código que estaba en caché como inexistente deja de serlo
+            cls._invalidar(libro.codigo)
 
     @classmethod
     def seleccionar_libro(cls, codigo: str) -> Libro | None:
@@ -59,95 +426,765 @@ class LibroDao:
             Libro: Un objeto Libro poblado con los datos recuperados si se encuentra.
             None: Si el libro no se encuentra o si ocurre un error.
         """
+        if cls._snapshot is not None and not Conexiones.conectado():
+            # Arranque en frío: se responde desde el snapshot mientras la conexión se abre aparte
+            respondido, libro = cls._desde_snapshot(codigo)
+            if respondido:
+                Conexiones.precalentar()
+                return libro
+        cache = cls._cache_lectura()
+        if cache is not None:
+            encontrado, fila = cache.obtener(codigo)
+            if encontrado:
+                # Cada acierto construye un Libro nuevo; la caché solo guarda la fila
+                return cls._libro_desde_fila(fila) if fila is not None else None
+            generacion = cache.generacion()
         try:
-            with Conexiones.obtenerCursor() as cursor:
+            sql = cls._SELECT_VERSION if cls._versionado else cls._SELECT
+            with Conexiones.obtenerCursor(sql) as cursor:
                 datos = (codigo,)
                 # fetchone() recupera una sola fila de datos.
-                retorno = cursor.execute(cls._SELECT, datos).fetchone()
-
-                if retorno: # Verifica si se encontró un registro
-                    # Desempaqueta la tupla devuelta por fetchone() en un objeto Libro.
-                    libro = Libro(
-                        codigo=retorno[0],
-                        nombre=retorno[1],
-                        precio=retorno[2],
-                        cantidad=retorno[3],
-                        autor=retorno[4],
-                        edicion=retorno[5],
-                        Isbn=retorno[6],
-                    )
-                    return libro
-                else:
-                    return None # No se encontró ningún libro con el código dado
+                retorno = cursor.execute(sql, datos).fetchone()
+
+            if cache is not None:
+                # Los errores no se cachean; un código inexistente sí (caché negativa)
+                cache.guardar(codigo, tuple(retorno) if retorno else None, generacion)
+            if retorno: # Verifica si se encontró un registro
+                # Desempaqueta la tupla devuelta por fetchone() en un objeto Libro.
+                return cls._libro_desde_fila(retorno)
+            else:
+                return None # No se encontró ningún libro con el código dado
 
         except Exception as e:
             print(f"Error al seleccionar libro: {e}")
-            # Para operaciones SELECT, el rollback no suele ser estrictamente necesario
-            # a menos que las operaciones del cursor afecten de alguna manera el estado de la transacción.
-            # Sin embargo, no hace daño. Asumiendo que Conexiones maneja el commit/rollback
-            # correctamente para su cursor.
-            if hasattr(cursor, 'rollback'): # Llama a rollback de forma segura si está disponible
-                 cursor.rollback()
+            # El rollback lo hace Conexiones.obtenerCursor al salir del bloque con la excepción,
+            # antes de devolver la conexión al pool.
+            return cls._desde_snapshot(codigo)[1]
+
+    @classmethod
+    def libro_en_cache(cls, codigo: str) -> tuple[bool, Libro | None]:
+        """
+        Consulta solo la caché de lectura de seleccionar_libro, sin ir a la base (por
+        ejemplo, para responder en el hilo de la interfaz sin lanzar una búsqueda).
+
+        Returns:
+            tuple: (True, Libro o None si el código no existe) si la caché tiene el código,
+                   o (False, None) si no lo tiene o no hay caché.
+        """
+        cache = cls._cache_lectura()
+        if cache is None:
+            return False, None
+        encontrado, fila = cache.obtener(codigo)
+        if not encontrado:
+            return False, None
+        return True, cls._libro_desde_fila(fila) if fila is not None else None
+
+    @classmethod
+    def _limite_parametros(cls) -> int:
+        """Número máximo de parámetros por sentencia que acepta el backend configurado."""
+        return min(cls._MAX_PARAMETROS, Conexiones.obtenerBackend().max_parametros)
+
+    @staticmethod
+    def _rellenar_bloque(bloque: list, limite: int) -> list:
+        """
+        Completa un bloque de códigos repitiendo el último hasta la siguiente potencia de 2
+        (sin pasar del límite). Así solo existen unas pocas formas de la sentencia IN y el
+        servidor puede reutilizar sus planes de ejecución.
+        """
+        tamano = 1
+        while tamano < len(bloque):
+            tamano *= 2
+        tamano = min(tamano, limite)
+        return bloque + [bloque[-1]] * (tamano - len(bloque))
+
+    @classmethod
+    def seleccionar_libros(cls, codigos) -> tuple[dict, list] | None:
+        """
+        Selecciona varios libros a la vez, por ejemplo todos los de una canasta escaneada
+        en caja. Los códigos se resuelven con consultas `IN (...)` agrupadas en bloques que
+        respetan el límite de parámetros del controlador, todas sobre la misma conexión.
+        Si la caché está activa, solo se consultan los códigos que no estén en ella.
+
+        Args:
+            codigos (Iterable[str]): Códigos a buscar; los repetidos se consultan una vez.
+
+        Returns:
+            tuple: (diccionario código -> Libro con los encontrados,
+                    lista de códigos que no existen, en el orden recibido).
+            None: Si ocurre un error.
+        """
+        pedidos = list(dict.fromkeys(str(codigo) for codigo in codigos))
+        filas = {}
+        cache = cls._cache_lectura()
+        por_consultar = pedidos
+        if cache is not None:
+            por_consultar = []
+            for codigo in pedidos:
+                encontrado, fila = cache.obtener(codigo)
+                if not encontrado:
+                    por_consultar.append(codigo)
+                elif fila is not None:
+                    filas[codigo] = fila
+            generacion = cache.generacion()
+        try:
+            if por_consultar:
+                with Conexiones.obtenerConexion() as conexion:
+                    limite = cls._limite_parametros()
+                    plantilla = cls._SELECT_VARIOS_VERSION if cls._versionado else cls._SELECT_VARIOS
+                    cursor = conexion.cursor()
+                    try:
+                        for _, bloque in _en_lotes(por_consultar, limite):
+                            bloque = cls._rellenar_bloque(bloque, limite)
+                            sql = plantilla.format(marcadores=', '.join('?' * len(bloque)))
+                            for fila in cursor.execute(sql, bloque).fetchall():
+                                filas[str(fila[0])] = tuple(fila)
+                    finally:
+                        cursor.close()
+                if cache is not None:
+                    for codigo in por_consultar:
+                        cache.guardar(codigo, filas.get(codigo), generacion)
+        except Exception as e:
+            print(f"Error al seleccionar libros: {e}")
+            return None
+        libros = {codigo: cls._libro_desde_fila(filas[codigo]) for codigo in pedidos if codigo in filas}
+        faltantes = [codigo for codigo in pedidos if codigo not in filas]
+        return libros, faltantes
+
+    @staticmethod
+    def _escapar_like(texto: str) -> str:
+        """Escapa los comodines de LIKE para que el texto del usuario se busque literalmente."""
+        return (texto.replace('\\', '\\\\').replace('%', '\\%')
+                .replace('_', '\\_').replace('[', '\\['))
+
+    @classmethod
+    def buscar_libros(cls, texto: str, campo: str = 'nombre', modo: str = 'prefijo',
+                      limite: int = 50, despues: tuple | None = None) -> tuple[list, tuple | None] | None:
+        """
+        Busca libros por nombre, autor o ISBN, una página a la vez.
+
+        La búsqueda por prefijo usa los índices de búsqueda de esquemaLibros y respeta la
+        intercalación de la columna: en SQL Server normalmente no distingue mayúsculas ni
+        acentos, y en SQLite las columnas de búsqueda son collate nocase (no distingue
+        mayúsculas, solo en letras ASCII). La búsqueda 'contiene' tiene que revisar el
+        índice completo, pero igual pagina por llave.
+
+        Args:
+            texto (str): Texto a buscar (sin comodines; se buscan literalmente).
+            campo (str): 'nombre', 'autor' o 'isbn'.
+            modo (str): 'prefijo' (empieza con) o 'contiene'.
+            limite (int): Número máximo de filas de la página.
+            despues (tuple, opcional): Marcador devuelto por la página anterior.
+
+        Returns:
+            tuple: (lista de filas (codigo, nombre, precio, cantidad, autor, edicion, Isbn),
+                    marcador para pedir la página siguiente o None si no hay más).
+            None: Si ocurre un error.
+        """
+        if campo not in cls._CAMPOS_BUSQUEDA:
+            raise ValueError(f"Campo de búsqueda no válido: {campo}")
+        columna, posicion = cls._CAMPOS_BUSQUEDA[campo]
+        try:
+            backend = Conexiones.obtenerBackend()
+            with Conexiones.obtenerConexion() as conexion:
+                condiciones, datos = [], []
+                if modo == 'contiene':
+                    condiciones.append(cls._BUSCAR_CONTIENE.format(columna=columna))
+                    datos.append('%' + cls._escapar_like(texto) + '%')
+                elif texto:
+                    # El comodín va en el parámetro (no como ? + '%'): SQLite solo usa el
+                    # índice para like si el patrón es un literal o un parámetro
+                    condiciones.append(cls._BUSCAR_PREFIJO.format(columna=columna))
+                    datos.append(cls._escapar_like(texto) + '%')
+                if despues is not None:
+                    condiciones.append(cls._sql('_BUSCAR_DESPUES').format(columna=columna))
+                    datos.extend(backend.parametros_despues(despues[0], despues[1]))
+                top, limit = backend.limitar(limite)
+                sql = cls._BUSCAR.format(top=top, limit=limit, columna=columna,
+                                         condiciones=' and '.join(condiciones) or '1 = 1')
+                cursor = conexion.cursor()
+                try:
+                    filas = [tuple(fila) for fila in cursor.execute(sql, datos).fetchall()]
+                finally:
+                    cursor.close()
+        except Exception as e:
+            print(f"Error al buscar libros: {e}")
             return None
+        siguiente = (filas[-1][posicion], filas[-1][0]) if len(filas) == limite else None
+        return filas, siguiente
+
+    @classmethod
+    def seleccionar_pagina(cls, despues: str | None = None, limite: int = 500) -> list | None:
+        """
+        Trae una página del catálogo ordenado por código. Pagina por llave (los códigos
+        mayores al último visto), así que cada página cuesta lo mismo aunque se esté al
+        final de una tabla de millones de libros.
+
+        Args:
+            despues (str, opcional): Último código de la página anterior; None para la primera.
+            limite (int): Número máximo de filas de la página.
+
+        Returns:
+            list: Filas (codigo, nombre, precio, cantidad, autor, edicion, Isbn), con la
+                  versión como octavo valor si usar_versiones está activo; menos de
+                  `limite` si es la última página.
+            None: Si ocurre un error.
+        """
+        try:
+            top, limit = Conexiones.obtenerBackend().limitar(limite)
+            plantilla = cls._PAGINA_VERSION if cls._versionado else cls._PAGINA
+            with Conexiones.obtenerCursor() as cursor:
+                filas = cursor.execute(plantilla.format(top=top, limit=limit),
+                                       (despues if despues is not None else '',)).fetchall()
+            return [tuple(fila) for fila in filas]
+        except Exception as e:
+            print(f"Error al seleccionar página de libros: {e}")
+            return None
+
+    @classmethod
+    def crear_indices_busqueda(cls) -> int:
+        """
+        Crea los índices que usa buscar_libros, aplicando las migraciones de esquemaLibros
+        hasta esa versión. Los que ya existen se omiten.
+
+        Returns:
+            int: Número de migraciones aplicadas, o _ERROR (-1) si alguna falló.
+        """
+        from src.datos.esquemaLibros import INDICES_BUSQUEDA
+        return cls._migrar(INDICES_BUSQUEDA)
 
     @classmethod
     def actualizar_libro(cls, libro: Libro) -> int:
         """
         Actualiza un registro de libro existente en la base de datos.
 
+        Si el libro se leyó con LibroDao (o ya se grabó), solo se escriben los campos que
+        cambiaron desde entonces, y si no cambió ninguno no se envía nada a la base. Un
+        libro armado desde cero (por ejemplo, desde un formulario) se escribe completo.
+
+        Con usar_versiones activo y un libro que trae versión, solo se graba si nadie más
+        cambió la fila desde que se leyó; si no, se retorna un ConflictoVersion. Al
+        grabarse, el libro recibe su versión nueva.
+
         Args:
             libro (Libro): El objeto Libro que contiene los detalles actualizados.
                            El atributo 'codigo' se utiliza para identificar el libro.
 
         Returns:
-            int: El número de filas actualizadas (normalmente 1 si tiene éxito),
-                 o _ERROR (-1) si ocurre una excepción.
+            int: El número de filas actualizadas (normalmente 1 si tiene éxito, 0 si no
+                 había cambios que grabar o el libro no existe), _ERROR (-1) si ocurre
+                 una excepción, o un ConflictoVersion (-3) si la versión no coincide.
         """
+        modificados = libro.campos_modificados()
+        if modificados is not None and not modificados:
+            return 0
         try:
             # Conversión explícita a float e int para mayor robustez, asumiendo que estos tipos
             # son esperados por la columna de la base de datos.
             precio = float(libro.precio)
             cantidad = int(libro.cantidad)
+            fila = (libro.codigo, libro.nombre, precio, cantidad, libro.autor, libro.edicion, libro.Isbn)
+            version = libro.version if cls._versionado else None
+            if modificados is None or 'codigo' in modificados:
+                modificados = None
+            valores = dict(zip((campo for campo, _ in cls._COLUMNAS_UPDATE), fila[1:]))
 
-            with Conexiones.obtenerCursor() as cursor:
-                datos = (
-                    libro.nombre, precio, cantidad, libro.autor,
-                    libro.edicion, libro.Isbn, libro.codigo
-                )
-                retorno = cursor.execute(cls._UPDATE, datos)
-                return retorno.rowcount
+            if version is not None:
+                sql, campos = cls._update_parcial(modificados or frozenset(valores), cls._sql('_UPDATE_VERSION'))
+                datos = tuple(valores[campo] for campo in campos) + (libro.codigo, version)
+                with Conexiones.obtenerCursor(sql) as cursor:
+                    nueva = cursor.execute(sql, datos).fetchone()
+                if nueva is None:
+                    # Solo en el caso raro se consulta por qué no se aplicó, con su propio
+                    # cursor para no descartar el ya preparado para el UPDATE
+                    with Conexiones.obtenerCursor(cls._SELECT_VERSION) as cursor:
+                        actual = cursor.execute(cls._SELECT_VERSION, (libro.codigo,)).fetchone()
+                    return cls._conflicto(libro.codigo, actual)
+                filas, version = 1, nueva[0]
+            else:
+                if modificados is None:
+                    sql, datos = cls._sql('_UPDATE'), fila[1:] + fila[:1]
+                else:
+                    sql, campos = cls._update_parcial(modificados)
+                    datos = tuple(valores[campo] for campo in campos) + (libro.codigo,)
+                with Conexiones.obtenerCursor(sql) as cursor:
+                    retorno = cursor.execute(sql, datos)
+                    filas = retorno.rowcount
+            if filas > 0:
+                cls._marcar_grabado(libro, version)
+                cls._notificar('actualizar', libro.codigo, fila)
+            return filas
         except Exception as e:
             print(f"Error al actualizar libro: {e}")
             return cls._ERROR
+        finally:
+            # Se invalida después del commit para que nunca se muestre un precio viejo
+            cls._invalidar(libro.codigo)
+
+    @classmethod
+    def _update_parcial(cls, campos, plantilla: str | None = None) -> tuple:
+        """
+        Retorna (sentencia, campos en orden) del UPDATE que escribe solo esos campos, con
+        la plantilla _UPDATE_PARCIAL o la indicada (por ejemplo, la de _UPDATE_VERSION).
+        """
+        plantilla = plantilla or cls._sql('_UPDATE_PARCIAL')
+        entrada = cls._updates_parciales.get((plantilla, campos))
+        if entrada is None:
+            orden = tuple(campo for campo, _ in cls._COLUMNAS_UPDATE if campo in campos)
+            columnas = dict(cls._COLUMNAS_UPDATE)
+            sql = plantilla.format(asignaciones=', '.join(f'{columnas[campo]}=?' for campo in orden))
+            entrada = cls._updates_parciales[(plantilla, campos)] = (sql, orden)
+        return entrada
 
     @classmethod
-    def eliminar_libro(cls, codigo: str) -> int:
+    def eliminar_libro(cls, codigo: str, version=None) -> int:
         """
         Elimina un registro de libro de la base de datos basándose en su código.
 
         Args:
             codigo (str): El código único del libro a eliminar.
+            version (opcional): Versión del libro que se leyó (libro.version). Con
+                                usar_versiones activo, solo se elimina si nadie lo cambió.
 
         Returns:
             int: El número de filas eliminadas (normalmente 1 si tiene éxito),
-                 o _ERROR (-1) si ocurre una excepción.
+                 _ERROR (-1) si ocurre una excepción, o un ConflictoVersion (-3) si la
+                 versión no coincide.
         """
+        versionado = version is not None and cls._versionado
+        actual = None
         try:
-            with Conexiones.obtenerCursor() as cursor:
+            sql = cls._DELETE_VERSION if versionado else cls._DELETE
+            with Conexiones.obtenerCursor(sql) as cursor:
                 # Asegura que el código se trate como una cadena para el parámetro de la consulta.
                 # Dependiendo de tu controlador de DB, la conversión explícita podría ser crucial o redundante.
                 datos = (str(codigo),)
                 # print(f"Intentando eliminar libro con código: {codigo} (Tipo: {type(codigo)})") # Para depuración
-                retorno = cursor.execute(cls._DELETE, datos)
-                return retorno.rowcount
+                if versionado:
+                    retorno = cursor.execute(sql, datos + (version,))
+                else:
+                    retorno = cursor.execute(sql, datos)
+                filas = retorno.rowcount
+            if versionado and filas == 0:
+                # Con su propio cursor, para no descartar el ya preparado para el DELETE
+                with Conexiones.obtenerCursor(cls._SELECT_VERSION) as cursor:
+                    actual = cursor.execute(cls._SELECT_VERSION, datos).fetchone()
+            if actual is not None:
+                return cls._conflicto(str(codigo), actual)
+            if filas > 0:
+                cls._notificar('eliminar', codigo, None)
+            return filas
 
         except Exception as e:
             print(f"Error al eliminar libro: {e}")
             # print(f"Tipo de error: {type(e)}") # Para depuración
-            # Asegura que se llame a rollback si el cursor es parte de un contexto transaccional.
-            if hasattr(cursor, 'rollback'):
-                cursor.rollback()
+            # El rollback ya lo hizo Conexiones.obtenerCursor al salir del bloque con la excepción.
             return cls._ERROR
+        finally:
+            cls._invalidar(codigo)
+
+    @classmethod
+    def ajustar_cantidad(cls, codigo: str, delta: int) -> int | None:
+        """
+        Suma `delta` a la cantidad de un libro (negativo para una venta) con una sola
+        sentencia UPDATE condicional, sin leer antes el libro. Dos cajas que venden el
+        mismo título a la vez nunca pierden una venta ni dejan el stock negativo.
+
+        Args:
+            codigo (str): Código del libro.
+            delta (int): Unidades a sumar (o restar, si es negativo).
+
+        Returns:
+            int: La cantidad nueva si se aplicó el ajuste.
+            None: Si el libro no existe.
+            _SIN_STOCK (-2): Si el ajuste dejaría la cantidad negativa (no se aplica).
+            _ERROR (-1): Si ocurre una excepción.
+        """
+        codigo, delta = str(codigo), int(delta)
+        existe = None
+        try:
+            with Conexiones.obtenerCursor(cls._sql('_AJUSTAR')) as cursor:
+                fila = cursor.execute(cls._sql('_AJUSTAR'), (delta, codigo, delta)).fetchone()
+            if fila is None:
+                # Solo en el caso raro se consulta por qué no se aplicó, con su propio
+                # cursor para no descartar el ya preparado para el UPDATE
+                with Conexiones.obtenerCursor(cls._SELECT_CANTIDAD) as cursor:
+                    existe = cursor.execute(cls._SELECT_CANTIDAD, (codigo,)).fetchone()
+        except Exception as e:
+            print(f"Error al ajustar cantidad: {e}")
+            return cls._ERROR
+        finally:
+            cls._invalidar(codigo)
+        if fila is None:
+            return cls._SIN_STOCK if existe is not None else None
+        fila = tuple(fila)
+        cls._notificar('ajustar', codigo, fila)
+        return int(fila[3])
+
+    @staticmethod
+    def _datos_insertar(libro: Libro) -> tuple:
+        """Parámetros de _INSERT/_UPSERT para un libro, con precio y cantidad ya convertidos."""
+        return (libro.codigo, libro.nombre, float(libro.precio), int(libro.cantidad),
+                libro.autor, libro.edicion, libro.Isbn)
+
+    @staticmethod
+    def _datos_actualizar(libro: Libro) -> tuple:
+        """Parámetros de _UPDATE para un libro, con precio y cantidad ya convertidos."""
+        return (libro.nombre, float(libro.precio), int(libro.cantidad), libro.autor,
+                libro.edicion, libro.Isbn, libro.codigo)
+
+    @classmethod
+    def _ejecutar_lotes(cls, operacion: str, sql: str, libros, convertir, tamano_lote: int | None,
+                        resultado: ResultadoLote | None = None, detener=None) -> ResultadoLote:
+        """
+        Ejecuta `sql` para cada libro agrupando las filas en lotes. Cada lote se envía con
+        un solo executemany (con fast_executemany si el controlador lo soporta) y se
+        confirma con un único commit. Si el lote falla, se repite fila por fila para
+        aislar los registros con error sin perder los demás.
+
+        Si `detener` (un threading.Event) se activa, la carga termina antes del siguiente
+        lote: lo ya confirmado queda grabado y el resultado se marca como detenido.
+        """
+        resultado = ResultadoLote() if resultado is None else resultado
+        for inicio, lote in _en_lotes(libros, tamano_lote or cls._TAMANO_LOTE):
+            if detener is not None and detener.is_set():
+                resultado.detenido = True
+                break
+            pendientes = []  # Tuplas (posición, código, parámetros)
+            for indice, libro in enumerate(lote, inicio):
+                try:
+                    pendientes.append((indice, libro.codigo, convertir(libro)))
+                except Exception as e:
+                    # Precio o cantidad no numéricos: la fila ni siquiera llega a la base de datos
+                    resultado.agregar_error(indice, getattr(libro, 'codigo', None), e)
+            if not pendientes:
+                continue
+            unidad = Conexiones.transaccion_actual()
+            try:
+                # Dentro de una UnidadDeTrabajo, el punto de guardado deshace las filas del
+                # lote que alcanzaron a grabarse antes del error
+                with unidad.punto_guardado() if unidad is not None else nullcontext():
+                    with Conexiones.obtenerCursor() as cursor:
+                        if hasattr(cursor, 'fast_executemany'):
+                            # pyodbc envía todos los parámetros del lote en un solo viaje
+                            cursor.fast_executemany = True
+                        cursor.executemany(sql, [datos for _, _, datos in pendientes])
+                grabados = pendientes
+            except Exception:
+                # El lote completo ya se deshizo; se reintenta fila por fila
+                fallidos = resultado.fallidos
+                grabados = cls._ejecutar_fila_por_fila(sql, pendientes, resultado)
+                if unidad is not None and resultado.fallidos > fallidos:
+                    # Igual que una llamada que falla: la unidad se deshará al salir
+                    unidad.marcar_fallida(ValueError(resultado.ultimo_error[2]))
+            resultado.procesados += len(grabados)
+            cls._invalidar(*(codigo for _, codigo, _ in pendientes))
+            if cls._observadores:
+                for _, codigo, datos in grabados:
+                    # _UPDATE lleva el código al final; los observadores lo reciben primero
+                    fila = (datos[-1],) + datos[:-1] if operacion == 'actualizar' else datos
+                    cls._notificar(operacion, codigo, fila)
+        return resultado
+
+    @classmethod
+    def _ejecutar_fila_por_fila(cls, sql: str, pendientes: list, resultado: ResultadoLote) -> list:
+        """
+        Ejecuta las filas de un lote una a una en una sola transacción, registrando las que
+        fallan. Retorna las filas de `pendientes` que quedaron grabadas.
+        """
+        grabados = []
+        errores = []
+        try:
+            with Conexiones.obtenerCursor() as cursor:
+                for pendiente in pendientes:
+                    indice, codigo, datos = pendiente
+                    try:
+                        cursor.execute(sql, datos)
+                        grabados.append(pendiente)
+                    except Exception as e:
+                        errores.append((indice, codigo, e))
+        except Exception as e:
+            # Falló la conexión o el commit: ninguna fila del lote quedó grabada
+            print(f"Error al grabar lote de libros: {e}")
+            grabados = []
+            errores = [(indice, codigo, e) for indice, codigo, _ in pendientes]
+        for indice, codigo, error in errores:
+            resultado.agregar_error(indice, codigo, error)
+        return grabados
+
+    @classmethod
+    def insertar_libros(cls, libros, tamano_lote: int | None = None,
+                        resultado: ResultadoLote | None = None, detener=None) -> ResultadoLote:
+        """
+        Inserta muchos libros en lotes, con un commit por lote.
+
+        Args:
+            libros (Iterable[Libro]): Libros a insertar; puede ser un generador.
+            tamano_lote (int, opcional): Filas por lote; por defecto _TAMANO_LOTE.
+            resultado (ResultadoLote, opcional): Dónde anotar el resultado (por ejemplo, uno
+                                                 que limite los errores que guarda).
+            detener (threading.Event, opcional): Si se activa, la carga se detiene antes del
+                                                 siguiente lote (ver ResultadoLote.detenido).
+
+        Returns:
+            ResultadoLote: Filas insertadas y errores por fila (por ejemplo, códigos duplicados).
+        """
+        return cls._ejecutar_lotes('insertar', cls._INSERT, libros, cls._datos_insertar, tamano_lote,
+                                   resultado, detener)
+
+    @classmethod
+    def actualizar_libros(cls, libros, tamano_lote: int | None = None,
+                          resultado: ResultadoLote | None = None, detener=None) -> ResultadoLote:
+        """
+        Actualiza muchos libros en lotes, con un commit por lote.
+
+        Args:
+            libros (Iterable[Libro]): Libros con los datos nuevos; se identifican por 'codigo'.
+            tamano_lote (int, opcional): Filas por lote; por defecto _TAMANO_LOTE.
+            resultado (ResultadoLote, opcional): Dónde anotar el resultado (por ejemplo, uno
+                                                 que limite los errores que guarda).
+            detener (threading.Event, opcional): Si se activa, la carga se detiene antes del
+                                                 siguiente lote (ver ResultadoLote.detenido).
+
+        Returns:
+            ResultadoLote: Filas procesadas y errores por fila.
+        """
+        return cls._ejecutar_lotes('actualizar', cls._sql('_UPDATE'), libros, cls._datos_actualizar, tamano_lote,
+                                   resultado, detener)
+
+    @classmethod
+    def upsert_libros(cls, libros, tamano_lote: int | None = None,
+                      resultado: ResultadoLote | None = None, detener=None) -> ResultadoLote:
+        """
+        Inserta los libros nuevos y actualiza los existentes (MERGE) en lotes,
+        con un commit por lote. Útil para cargar el catálogo de un proveedor.
+
+        Args:
+            libros (Iterable[Libro]): Libros a grabar; se identifican por 'codigo'.
+            tamano_lote (int, opcional): Filas por lote; por defecto _TAMANO_LOTE.
+            resultado (ResultadoLote, opcional): Dónde anotar el resultado (por ejemplo, uno
+                                                 que limite los errores que guarda).
+            detener (threading.Event, opcional): Si se activa, la carga se detiene antes del
+                                                 siguiente lote (ver ResultadoLote.detenido).
+
+        Returns:
+            ResultadoLote: Filas procesadas y errores por fila.
+        """
+        return cls._ejecutar_lotes('upsert', cls._sql('_UPSERT'), libros, cls._datos_insertar, tamano_lote,
+                                   resultado, detener)
+
+    @classmethod
+    def grabar_cambios(cls, nuevos, modificados, tamano_lote: int | None = None) -> ResultadoLote | None:
+        """
+        Inserta los libros nuevos y actualiza los modificados en una sola transacción,
+        en lotes: se graban todos o, si alguna fila falla, ninguno. Pensado para
+        confirmar de una vez todo lo editado en una grilla.
+
+        Con usar_versiones activo, los modificados que traen versión se actualizan uno
+        por uno con actualizar_libro: si otro usuario cambió alguno desde que se leyó,
+        ese libro se anota como error y no se graba nada. Al confirmar, cada libro
+        recibe su versión nueva.
+
+        Args:
+            nuevos (Iterable[Libro]): Libros a insertar.
+            modificados (Iterable[Libro]): Libros existentes con los datos nuevos.
+            tamano_lote (int, opcional): Filas por sentencia; por defecto _TAMANO_LOTE.
+
+        Returns:
+            ResultadoLote: Filas grabadas y errores por fila (la posición es la de la
+                           fila en su lista). Si hubo errores, procesados es 0.
+            None: Si no se pudo abrir la transacción.
+        """
+        resultado = ResultadoLote()
+        try:
+            with UnidadDeTrabajo():
+                actualizar = cls._actualizar_con_version if cls._versionado else cls.actualizar_libros
+                for grabar, libros in ((cls.insertar_libros, nuevos), (actualizar, modificados)):
+                    parcial = grabar(libros, tamano_lote)
+                    resultado.procesados += parcial.procesados
+                    for error in parcial.errores:
+                        resultado.agregar_error(*error)
+        except TransaccionFallida as e:
+            # Se deshizo todo; las filas con error ya quedaron anotadas por los lotes (una fila
+            # rechazada hace fallar la unidad, ver _ejecutar_lotes)
+            resultado.procesados = 0
+            if not resultado.errores:
+                resultado.agregar_error(None, None, e)
+        except Exception as e:
+            print(f"Error al grabar cambios: {e}")
+            return None
+        return resultado
+
+    @classmethod
+    def _actualizar_con_version(cls, libros, tamano_lote: int | None = None) -> ResultadoLote:
+        """
+        Actualiza los libros uno por uno dentro de la UnidadDeTrabajo abierta, cada uno
+        con su versión (ver actualizar_libro). Un conflicto, un libro que ya no existe o
+        un error hacen fallar la unidad. `tamano_lote` se ignora.
+        """
+        resultado = ResultadoLote()
+        unidad = Conexiones.transaccion_actual()
+        for indice, libro in enumerate(libros):
+            retorno = cls.actualizar_libro(libro)
+            if retorno > 0:
+                resultado.procesados += 1
+                continue
+            if isinstance(retorno, ConflictoVersion):
+                mensaje = "Otro usuario modificó este libro mientras se editaba"
+            elif retorno == 0:
+                mensaje = "El libro ya no existe"
+            else:
+                mensaje = "Error al actualizar el libro"
+            resultado.agregar_error(indice, libro.codigo, mensaje)
+            unidad.marcar_fallida(ValueError(mensaje))
+        return resultado
+
+    @classmethod
+    def ajustar_cantidades(cls, ajustes, todo_o_nada: bool = False) -> dict | None:
+        """
+        Versión masiva de ajustar_cantidad: aplica muchos ajustes con una sentencia
+        UPDATE por bloque y un solo commit. Los códigos repetidos se suman.
+
+        Cada libro se ajusta por separado, salvo con todo_o_nada=True: entonces, si
+        alguno no puede ajustarse, no se aplica ninguno (por ejemplo, una venta de varios
+        títulos). Dentro de una UnidadDeTrabajo ese rechazo hace fallar la unidad
+        completa; use un punto de guardado si se quiere continuar.
+
+        Args:
+            ajustes (dict | Iterable[tuple]): codigo -> delta, o pares (codigo, delta).
+            todo_o_nada (bool): Si es True, se aplican todos los ajustes o ninguno.
+
+        Returns:
+            dict: codigo -> cantidad nueva, None si el libro no existe o _SIN_STOCK si
+                  quedaría negativa. Si todo_o_nada rechazó el conjunto, los códigos que
+                  sí podían ajustarse muestran su cantidad actual, sin cambios.
+            None: Si ocurre un error (no se aplica ningún ajuste).
+        """
+        deltas = {}
+        for codigo, delta in (ajustes.items() if isinstance(ajustes, dict) else ajustes):
+            deltas[str(codigo)] = deltas.get(str(codigo), 0) + int(delta)
+        if not deltas:
+            return {}
+        filas = {}
+        resultado = dict.fromkeys(deltas)
+        try:
+            with Conexiones.obtenerConexion() as conexion:
+                cursor = conexion.cursor()
+                try:
+                    for _, bloque in _en_lotes(deltas.items(), cls._limite_parametros() // 2):
+                        sql = cls._sql('_AJUSTAR_VARIOS').format(valores=', '.join(['(?, ?)'] * len(bloque)))
+                        datos = [valor for par in bloque for valor in par]
+                        for fila in cursor.execute(sql, datos).fetchall():
+                            filas[str(fila[0])] = tuple(fila)
+                    rechazados = [codigo for codigo in deltas if codigo not in filas]
+                    for _, bloque in _en_lotes(rechazados, cls._limite_parametros()):
+                        sql = cls._SELECT_EXISTENTES.format(marcadores=', '.join('?' * len(bloque)))
+                        for fila in cursor.execute(sql, bloque).fetchall():
+                            resultado[str(fila[0])] = cls._SIN_STOCK
+                finally:
+                    cursor.close()
+                if todo_o_nada and rechazados:
+                    raise _AjusteRechazado()
+        except _AjusteRechazado:
+            # Se hizo rollback: la cantidad vigente es la anterior al ajuste
+            for codigo, fila in filas.items():
+                resultado[codigo] = int(fila[3]) - deltas[codigo]
+            return resultado
+        except Exception as e:
+            print(f"Error al ajustar cantidades: {e}")
+            return None
+        finally:
+            cls._invalidar(*deltas)
+        for codigo, fila in filas.items():
+            resultado[codigo] = int(fila[3])
+            cls._notificar('ajustar', codigo, fila)
+        return resultado
+
+    @classmethod
+    def _recorrer_bloques(cls, tamano_lote: int | None):
+        """Lee toda la tabla ordenada por código y entrega cada bloque de fetchmany."""
+        with Conexiones.obtenerCursor() as cursor:
+            cursor.execute(cls._SELECT_TODOS)
+            while True:
+                filas = cursor.fetchmany(tamano_lote or cls._TAMANO_LOTE)
+                if not filas:
+                    break
+                yield filas
+
+    @classmethod
+    def recorrer_libros(cls, tamano_lote: int | None = None):
+        """
+        Recorre toda la tabla Libro ordenada por código, trayendo las filas del servidor
+        en bloques con fetchmany para que la memoria usada no dependa del tamaño de la tabla.
+        La conexión queda prestada mientras se consume el generador.
+
+        Args:
+            tamano_lote (int, opcional): Filas por cada fetchmany; por defecto _TAMANO_LOTE.
+
+        Yields:
+            tuple: (codigo, nombre, precio, cantidad, autor, edicion, Isbn) por cada libro.
+
+        Raises:
+            Exception: A diferencia de los métodos de una sola fila, los errores se propagan,
+                       para que un recorrido interrumpido no parezca una tabla más corta.
+        """
+        for filas in cls._recorrer_bloques(tamano_lote):
+            yield from filas
+
+    @classmethod
+    def recorrer_lotes(cls, tamano_lote: int | None = None):
+        """
+        Igual que recorrer_libros, pero entrega cada bloque como un LoteLibros (por
+        columnas), sin construir un objeto por fila.
+
+        Yields:
+            LoteLibros: Un lote por cada fetchmany.
+        """
+        for filas in cls._recorrer_bloques(tamano_lote):
+            yield LoteLibros.desde_filas(filas)
+
+    @classmethod
+    def agregados_inventario(cls, umbral: int, fracciones=()) -> dict:
+        """
+        Calcula en el servidor los agregados del reporte de inventario, sin traer el
+        catálogo: totales, totales por autor y por edición, libros con poco stock y los
+        precios en las posiciones de los percentiles pedidos.
+
+        Args:
+            umbral (int): Cantidad desde la que (hacia abajo) un libro tiene poco stock.
+            fracciones (tuple): Percentiles de precio, como fracciones (0.5 = mediana).
+
+        Returns:
+            dict: 'totales' (libros, unidades, valor), 'por_autor' y 'por_edicion'
+                  (listas de (valor de la columna, libros, unidades, valor)), 'bajo_stock'
+                  (lista de (codigo, nombre, cantidad)) y 'percentiles' (fracción -> precio).
+
+        Raises:
+            Exception: Los errores se propagan, para que un reporte incompleto no parezca válido.
+        """
+        agregados = {}
+        with Conexiones.obtenerCursor() as cursor:
+            libros, unidades, valor = cursor.execute(cls._TOTALES).fetchone()
+            agregados['totales'] = (libros, unidades or 0, valor or 0)
+            for clave, columna in (('por_autor', 'Autor'), ('por_edicion', 'Edicion')):
+                agregados[clave] = [tuple(fila) for fila in
+                                    cursor.execute(cls._TOTALES_POR.format(columna=columna)).fetchall()]
+            agregados['bajo_stock'] = [tuple(fila) for fila in cursor.execute(cls._BAJO_STOCK, (umbral,)).fetchall()]
+            agregados['percentiles'] = {}
+            if libros and fracciones:
+                posiciones = {fraccion: min(libros - 1, int(libros * fraccion)) for fraccion in fracciones}
+                marcadores = ', '.join('?' * len(posiciones))
+                precios = dict(cursor.execute(cls._PRECIOS_EN_POSICIONES.format(marcadores=marcadores),
+                                              list(posiciones.values())).fetchall())
+                agregados['percentiles'] = {fraccion: precios[posicion] for fraccion, posicion in posiciones.items()}
+        return agregados
+
+
+# Nombres con que aparecen las sentencias en las mediciones de Instrumentacion
+for _nombre in ('_INSERT', '_SELECT', '_UPDATE', '_DELETE', '_UPSERT', '_SELECT_TODOS', '_SELECT_VARIOS', '_BUSCAR',
+                '_AJUSTAR', '_AJUSTAR_VARIOS', '_SELECT_CANTIDAD', '_SELECT_EXISTENTES', '_UPDATE_PARCIAL',
+                '_SELECT_VERSION', '_SELECT_VARIOS_VERSION', '_UPDATE_VERSION', '_DELETE_VERSION',
+                '_TOTALES', '_TOTALES_POR', '_BAJO_STOCK', '_PRECIOS_EN_POSICIONES', '_PAGINA', '_PAGINA_VERSION'):
+    Instrumentacion.registrar(_nombre, getattr(LibroDao, _nombre))
 
 # --- Ejemplo de Uso ---
 if __name__ == '__main__':
@@ -202,3 +1239,12 @@ if __name__ == '__main__':
     #         print("Error al actualizar el libro.")
     #     else:
     #         print(f"Libro '{libro_a_actualizar.nombre}' actualizado exitosamente. Filas afectadas: {filas_actualizadas}")
+
+    print("\n--- Probando insertar_libros (carga masiva) ---")
+    # libros_proveedor = (Libro(codigo=f'{i:010d}', nombre=f'Libro {i}', precio=10.0, cantidad=5,
+    #                           autor='Autor', edicion='Primera', Isbn='9780743273565')
+    #                     for i in range(100, 200))
+    # resultado = LibroDao.insertar_libros(libros_proveedor, tamano_lote=50)
+    # print(f"Insertados: {resultado.procesados}, con error: {resultado.fallidos}")
+    # for indice, codigo, mensaje in resultado.errores:
+    #     print(f"  Fila {indice} (código {codigo}): {mensaje}")
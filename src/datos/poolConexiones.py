@@ -0,0 +1,295 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolAgotadoError(Exception):
+    """
+    Se lanza cuando no se pudo prestar una conexión del pool dentro del tiempo de espera,
+    o cuando el pool ya fue cerrado.
+    """
+
+
+class PoolConexiones:
+    """
+    Pool acotado de conexiones a la base de datos.
+
+    Mantiene entre `minimo` y `maximo` conexiones abiertas. Las conexiones se prestan
+    con `prestar()` y se devuelven con `devolver()`, o de forma más segura con el gestor
+    de contexto `conexion()`, que hace commit al salir sin errores y rollback si ocurre
+    una excepción. Antes de prestar una conexión que estuvo inactiva se verifica su
+    salud y, si está caída, se reconecta. Las conexiones inactivas por más de
+    `max_inactividad` segundos se cierran, sin bajar nunca del mínimo.
+
+    El pool no depende de ningún controlador en particular: recibe una `fabrica` que
+    devuelve conexiones DB-API (pyodbc, sqlite3 o un controlador falso en pruebas).
+    """
+
+    def __init__(self, fabrica, minimo=1, maximo=10, tiempo_espera=30.0,
+                 max_inactividad=300.0, consulta_salud='SELECT 1', validar_cada=0.0, al_cerrar=None):
+        """
+        Constructor del pool.
+
+        Args:
+            fabrica (callable): Función sin argumentos que crea una conexión nueva.
+            minimo (int): Conexiones que se abren al inicio y que nunca se desalojan.
+            maximo (int): Número máximo de conexiones abiertas al mismo tiempo.
+            tiempo_espera (float): Segundos que `prestar()` espera por una conexión libre.
+            max_inactividad (float): Segundos que una conexión libre puede estar sin uso
+                                     antes de cerrarse.
+            consulta_salud (str): Consulta usada para verificar que la conexión sigue viva.
+            validar_cada (float): Solo se verifica la salud de conexiones que estuvieron
+                                  inactivas al menos estos segundos (0 = siempre).
+            al_cerrar (callable, opcional): Se llama con cada conexión justo antes de que el
+                                            pool la cierre (por ejemplo, para soltar sus
+                                            sentencias preparadas).
+        """
+        if minimo < 0 or maximo < 1 or minimo > maximo:
+            raise ValueError("Se requiere 0 <= minimo <= maximo y maximo >= 1.")
+        self._fabrica = fabrica
+        self._minimo = minimo
+        self._maximo = maximo
+        self._tiempo_espera = tiempo_espera
+        self._max_inactividad = max_inactividad
+        self._consulta_salud = consulta_salud
+        self._validar_cada = validar_cada
+        self._al_cerrar = al_cerrar
+
+        self._cond = threading.Condition()
+        self._libres = deque()  # Pares (conexion, ultimo_uso); la derecha es la más reciente
+        self._total = 0  # Conexiones abiertas (libres + prestadas + en creación)
+        self._cerrado = False
+
+        # Contadores de uso
+        self._en_uso = 0
+        self._pico_en_uso = 0
+        self._prestamos = 0
+        self._espera_total = 0.0
+        self._espera_maxima = 0.0
+        self._timeouts = 0
+        self._creadas = 0
+        self._reconectadas = 0
+        self._desalojadas = 0
+
+        try:
+            for _ in range(minimo):
+                conexion = self._crear()
+                self._libres.append((conexion, time.monotonic()))
+                self._total += 1
+        except Exception:
+            # Si la fábrica falla a mitad, no quedan abiertas las que ya se crearon
+            self.cerrar()
+            raise
+
+    def _crear(self):
+        """Crea una conexión nueva con la fábrica y actualiza el contador."""
+        conexion = self._fabrica()
+        with self._cond:
+            self._creadas += 1
+        return conexion
+
+    def _cerrar_silencioso(self, conexion):
+        """Cierra una conexión ignorando errores (puede que ya esté caída)."""
+        if self._al_cerrar is not None:
+            try:
+                self._al_cerrar(conexion)
+            except Exception:
+                pass
+        try:
+            conexion.close()
+        except Exception:
+            pass
+
+    def _saludable(self, conexion, ultimo_uso):
+        """Verifica que la conexión responda antes de prestarla."""
+        if time.monotonic() - ultimo_uso < self._validar_cada:
+            return True
+        try:
+            cursor = conexion.cursor()
+            try:
+                cursor.execute(self._consulta_salud).fetchall()
+            finally:
+                cursor.close()
+            return True
+        except Exception:
+            return False
+
+    def _desalojar_inactivas(self):
+        """
+        Retira de la cola las conexiones libres que superaron `max_inactividad`.
+        Debe llamarse con el bloqueo tomado; devuelve las conexiones a cerrar.
+        """
+        ahora = time.monotonic()
+        por_cerrar = []
+        while (self._libres and self._total > self._minimo
+               and ahora - self._libres[0][1] > self._max_inactividad):
+            por_cerrar.append(self._libres.popleft()[0])
+            self._total -= 1
+            self._desalojadas += 1
+        return por_cerrar
+
+    def prestar(self, tiempo_espera=None):
+        """
+        Presta una conexión del pool, creando una nueva si hay cupo o esperando a que
+        se libere una si el pool está lleno.
+
+        Args:
+            tiempo_espera (float, opcional): Segundos máximos de espera; por defecto el del pool.
+
+        Returns:
+            La conexión prestada. Debe devolverse con `devolver()`.
+
+        Raises:
+            PoolAgotadoError: Si vence el tiempo de espera o el pool está cerrado.
+        """
+        inicio = time.monotonic()
+        limite = inicio + (self._tiempo_espera if tiempo_espera is None else tiempo_espera)
+        conexion, ultimo_uso = None, None
+        with self._cond:
+            while True:
+                if self._cerrado:
+                    raise PoolAgotadoError("El pool de conexiones está cerrado.")
+                if self._libres:
+                    # LIFO: se reutiliza la conexión más reciente para que las antiguas envejezcan
+                    conexion, ultimo_uso = self._libres.pop()
+                    break
+                if self._total < self._maximo:
+                    self._total += 1  # Reserva el cupo; la conexión se crea fuera del bloqueo
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self._timeouts += 1
+                    raise PoolAgotadoError("No hay conexiones libres en el pool.")
+                self._cond.wait(restante)
+
+        try:
+            if conexion is None:
+                conexion = self._crear()
+            elif not self._saludable(conexion, ultimo_uso):
+                # Conexión caída: se reemplaza en el mismo cupo
+                self._cerrar_silencioso(conexion)
+                conexion = self._crear()
+                with self._cond:
+                    self._reconectadas += 1
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+
+        espera = time.monotonic() - inicio
+        with self._cond:
+            self._en_uso += 1
+            self._pico_en_uso = max(self._pico_en_uso, self._en_uso)
+            self._prestamos += 1
+            self._espera_total += espera
+            self._espera_maxima = max(self._espera_maxima, espera)
+        return conexion
+
+    def devolver(self, conexion, descartar=False):
+        """
+        Devuelve una conexión al pool.
+
+        Args:
+            conexion: La conexión obtenida con `prestar()`.
+            descartar (bool): Si es True la conexión se cierra en lugar de reutilizarse
+                              (por ejemplo, porque falló el rollback).
+        """
+        with self._cond:
+            self._en_uso -= 1
+            if descartar or self._cerrado:
+                self._total -= 1
+                por_cerrar = [conexion]
+            else:
+                self._libres.append((conexion, time.monotonic()))
+                por_cerrar = []
+            por_cerrar.extend(self._desalojar_inactivas())
+            self._cond.notify()
+        for vieja in por_cerrar:
+            self._cerrar_silencioso(vieja)
+
+    @contextmanager
+    def conexion(self, tiempo_espera=None):
+        """
+        Gestor de contexto que presta una conexión y la devuelve al terminar.
+        Hace commit si el bloque termina bien y rollback si se lanza una excepción.
+        """
+        conexion = self.prestar(tiempo_espera)
+        descartar = False
+        try:
+            yield conexion
+            conexion.commit()
+        except BaseException:
+            try:
+                conexion.rollback()
+            except Exception:
+                descartar = True  # Una conexión que no puede hacer rollback no se reutiliza
+            raise
+        finally:
+            self.devolver(conexion, descartar)
+
+    def desalojar(self):
+        """Cierra las conexiones libres que superaron el tiempo máximo de inactividad."""
+        with self._cond:
+            por_cerrar = self._desalojar_inactivas()
+        for vieja in por_cerrar:
+            self._cerrar_silencioso(vieja)
+        return len(por_cerrar)
+
+    def cerrar(self):
+        """Cierra todas las conexiones libres; las prestadas se cierran al devolverse."""
+        with self._cond:
+            self._cerrado = True
+            por_cerrar = [conexion for conexion, _ in self._libres]
+            self._total -= len(por_cerrar)
+            self._libres.clear()
+            self._cond.notify_all()
+        for conexion in por_cerrar:
+            self._cerrar_silencioso(conexion)
+
+    def estadisticas(self) -> dict:
+        """
+        Retorna un resumen del estado y uso del pool.
+
+        Returns:
+            dict: Conexiones abiertas, libres y en uso, utilización (en uso / máximo),
+                  préstamos, tiempos de espera y contadores de creación y desalojo.
+        """
+        with self._cond:
+            return {
+                'abiertas': self._total,
+                'libres': len(self._libres),
+                'en_uso': self._en_uso,
+                'pico_en_uso': self._pico_en_uso,
+                'maximo': self._maximo,
+                'utilizacion': self._en_uso / self._maximo,
+                'prestamos': self._prestamos,
+                'espera_promedio': self._espera_total / self._prestamos if self._prestamos else 0.0,
+                'espera_maxima': self._espera_maxima,
+                'timeouts': self._timeouts,
+                'creadas': self._creadas,
+                'reconectadas': self._reconectadas,
+                'desalojadas': self._desalojadas,
+            }
+
+
+if __name__ == '__main__':
+    # Demostración con SQLite en memoria: no necesita un servidor de base de datos.
+    import sqlite3
+
+    pool = PoolConexiones(lambda: sqlite3.connect(':memory:', check_same_thread=False),
+                          minimo=2, maximo=4)
+
+    def trabajo():
+        with pool.conexion() as conexion:
+            conexion.execute('SELECT 1').fetchone()
+            time.sleep(0.01)
+
+    hilos = [threading.Thread(target=trabajo) for _ in range(16)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    print(pool.estadisticas())
+    pool.cerrar()
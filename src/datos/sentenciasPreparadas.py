@@ -0,0 +1,113 @@
+import threading
+from collections import OrderedDict
+
+
+class SentenciasPreparadas:
+    """
+    Registro de sentencias preparadas por conexión.
+
+    Cada conexión del pool guarda un cursor por sentencia fija de LibroDao (_SELECT,
+    _INSERT, _UPDATE, _DELETE...). Ejecutar siempre el mismo texto en el mismo cursor
+    permite que el controlador reutilice lo que ya preparó: pyodbc omite SQLPrepare si
+    la sentencia es la misma que la anterior del cursor, y SQL Server ejecuta el plan ya
+    compilado (sp_execute) en lugar de volver a analizar el texto. sqlite3 ya guarda las
+    sentencias preparadas de cada conexión (cached_statements); con el registro además
+    se evita crear y cerrar un cursor en cada llamada.
+
+    Solo deben registrarse sentencias de texto fijo: las que se arman con listas IN de
+    largo variable o condiciones opcionales usan cursores normales. Cada conexión guarda
+    como máximo _MAXIMO_POR_CONEXION cursores (los menos usados se cierran).
+
+    El pool avisa con olvidar() antes de cerrar una conexión, para soltar sus cursores.
+    """
+
+    _MAXIMO_POR_CONEXION = 32
+    _por_conexion = {}  # id(conexion) -> (conexion, OrderedDict sql -> cursor)
+    _bloqueo = threading.Lock()
+    activo = True  # Con False, obtenerCursor(sql) usa un cursor nuevo en cada llamada
+    _preparadas = 0  # Cursores creados por el registro
+    _reutilizadas = 0  # Llamadas que encontraron su cursor ya preparado
+
+    @classmethod
+    def cursor(cls, conexion, sql: str):
+        """
+        Retorna el cursor de `sql` en esta conexión, creándolo la primera vez. La conexión
+        debe estar prestada al hilo que llama (el pool garantiza que un cursor lo usa un
+        solo hilo a la vez).
+        """
+        with cls._bloqueo:
+            entrada = cls._por_conexion.get(id(conexion))
+            if entrada is None or entrada[0] is not conexion:
+                # Conexión nueva (o una que reutiliza el id de otra que no se olvidó)
+                entrada = cls._por_conexion[id(conexion)] = (conexion, OrderedDict())
+            cursores = entrada[1]
+            cursor = cursores.get(sql)
+            if cursor is not None:
+                cursores.move_to_end(sql)
+                cls._reutilizadas += 1
+                return cursor
+        cursor = conexion.cursor()
+        sobrantes = []
+        with cls._bloqueo:
+            cursores[sql] = cursor
+            cls._preparadas += 1
+            while len(cursores) > cls._MAXIMO_POR_CONEXION:
+                sobrantes.append(cursores.popitem(last=False)[1])
+        for sobrante in sobrantes:
+            cls._cerrar(sobrante)
+        return cursor
+
+    @staticmethod
+    def liberar(cursor):
+        """
+        Termina de leer el resultado pendiente del cursor (una fila como mucho en las
+        sentencias por código), para que no quede una lectura abierta en la conexión
+        mientras el cursor espera a la siguiente llamada.
+        """
+        try:
+            if cursor.description is not None:
+                cursor.fetchall()
+        except Exception:
+            pass  # Sin resultado pendiente o conexión caída: el pool se encarga
+
+    @staticmethod
+    def _cerrar(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+    @classmethod
+    def olvidar(cls, conexion):
+        """Cierra y descarta los cursores de una conexión (antes de cerrarla)."""
+        with cls._bloqueo:
+            entrada = cls._por_conexion.get(id(conexion))
+            if entrada is None or entrada[0] is not conexion:
+                return
+            del cls._por_conexion[id(conexion)]
+        for cursor in entrada[1].values():
+            cls._cerrar(cursor)
+
+    @classmethod
+    def limpiar(cls):
+        """Descarta todos los cursores registrados y reinicia los contadores."""
+        with cls._bloqueo:
+            entradas = list(cls._por_conexion.values())
+            cls._por_conexion = {}
+            cls._preparadas = cls._reutilizadas = 0
+        for _, cursores in entradas:
+            for cursor in cursores.values():
+                cls._cerrar(cursor)
+
+    @classmethod
+    def estadisticas(cls) -> dict:
+        """
+        Returns:
+            dict: Conexiones con cursores registrados, cursores abiertos, cursores creados
+                  y llamadas que reutilizaron uno ya preparado.
+        """
+        with cls._bloqueo:
+            return {'conexiones': len(cls._por_conexion),
+                    'cursores': sum(len(cursores) for _, cursores in cls._por_conexion.values()),
+                    'preparadas': cls._preparadas,
+                    'reutilizadas': cls._reutilizadas}
@@ -0,0 +1,374 @@
+import argparse
+import bisect
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+
+from src.datos.feedCambios import FeedCambios, FeedDesbordado
+from src.datos.libroDao import LibroDao
+from src.dominio.libro import Libro
+
+# Cabecera: identificador, versión del formato, bytes por código, número de libros,
+# bytes del texto, siguiente offset del feed de cambios (-1 si no se sigue uno) y
+# momento (time.time()) de la última actualización.
+_CABECERA = struct.Struct('<8sIIQQqd')
+# Registro fijo por libro: precio, cantidad, posición de sus textos y largo en bytes de
+# nombre, autor, edición e ISBN (los textos van seguidos, en ese orden).
+_REGISTRO = struct.Struct('<dqQHHHH')
+
+
+class _Claves:
+    """Vista de la región de códigos ordenados, para buscar con bisect sin copiarla."""
+    __slots__ = ('_mapa', '_inicio', '_tamano', '_cantidad')
+
+    def __init__(self, mapa, inicio, tamano, cantidad):
+        self._mapa = mapa
+        self._inicio = inicio
+        self._tamano = tamano
+        self._cantidad = cantidad
+
+    def __len__(self):
+        return self._cantidad
+
+    def __getitem__(self, indice):
+        desde = self._inicio + indice * self._tamano
+        return self._mapa[desde:desde + self._tamano]
+
+
+class SnapshotLibros:
+    """
+    Copia local de la tabla Libro en un archivo binario que se lee con mmap: la
+    aplicación puede buscar libros apenas arranca, sin abrir la conexión, y seguir
+    buscando si se cae el enlace con el servidor (ver LibroDao.usar_snapshot).
+
+    El archivo tiene una cabecera, los códigos ordenados (todos del mismo ancho, para
+    buscar con bisect), un registro de ancho fijo por libro y al final los textos. Abrirlo
+    no lee el archivo: el sistema operativo trae a memoria solo las páginas que se tocan
+    en cada búsqueda, y los números se decodifican directamente desde el mapa.
+
+    Se construye con construir() y se pone al día con refrescar(), que aplica los
+    eventos de un FeedCambios desde el último offset aplicado: las filas sin cambios se
+    copian tal cual y los textos nuevos se agregan al final. Los textos que dejan de usarse
+    quedan en el archivo hasta que pasan de _TEXTO_MUERTO_MAXIMO de la región de textos;
+    entonces se reescribe el snapshot completo solo con los que siguen en uso. Es de solo
+    lectura para la aplicación; no reemplaza a la base de datos.
+    """
+
+    _IDENTIFICADOR = b'LIBSNAP1'
+    _VERSION_FORMATO = 1
+    _TAMANO_CODIGO = 20  # Codigo es varchar(20)
+    _BLOQUE_COPIA = 1 << 20  # Bytes por cada copia de las partes sin cambios
+    _TEXTO_MUERTO_MAXIMO = 0.5  # Fracción de textos sin uso a partir de la cual aplicar() compacta
+
+    def __init__(self, ruta: str):
+        """Abre un snapshot existente (ver abrir)."""
+        self.ruta = ruta
+        self._archivo = open(ruta, 'rb')
+        try:
+            self._mapa = mmap.mmap(self._archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._archivo.close()
+            raise ValueError(f"Snapshot vacío: {ruta}") from None
+        identificador, version, tamano, cantidad, self._bytes_texto, offset, self.momento = \
+            _CABECERA.unpack_from(self._mapa, 0)
+        if identificador != self._IDENTIFICADOR or version != self._VERSION_FORMATO or tamano != self._TAMANO_CODIGO:
+            self.cerrar()
+            raise ValueError(f"Archivo de snapshot no válido o de otra versión: {ruta}")
+        self.offset_feed = offset if offset >= 0 else None
+        self._cantidad = cantidad
+        self._inicio_registros = _CABECERA.size + cantidad * tamano
+        self._inicio_texto = self._inicio_registros + cantidad * _REGISTRO.size
+        self._claves = _Claves(self._mapa, _CABECERA.size, tamano, cantidad)
+
+    @classmethod
+    def abrir(cls, ruta: str) -> 'SnapshotLibros':
+        """
+        Abre un snapshot guardado con construir().
+
+        Raises:
+            ValueError: Si el archivo no es un snapshot o es de otra versión del formato.
+        """
+        return cls(ruta)
+
+    def cerrar(self):
+        """Libera el mapa y el archivo."""
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+        self._archivo.close()
+
+    def __len__(self):
+        return self._cantidad
+
+    def __contains__(self, codigo):
+        return self._buscar(codigo) is not None
+
+    def __repr__(self):
+        return f"SnapshotLibros(ruta={self.ruta!r}, libros={self._cantidad}, offset_feed={self.offset_feed})"
+
+    # --- Lectura ---
+
+    @classmethod
+    def _clave(cls, codigo) -> bytes:
+        clave = str(codigo).encode('utf-8')
+        if len(clave) > cls._TAMANO_CODIGO:
+            raise ValueError(f"Código demasiado largo para el snapshot: {codigo}")
+        return clave.ljust(cls._TAMANO_CODIGO, b'\0')
+
+    def _buscar(self, codigo) -> int | None:
+        """Posición del libro en el snapshot, o None si no está."""
+        try:
+            clave = self._clave(codigo)
+        except ValueError:
+            return None
+        posicion = bisect.bisect_left(self._claves, clave)
+        if posicion < self._cantidad and self._claves[posicion] == clave:
+            return posicion
+        return None
+
+    def _largo_textos(self, posicion: int) -> int:
+        """Bytes de texto que usa el libro en `posicion`."""
+        return sum(_REGISTRO.unpack_from(self._mapa, self._inicio_registros + posicion * _REGISTRO.size)[3:])
+
+    def _bytes_vivos(self) -> int:
+        """Bytes de la región de textos que usa algún libro (el resto quedó de versiones anteriores)."""
+        registros = self._mapa[self._inicio_registros:self._inicio_texto]
+        return sum(sum(registro[3:]) for registro in _REGISTRO.iter_unpack(registros))
+
+    def _fila_en(self, posicion: int) -> tuple:
+        precio, cantidad, texto, largo_nombre, largo_autor, largo_edicion, largo_isbn = \
+            _REGISTRO.unpack_from(self._mapa, self._inicio_registros + posicion * _REGISTRO.size)
+        desde = self._inicio_texto + texto
+        textos = []
+        for largo in (largo_nombre, largo_autor, largo_edicion, largo_isbn):
+            textos.append(self._mapa[desde:desde + largo].decode('utf-8'))
+            desde += largo
+        codigo = self._claves[posicion].rstrip(b'\0').decode('utf-8')
+        return codigo, textos[0], precio, cantidad, textos[1], textos[2], textos[3]
+
+    def fila(self, codigo) -> tuple | None:
+        """Retorna (codigo, nombre, precio, cantidad, autor, edicion, Isbn), o None si no está."""
+        posicion = self._buscar(codigo)
+        return self._fila_en(posicion) if posicion is not None else None
+
+    def seleccionar_libro(self, codigo) -> Libro | None:
+        """Igual que LibroDao.seleccionar_libro, pero desde el snapshot."""
+        fila = self.fila(codigo)
+        return LibroDao._libro_desde_fila(fila) if fila is not None else None
+
+    def filas(self):
+        """Recorre todo el snapshot en orden de código."""
+        for posicion in range(self._cantidad):
+            yield self._fila_en(posicion)
+
+    # --- Escritura ---
+
+    @classmethod
+    def _codificar(cls, fila, texto: int) -> tuple[bytes, bytes, bytes]:
+        """Retorna (clave, registro, textos) de una fila; `texto` es la posición de sus textos."""
+        codigo, nombre, precio, cantidad, autor, edicion, isbn = fila
+        textos = [str(valor).encode('utf-8') for valor in (nombre, autor, edicion, isbn)]
+        registro = _REGISTRO.pack(float(precio), int(cantidad), texto, *(len(valor) for valor in textos))
+        return cls._clave(codigo), registro, b''.join(textos)
+
+    @classmethod
+    def construir(cls, ruta: str, filas=None, offset_feed: int | None = None) -> 'SnapshotLibros':
+        """
+        Escribe un snapshot completo y lo abre. Para seguirlo con un FeedCambios, pase
+        `offset_feed=feed.siguiente` tomado antes de leer la tabla, así los cambios
+        hechos mientras se lee se vuelven a aplicar en el siguiente refrescar().
+
+        Args:
+            ruta (str): Archivo de destino; se reemplaza al terminar.
+            filas (Iterable[tuple], opcional): Filas (codigo, nombre, precio, cantidad,
+                                               autor, edicion, Isbn); por defecto toda la tabla.
+            offset_feed (int, opcional): Offset del feed desde el que se refrescará.
+        """
+        os.replace(cls._escribir(ruta, filas, offset_feed), ruta)
+        return cls(ruta)
+
+    @classmethod
+    def _escribir(cls, ruta: str, filas, offset_feed: int | None) -> str:
+        """Escribe el snapshot completo junto a `ruta` y retorna el archivo temporal."""
+        filas = LibroDao.recorrer_libros() if filas is None else filas
+        directorio = os.path.dirname(os.path.abspath(ruta))
+        with tempfile.TemporaryFile(dir=directorio) as registros, tempfile.TemporaryFile(dir=directorio) as textos:
+            claves = []
+            anterior = None
+            ordenadas = True
+            largo_texto = 0
+            for fila in filas:
+                clave, registro, texto = cls._codificar(fila, largo_texto)
+                ordenadas = ordenadas and (anterior is None or clave > anterior)
+                anterior = clave
+                claves.append(clave)
+                registros.write(registro)
+                textos.write(texto)
+                largo_texto += len(texto)
+            if not ordenadas:
+                # El orden de la base puede no coincidir con el de los bytes (intercalación)
+                orden = sorted(range(len(claves)), key=claves.__getitem__)
+                registros.seek(0)
+                todos = registros.read()
+                registros.seek(0)
+                registros.truncate()
+                for indice in orden:
+                    registros.write(todos[indice * _REGISTRO.size:(indice + 1) * _REGISTRO.size])
+                claves = [claves[indice] for indice in orden]
+                if any(a == b for a, b in zip(claves, claves[1:])):
+                    raise ValueError("Hay códigos repetidos en las filas del snapshot")
+            temporal = ruta + '.tmp'
+            with open(temporal, 'wb') as destino:
+                destino.write(_CABECERA.pack(cls._IDENTIFICADOR, cls._VERSION_FORMATO, cls._TAMANO_CODIGO,
+                                             len(claves), largo_texto,
+                                             -1 if offset_feed is None else offset_feed, time.time()))
+                destino.write(b''.join(claves))
+                for origen in (registros, textos):
+                    origen.seek(0)
+                    shutil.copyfileobj(origen, destino, cls._BLOQUE_COPIA)
+        return temporal
+
+    def aplicar(self, cambios: dict, offset_feed: int | None = None) -> 'SnapshotLibros':
+        """
+        Escribe una versión nueva del snapshot con los cambios, reemplaza el archivo y
+        retorna el snapshot nuevo ya abierto (este queda cerrado). Las filas sin cambios
+        y los textos existentes se copian en bloque, sin decodificarlos, salvo que los
+        textos sin uso pasen de _TEXTO_MUERTO_MAXIMO: entonces se escribe compactado.
+
+        Args:
+            cambios (dict): codigo -> fila nueva (codigo, nombre, ...), o None para quitarlo.
+            offset_feed (int, opcional): Offset del feed a guardar; por defecto el actual.
+        """
+        # Plan: tramos del snapshot actual que se copian tal cual, y filas nuevas entre ellos
+        plan = []
+        siguiente = 0
+        cantidad = self._cantidad
+        vivos = self._bytes_vivos()
+        for codigo in sorted(cambios, key=self._clave):
+            fila = cambios[codigo]
+            posicion = bisect.bisect_left(self._claves, self._clave(codigo))
+            existe = posicion < self._cantidad and self._claves[posicion] == self._clave(codigo)
+            plan.append(('copiar', siguiente, posicion))
+            if existe:
+                vivos -= self._largo_textos(posicion)
+            if fila is not None:
+                plan.append(('nueva', tuple(fila), None))
+            siguiente = posicion + 1 if existe else posicion
+            cantidad += (fila is not None) - existe
+        plan.append(('copiar', siguiente, self._cantidad))
+
+        nuevas = {}  # Posición en el plan -> (clave, registro, textos)
+        largo_texto = self._bytes_texto
+        for indice, (accion, fila, _) in enumerate(plan):
+            if accion == 'nueva':
+                nuevas[indice] = self._codificar(fila, largo_texto)
+                largo_texto += len(nuevas[indice][2])
+                vivos += len(nuevas[indice][2])
+        if largo_texto - vivos > largo_texto * self._TEXTO_MUERTO_MAXIMO:
+            return self._compactar(plan, offset_feed)
+
+        mapa = self._mapa
+        temporal = self.ruta + '.tmp'
+        with open(temporal, 'wb') as destino:
+            destino.write(_CABECERA.pack(self._IDENTIFICADOR, self._VERSION_FORMATO, self._TAMANO_CODIGO,
+                                         cantidad, largo_texto,
+                                         self._offset_para_cabecera(offset_feed), time.time()))
+            for inicio_region, tamano, parte in ((_CABECERA.size, self._TAMANO_CODIGO, 0),
+                                                 (self._inicio_registros, _REGISTRO.size, 1)):
+                for indice, (accion, desde, hasta) in enumerate(plan):
+                    if accion == 'nueva':
+                        destino.write(nuevas[indice][parte])
+                    elif hasta > desde:
+                        destino.write(mapa[inicio_region + desde * tamano:inicio_region + hasta * tamano])
+            for desde in range(self._inicio_texto, self._inicio_texto + self._bytes_texto, self._BLOQUE_COPIA):
+                destino.write(mapa[desde:min(desde + self._BLOQUE_COPIA, self._inicio_texto + self._bytes_texto)])
+            for indice in sorted(nuevas):
+                destino.write(nuevas[indice][2])
+        # En Windows no se puede reemplazar un archivo mapeado: se cierra antes
+        self.cerrar()
+        os.replace(temporal, self.ruta)
+        return type(self)(self.ruta)
+
+    def _compactar(self, plan, offset_feed) -> 'SnapshotLibros':
+        """Escribe el snapshot completo siguiendo el plan de aplicar(), solo con los textos en uso."""
+        def filas():
+            for accion, desde, hasta in plan:
+                if accion == 'nueva':
+                    yield desde
+                else:
+                    for posicion in range(desde, hasta):
+                        yield self._fila_en(posicion)
+        temporal = self._escribir(self.ruta, filas(), self._offset_para_cabecera(offset_feed))
+        self.cerrar()
+        os.replace(temporal, self.ruta)
+        return type(self)(self.ruta)
+
+    def _offset_para_cabecera(self, offset_feed):
+        if offset_feed is not None:
+            return offset_feed
+        return self.offset_feed if self.offset_feed is not None else -1
+
+    def refrescar(self, feed, tamano_lote: int = 10_000) -> 'SnapshotLibros':
+        """
+        Aplica los eventos del feed publicados desde la última actualización y retorna
+        el snapshot al día (el mismo si no había cambios). Si el snapshot no sigue un
+        feed, o sus eventos ya no están disponibles, se reconstruye desde la base.
+
+        Args:
+            feed (FeedCambios): El feed de cambios de LibroDao.
+            tamano_lote (int): Eventos que se piden al feed por vez.
+        """
+        if self.offset_feed is None:
+            return self._reconstruir(feed)
+        cambios = {}
+        desde = self.offset_feed
+        try:
+            while True:
+                lote = feed.leer(desde, tamano_lote)
+                if not lote:
+                    break
+                for evento in lote:
+                    # Solo importa el último estado de cada código
+                    cambios[evento.codigo] = evento.fila if evento.operacion != 'eliminar' else None
+                desde = lote[-1].offset + 1
+        except FeedDesbordado:
+            return self._reconstruir(feed)
+        if not cambios:
+            return self
+        return self.aplicar(cambios, desde)
+
+    def _reconstruir(self, feed) -> 'SnapshotLibros':
+        temporal = self._escribir(self.ruta, None, feed.siguiente)
+        self.cerrar()
+        os.replace(temporal, self.ruta)
+        return type(self)(self.ruta)
+
+
+def main(argumentos=None) -> int:
+    """Crea el snapshot o, con --feed y un snapshot existente, lo pone al día."""
+    parser = argparse.ArgumentParser(description="Snapshot local de la tabla Libro para búsquedas sin conexión.")
+    parser.add_argument('ruta', help="Archivo del snapshot")
+    parser.add_argument('--feed', help="Archivo de un FeedCambios para refrescarlo en lugar de reconstruirlo")
+    args = parser.parse_args(argumentos)
+
+    inicio = time.perf_counter()
+    try:
+        feed = FeedCambios(args.feed) if args.feed else None
+        if feed is not None and os.path.exists(args.ruta):
+            snapshot = SnapshotLibros.abrir(args.ruta).refrescar(feed)
+        else:
+            snapshot = SnapshotLibros.construir(args.ruta, offset_feed=feed.siguiente if feed else None)
+    except Exception as e:
+        print(f"Error al crear el snapshot: {e}")
+        return 1
+    print(f"{snapshot} listo en {time.perf_counter() - inicio:.2f} s")
+    snapshot.cerrar()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,210 @@
+import itertools
+import random
+import time
+from contextlib import contextmanager
+
+from src.datos.conexiones import Conexiones
+from src.datos.instrumentacion import Instrumentacion
+
+
+class TransaccionFallida(Exception):
+    """
+    Una sentencia de la unidad de trabajo falló y se deshizo toda la transacción. La
+    excepción original queda en __cause__ (los métodos de LibroDao la capturan y
+    devuelven -1 o None, así que sin este aviso el error pasaría inadvertido).
+    """
+
+
+class UnidadDeTrabajo:
+    """
+    Agrupa varias llamadas a LibroDao en una sola transacción sobre una conexión
+    dedicada del pool: nada se confirma hasta salir del bloque y, si algo falla, no se
+    confirma nada.
+
+        with UnidadDeTrabajo():
+            LibroDao.actualizar_libro(origen)
+            LibroDao.actualizar_libro(destino)
+
+    Mientras la unidad está abierta, todos los métodos de LibroDao llamados desde el
+    mismo hilo usan su conexión y no hacen commit propio. Los avisos a los observadores
+    de LibroDao se envían recién después del commit, y la caché de lectura no se usa
+    dentro de la unidad (para no guardar datos que podrían deshacerse).
+
+    Si una llamada falla, la unidad queda marcada: al salir se hace rollback y se lanza
+    TransaccionFallida. Para tolerar fallos parciales, agrupe las llamadas en un punto de
+    guardado: si algo falla dentro, solo se deshace lo hecho desde ese punto.
+
+    Para reintentar automáticamente cuando la base elige la transacción como víctima de
+    un interbloqueo, use UnidadDeTrabajo.ejecutar.
+    """
+
+    _contador = itertools.count(1)  # Para nombres únicos de puntos de guardado
+
+    def __init__(self, aislamiento: str | None = None, tiempo_espera: float | None = None):
+        """
+        Args:
+            aislamiento (str, opcional): Nivel de aislamiento, por ejemplo 'serializable'
+                                         o 'repeatable read'; por defecto el del motor.
+            tiempo_espera (float, opcional): Segundos de espera por una conexión del pool.
+        """
+        self._backend = Conexiones.obtenerBackend()
+        self.aislamiento = self._backend.validar_aislamiento(aislamiento)
+        self.tiempo_espera = tiempo_espera
+        self._pool = None
+        self._conexion = None
+        self._entregada = None  # La conexión que ven los DAO (medida si hay instrumentación)
+        self._error = None  # Primer error desde el inicio (o desde el punto de guardado actual)
+        self._al_confirmar = []  # Funciones que se llaman después del commit
+
+    # --- Ciclo de vida ---
+
+    def __enter__(self):
+        if Conexiones.transaccion_actual() is not None:
+            raise RuntimeError("Ya hay una unidad de trabajo abierta en este hilo; use punto_guardado().")
+        self._pool = Conexiones.obtenerPool()
+        inicio = time.perf_counter()
+        self._conexion = self._pool.prestar(self.tiempo_espera)
+        try:
+            self._backend.iniciar_transaccion(self._conexion, self.aislamiento)
+        except BaseException:
+            self._pool.devolver(self._conexion, descartar=True)
+            raise
+        if Instrumentacion.activa():
+            Instrumentacion._prestamo(time.perf_counter() - inicio)
+            self._entregada = Instrumentacion.envolver(self._conexion)
+        else:
+            self._entregada = self._conexion
+        Conexiones._fijar_transaccion(self)
+        return self
+
+    def __exit__(self, tipo, valor, traza):
+        Conexiones._fijar_transaccion(None)
+        conexion, self._conexion, self._entregada = self._conexion, None, None
+        confirmar = tipo is None and self._error is None
+        descartar = False
+        try:
+            if confirmar:
+                conexion.commit()
+            else:
+                conexion.rollback()
+        except BaseException:
+            confirmar = False
+            try:
+                conexion.rollback()
+            except Exception:
+                descartar = True
+            if tipo is None:
+                raise
+        finally:
+            try:
+                if not descartar:
+                    self._backend.terminar_transaccion(conexion, self.aislamiento)
+            except Exception:
+                descartar = True
+            self._pool.devolver(conexion, descartar=descartar)
+            pendientes, self._al_confirmar = self._al_confirmar, []
+            if confirmar:
+                for funcion in pendientes:
+                    funcion()
+        if tipo is None and self._error is not None:
+            raise TransaccionFallida(f"Se deshizo la transacción: {self._error}") from self._error
+        return False
+
+    @property
+    def activa(self) -> bool:
+        return self._conexion is not None
+
+    # --- Uso desde Conexiones y LibroDao ---
+
+    @contextmanager
+    def _usar(self):
+        """Entrega la conexión de la unidad a Conexiones.obtenerConexion, sin commit."""
+        try:
+            yield self._entregada
+        except Exception as e:
+            if self._error is None:
+                self._error = e
+            raise
+
+    def marcar_fallida(self, error: Exception):
+        """
+        Marca la unidad como fallida sin lanzar la excepción: al salir se hace rollback
+        (o se vuelve al punto de guardado actual), como si una llamada hubiera fallado.
+        """
+        if self._error is None:
+            self._error = error
+
+    def al_confirmar(self, funcion):
+        """Registra una función sin argumentos que se llama solo si la unidad se confirma."""
+        self._al_confirmar.append(funcion)
+
+    # --- Puntos de guardado ---
+
+    @contextmanager
+    def punto_guardado(self, nombre: str | None = None):
+        """
+        Marca un punto dentro de la transacción. Si el bloque lanza una excepción o
+        alguna llamada a LibroDao falla dentro de él, se vuelve a ese punto y la
+        unidad puede seguir y confirmarse.
+
+            with UnidadDeTrabajo() as unidad:
+                for libro in libros:
+                    with unidad.punto_guardado():
+                        LibroDao.insertar_libro(libro)  # si falla, se omite solo este
+
+        Yields:
+            str: El nombre del punto de guardado.
+        """
+        if not self.activa:
+            raise RuntimeError("La unidad de trabajo no está abierta.")
+        nombre = nombre or f"punto_{next(self._contador)}"
+        error_anterior, self._error = self._error, None
+        pendientes = len(self._al_confirmar)
+        backend, conexion = self._backend, self._conexion
+        backend.ejecutar_punto(conexion, backend._PUNTO_GUARDADO, nombre)
+        try:
+            yield nombre
+        except BaseException:
+            self._volver(nombre, pendientes)
+            self._error = error_anterior
+            raise
+        if self._error is not None:
+            self._volver(nombre, pendientes)
+        else:
+            backend.ejecutar_punto(conexion, backend._LIBERAR_PUNTO, nombre)
+        self._error = error_anterior
+
+    def _volver(self, nombre, pendientes):
+        backend = self._backend
+        backend.ejecutar_punto(self._conexion, backend._VOLVER_A_PUNTO, nombre)
+        backend.ejecutar_punto(self._conexion, backend._LIBERAR_PUNTO, nombre)
+        del self._al_confirmar[pendientes:]
+
+    # --- Reintentos ---
+
+    @classmethod
+    def ejecutar(cls, funcion, *args, aislamiento: str | None = None, reintentos: int = 3,
+                 espera_inicial: float = 0.05, espera_maxima: float = 2.0):
+        """
+        Ejecuta `funcion(unidad, *args)` dentro de una unidad de trabajo y la repite si la
+        base la aborta por un interbloqueo o un bloqueo (según Backend.es_conflicto),
+        esperando cada vez el doble, con una variación al azar para que los reintentos de
+        varios equipos no vuelvan a coincidir.
+
+        Returns:
+            Lo que retorne `funcion`.
+
+        Raises:
+            TransaccionFallida: Si falla por otro motivo o se agotan los reintentos.
+        """
+        backend = Conexiones.obtenerBackend()
+        for intento in itertools.count():
+            try:
+                with cls(aislamiento) as unidad:
+                    return funcion(unidad, *args)
+            except Exception as e:
+                causa = e.__cause__ if isinstance(e, TransaccionFallida) else e
+                if intento >= reintentos or not backend.es_conflicto(causa):
+                    raise
+                espera = min(espera_maxima, espera_inicial * 2 ** intento)
+                time.sleep(espera * random.uniform(0.5, 1.5))
@@ -10,6 +10,8 @@ class Libro(Producto):
     Esta clase representa un libro. Hereda de Producto y le agregamos detalles propios,
     como el autor, la edición y el ISBN
     """
+    __slots__ = ('_autor', '_edicion', '_isbn')
+
     def __init__(self, codigo, nombre, precio, cantidad, autor, edicion, Isbn):
         """
         Constructor de la clase Libro.
@@ -37,6 +39,7 @@ class Libro(Producto):
     @autor.setter
     def autor(self, nuevo_autor):
         """Setter para el autor del libro."""
+        self._marcar('autor', self._autor, nuevo_autor)
         self._autor = nuevo_autor
 
     @property
@@ -47,6 +50,7 @@ class Libro(Producto):
     @edicion.setter
     def edicion(self, nueva_edicion):
         """Setter para la edición del libro."""
+        self._marcar('edicion', self._edicion, nueva_edicion)
         self._edicion = nueva_edicion
 
     @property
@@ -57,6 +61,7 @@ class Libro(Producto):
     @Isbn.setter
     def Isbn(self, nuevo_isbn):
         """Setter para el ISBN del libro."""
+        self._marcar('Isbn', self._isbn, nuevo_isbn)
         self._isbn = nuevo_isbn
 
 
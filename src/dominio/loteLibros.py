@@ -0,0 +1,103 @@
+# Integrantes del Grupo#1 : Joselyne Paulette Játiva Vera
+#                           Joselin Mariuxi Rodriguez Saldaña
+#                           Jemina Victoria Suárez Veintimilla
+#                           Rosa Angelica Bustamante Moreira
+
+from array import array
+
+from src.dominio.libro import Libro
+
+
+class LoteLibros:
+    """
+    Esta clase guarda muchos libros por columnas: una lista para los códigos, otra para
+    los nombres, un arreglo numérico para los precios, etc. Así se evita crear un objeto
+    Libro por fila cuando se lee el catálogo en bloque para reportes o cargas masivas.
+
+    Precios y cantidades van en arreglos de `array` (8 bytes por valor, sin objetos de
+    Python), que se pueden pasar a NumPy sin copiar. Un Libro solo se construye cuando
+    se pide una fila con lote[i].
+    """
+    __slots__ = ('codigos', 'nombres', 'precios', 'cantidades', 'autores', 'ediciones', 'isbns')
+
+    def __init__(self):
+        """Crea un lote vacío."""
+        self.codigos = []
+        self.nombres = []
+        self.precios = array('d')
+        self.cantidades = array('q')
+        self.autores = []
+        self.ediciones = []
+        self.isbns = []
+
+    @classmethod
+    def desde_filas(cls, filas) -> 'LoteLibros':
+        """Crea un lote a partir de filas (codigo, nombre, precio, cantidad, autor, edicion, Isbn)."""
+        lote = cls()
+        lote.extender(filas)
+        return lote
+
+    def agregar(self, fila):
+        """Agrega una fila (codigo, nombre, precio, cantidad, autor, edicion, Isbn)."""
+        codigo, nombre, precio, cantidad, autor, edicion, isbn = fila
+        self.codigos.append(codigo)
+        self.nombres.append(nombre)
+        self.precios.append(float(precio))
+        self.cantidades.append(int(cantidad))
+        self.autores.append(autor)
+        self.ediciones.append(edicion)
+        self.isbns.append(isbn)
+
+    def extender(self, filas):
+        """Agrega varias filas, columna por columna."""
+        filas = filas if isinstance(filas, list) else list(filas)
+        if not filas:
+            return
+        codigos, nombres, precios, cantidades, autores, ediciones, isbns = zip(*filas)
+        self.codigos.extend(codigos)
+        self.nombres.extend(nombres)
+        self.precios.extend(map(float, precios))
+        self.cantidades.extend(map(int, cantidades))
+        self.autores.extend(autores)
+        self.ediciones.extend(ediciones)
+        self.isbns.extend(isbns)
+
+    def __len__(self):
+        return len(self.codigos)
+
+    def fila(self, indice: int) -> tuple:
+        """Retorna la fila `indice` como tupla (codigo, nombre, precio, cantidad, autor, edicion, Isbn)."""
+        return (self.codigos[indice], self.nombres[indice], self.precios[indice], self.cantidades[indice],
+                self.autores[indice], self.ediciones[indice], self.isbns[indice])
+
+    def filas(self):
+        """Recorre el lote como tuplas, sin construir objetos Libro."""
+        return zip(self.codigos, self.nombres, self.precios, self.cantidades,
+                   self.autores, self.ediciones, self.isbns)
+
+    def __getitem__(self, indice: int) -> Libro:
+        """Construye el Libro de la fila `indice`."""
+        codigo, nombre, precio, cantidad, autor, edicion, isbn = self.fila(indice)
+        return Libro(codigo=codigo, nombre=nombre, precio=precio, cantidad=cantidad,
+                     autor=autor, edicion=edicion, Isbn=isbn)
+
+    def __iter__(self):
+        """Recorre el lote como objetos Libro (uno por fila)."""
+        for indice in range(len(self)):
+            yield self[indice]
+
+    def a_numpy(self):
+        """
+        Retorna precios y cantidades como arreglos de NumPy, compartiendo la memoria del
+        lote (sin copiar). Requiere tener NumPy instalado. Mientras esos arreglos
+        existan, el lote no puede crecer.
+
+        Returns:
+            tuple: (precios float64, cantidades int64).
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("Se necesita NumPy para LoteLibros.a_numpy (pip install numpy).") from None
+        return (np.frombuffer(self.precios, dtype=np.float64),
+                np.frombuffer(self.cantidades, dtype=np.int64))
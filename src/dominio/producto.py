@@ -7,7 +7,16 @@ class Producto:
     """
     Esta clase representa un producto general de la librería. La usamos como base
     para crear otros productos más específicos.
+
+    Usa __slots__ en lugar de un __dict__ por objeto: cada producto ocupa menos memoria,
+    lo que se nota al cargar el catálogo completo en reportes o cachés.
+
+    Cada producto recuerda qué campos cambiaron desde que se leyó de la base de datos
+    (ver campos_modificados), para que al actualizarlo solo se escriban esos campos,
+    y la versión de la fila que se leyó (ver version), para no pisar cambios ajenos.
     """
+    __slots__ = ('_codigo', '_nombre', '_precio', '_cantidad', '_modificados', '_version')
+
     def __init__(self, codigo, nombre, precio, cantidad):
         """
         Aquí estamos definiendo el constructor de la clase Producto. Es decir,
@@ -23,6 +32,39 @@ class Producto:
         self._nombre = nombre
         self._precio = precio
         self._cantidad = cantidad
+        # None: no se sabe qué hay en la base (un producto nuevo o armado desde un formulario)
+        self._modificados = None
+        self._version = None
+
+    # Seguimiento de cambios
+    def marcar_limpio(self):
+        """Indica que el producto coincide con la base de datos (recién leído o grabado)."""
+        self._modificados = set()
+
+    def campos_modificados(self):
+        """
+        Retorna los nombres de los campos que cambiaron desde marcar_limpio(), por
+        ejemplo {'precio'}, o None si el producto nunca se marcó como limpio.
+        """
+        return frozenset(self._modificados) if self._modificados is not None else None
+
+    def _marcar(self, campo, actual, nuevo):
+        """Llamado por los setters: anota el campo si el valor realmente cambió."""
+        if self._modificados is not None and actual != nuevo:
+            self._modificados.add(campo)
+
+    @property
+    def version(self):
+        """
+        Versión de la fila en la base de datos cuando se leyó (un número o, en SQL
+        Server, los bytes de rowversion), o None si no se conoce. No cuenta como campo
+        modificado: la asigna LibroDao.
+        """
+        return self._version
+
+    @version.setter
+    def version(self, nueva_version):
+        self._version = nueva_version
 
     # Getters y setters como propiedades
     @property
@@ -33,6 +75,7 @@ class Producto:
     @codigo.setter
     def codigo(self, nuevo_codigo):
         """Setter para el código del producto."""
+        self._marcar('codigo', self._codigo, nuevo_codigo)
         self._codigo = nuevo_codigo
 
     @property
@@ -43,6 +86,7 @@ class Producto:
     @nombre.setter
     def nombre(self, nuevo_nombre):
         """Setter para el nombre del producto."""
+        self._marcar('nombre', self._nombre, nuevo_nombre)
         self._nombre = nuevo_nombre
 
     @property
@@ -54,6 +98,7 @@ class Producto:
     def precio(self, nuevo_precio):
         """Setter para el precio del producto."""
         if nuevo_precio >= 0:
+            self._marcar('precio', self._precio, nuevo_precio)
             self._precio = nuevo_precio
         else:
             print("El precio no puede ser negativo.")
@@ -67,6 +112,7 @@ class Producto:
     def cantidad(self, nueva_cantidad):
         """Setter para la cantidad en inventario del producto."""
         if nueva_cantidad >= 0:
+            self._marcar('cantidad', self._cantidad, nueva_cantidad)
             self._cantidad = nueva_cantidad
         else:
             print("La cantidad no puede ser negativa.")
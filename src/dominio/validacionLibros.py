@@ -0,0 +1,324 @@
+# Integrantes del Grupo#1 : Joselyne Paulette Játiva Vera
+#                           Joselin Mariuxi Rodriguez Saldaña
+#                           Jemina Victoria Suárez Veintimilla
+#                           Rosa Angelica Bustamante Moreira
+
+"""
+Reglas de validación de un libro, las mismas para el formulario (LibroServicio), la
+grilla y la importación del catálogo:
+
+    - ningún campo vacío;
+    - precio numérico, con punto o coma decimal (10.50 o 10,50), y no negativo;
+    - cantidad entera y no negativa (como exigen los setters de Producto);
+    - ISBN de 10 o 13 dígitos (se permiten guiones y espacios) con su dígito de control
+      correcto.
+
+ValidadorLibros trabaja por columnas: recibe todos los valores de cada campo y aplica
+cada regla a la columna completa de una vez, con expresiones regulares compiladas una
+sola vez. En lotes grandes, si NumPy está instalado, los dígitos de control y los
+negativos se revisan con operaciones vectoriales. Validar un solo libro es validar un
+lote de una fila, así que las reglas no pueden diferir entre la pantalla y la carga
+masiva.
+
+Los errores se informan por campo: {'precio': 'debe ser un número válido (ej. 10.50)'}.
+"""
+
+import re
+from array import array
+
+from src.dominio.libro import Libro
+from src.dominio.loteLibros import LoteLibros
+
+# Nombres de los campos, en el orden de las filas (codigo, nombre, precio, cantidad, autor, edicion, Isbn)
+CAMPOS = ('codigo', 'nombre', 'precio', 'cantidad', 'autor', 'edicion', 'isbn')
+
+_PRECIO = re.compile(r'[+-]?(?:\d+(?:[.,]\d*)?|[.,]\d+)', re.ASCII)
+_ENTERO = re.compile(r'[+-]?\d+', re.ASCII)
+_CARACTERES_PRECIO = re.compile(r'[^0-9.,+\-\n]')
+_CARACTERES_ENTERO = re.compile(r'[^0-9+\-\n]')
+_ISBN10 = re.compile(r'\d{9}[\dXx]', re.ASCII)
+_ISBN13 = re.compile(r'\d{13}', re.ASCII)
+_COLUMNA_ISBN13 = re.compile(r'(?:(?:\d{13})?\n)*', re.ASCII)  # Una columna entera unida por saltos de línea
+_SEPARADORES_ISBN = str.maketrans('', '', '- ')
+# Forma de un ISBN que se puede escribir en el formulario (sin el dígito de control, que
+# se revisa al grabar): 10 dígitos (el último puede ser X) o 13, con guiones o espacios
+PATRON_ISBN = r'^(?:[0-9][- ]?){9}[0-9Xx]$|^(?:[0-9][- ]?){12}[0-9]$'
+
+_VACIO = "no puede estar vacío"
+_PRECIO_INVALIDO = "debe ser un número válido (ej. 10.50)"
+_CANTIDAD_INVALIDA = "debe ser un número entero"
+_NEGATIVO = "no puede ser negativo"
+_ISBN_LARGO = "debe tener 10 o 13 dígitos"
+_ISBN_CONTROL = "el dígito de control no corresponde"
+
+
+def describir(errores: dict) -> str:
+    """Une los errores por campo en un solo texto: 'precio: ...; isbn: ...'."""
+    return '; '.join(f"{campo}: {mensaje}" for campo, mensaje in errores.items())
+
+
+class ErrorValidacion(ValueError):
+    """
+    Un libro no cumple las reglas. En `errores` trae el mensaje de cada campo con
+    problemas; como texto, todos juntos (ver describir).
+    """
+
+    def __init__(self, errores: dict):
+        super().__init__(describir(errores))
+        self.errores = errores
+
+
+class ResultadoValidacion:
+    """
+    Resultado de validar un lote: las filas válidas ya convertidas y los errores de las
+    demás. Las posiciones son las de la entrada.
+    """
+    __slots__ = ('lote', 'indices', 'errores')
+
+    def __init__(self, lote: LoteLibros, indices, errores: dict):
+        self.lote = lote  # Filas válidas, con precio y cantidad ya convertidos
+        self.indices = indices  # Posición en la entrada de cada fila de `lote`
+        self.errores = errores  # Posición -> {campo: mensaje}, ordenado por posición
+
+    @property
+    def validos(self) -> int:
+        return len(self.lote)
+
+    @property
+    def invalidos(self) -> int:
+        return len(self.errores)
+
+    def __repr__(self):
+        return f"ResultadoValidacion(validos={self.validos}, invalidos={self.invalidos})"
+
+
+def _convertir_columna(columna, tipo, convertir, caracteres, expresion) -> tuple:
+    """
+    Convierte una columna de textos a un arreglo numérico (`tipo` de array). Los vacíos
+    y los que no cumplen `expresion` quedan en 0.
+
+    Primero se prueba la columna entera de una vez: si solo tiene caracteres permitidos,
+    float()/int() rechazan lo mal armado ('1.2.3', '5-') y no hace falta aplicar la
+    expresión fila por fila. Si algo falla, se revisa cada fila.
+
+    Returns:
+        tuple: (array, posiciones de los textos no vacíos con formato inválido).
+    """
+    unida = '\n'.join(columna)
+    if unida.count('\n') == len(columna) - 1 and caracteres.search(unida) is None:
+        try:
+            return array(tipo, map(convertir, unida.replace(',', '.').split('\n'))), []
+        except (ValueError, OverflowError):
+            pass  # Algún vacío, un número mal armado o una cantidad que no cabe en 64 bits
+    numeros, malos = array(tipo), []
+    for indice, texto in enumerate(columna):
+        if texto and expresion.fullmatch(texto):
+            try:
+                numeros.append(convertir(texto.replace(',', '.')))
+                continue
+            except OverflowError:
+                pass
+        numeros.append(0)
+        if texto:
+            malos.append(indice)
+    return numeros, malos
+
+
+# Los códigos ASCII de los dígitos ('0' = 48) suman, con estos pesos, un múltiplo exacto
+# del módulo (48 × 25 y 48 × 55), así que el control se puede hacer sobre los bytes
+def _control_isbn13(isbn: str) -> bool:
+    datos = isbn.encode('ascii')
+    return (sum(datos[0::2]) + 3 * sum(datos[1::2])) % 10 == 0
+
+
+def _control_isbn10(isbn: str) -> bool:
+    # 'X' (10) se cambia por ':', el carácter que sigue a '9'
+    datos = isbn.upper().replace('X', ':').encode('ascii')
+    return sum(dato * peso for dato, peso in zip(datos, range(10, 0, -1))) % 11 == 0
+
+
+class ValidadorLibros:
+    """
+    Valida libros, de a uno o en lotes, con las reglas descritas en este módulo.
+
+    Uso:
+        validador = ValidadorLibros()
+        libro = validador.convertir({'codigo': '0000000001', 'precio': '10,50', ...})
+        resultado = validador.validar_filas(filas_del_archivo)
+    """
+
+    _MINIMO_NUMPY = 1000  # Con menos filas NumPy no compensa (ni su importación)
+
+    def __init__(self, controlar_isbn: bool = True, usar_numpy: bool | None = None):
+        """
+        Args:
+            controlar_isbn (bool): Si es False, solo se exige la longitud del ISBN y no
+                                   su dígito de control (para catálogos antiguos).
+            usar_numpy (bool, opcional): Forzar o evitar NumPy en los lotes grandes; por
+                                         defecto se usa si está instalado.
+        """
+        self.controlar_isbn = controlar_isbn
+        self.usar_numpy = usar_numpy
+        self._np = None
+
+    def _numpy(self, filas: int):
+        """Retorna el módulo numpy si conviene usarlo para `filas` filas, o None."""
+        if self.usar_numpy is False or (self.usar_numpy is None and filas < self._MINIMO_NUMPY):
+            return None
+        if self._np is None:
+            try:
+                import numpy as np
+            except ImportError:
+                if self.usar_numpy:
+                    raise ImportError("Se necesita NumPy para usar_numpy=True (pip install numpy).") from None
+                self.usar_numpy = False
+                return None
+            self._np = np
+        return self._np
+
+    # --- Un libro ---
+
+    def errores(self, valores: dict) -> dict:
+        """
+        Args:
+            valores (dict): Texto (o número) de cada campo de CAMPOS.
+
+        Returns:
+            dict: {campo: mensaje} de los campos con error; vacío si el libro es válido.
+        """
+        return self.validar_columnas({campo: [valores.get(campo)] for campo in CAMPOS}).errores.get(0, {})
+
+    def convertir(self, valores: dict) -> Libro:
+        """
+        Valida un libro y lo retorna con el precio y la cantidad convertidos a número.
+
+        Raises:
+            ErrorValidacion: Con los errores de cada campo.
+        """
+        resultado = self.validar_columnas({campo: [valores.get(campo)] for campo in CAMPOS})
+        if resultado.errores:
+            raise ErrorValidacion(resultado.errores[0])
+        return resultado.lote[0]
+
+    def errores_libro(self, libro: Libro) -> dict:
+        """Como errores(), para un Libro ya construido."""
+        return self.errores({'codigo': libro.codigo, 'nombre': libro.nombre, 'precio': libro.precio,
+                             'cantidad': libro.cantidad, 'autor': libro.autor, 'edicion': libro.edicion,
+                             'isbn': libro.Isbn})
+
+    # --- Lotes ---
+
+    def validar_filas(self, filas) -> ResultadoValidacion:
+        """
+        Valida filas con forma de diccionario (como las de un CSV o JSONL).
+
+        Args:
+            filas (list[dict]): Una por libro, con las llaves de CAMPOS.
+        """
+        filas = filas if isinstance(filas, list) else list(filas)
+        return self.validar_columnas({campo: [fila.get(campo) for fila in filas] for campo in CAMPOS})
+
+    def validar_columnas(self, columnas: dict) -> ResultadoValidacion:
+        """
+        Valida un lote por columnas: una pasada por regla sobre toda la columna.
+
+        Args:
+            columnas (dict): Campo de CAMPOS -> lista de valores, todas del mismo largo.
+                             Los valores pueden ser textos o números; se quitan los
+                             espacios de los extremos.
+
+        Returns:
+            ResultadoValidacion: Lote con las filas válidas y errores de las demás.
+        """
+        total = len(columnas['codigo'])
+        textos = {campo: [str(valor).strip() if valor is not None else '' for valor in columnas[campo]]
+                  for campo in CAMPOS}
+        np = self._numpy(total) if total else None
+        errores = {}
+
+        def anotar(indices, campo, mensaje):
+            # Cada campo se informa una sola vez, con su primer error
+            for indice in indices:
+                errores.setdefault(indice, {}).setdefault(campo, mensaje)
+
+        for campo in CAMPOS:
+            columna = textos[campo]
+            if not all(columna):
+                anotar([indice for indice, texto in enumerate(columna) if not texto], campo, _VACIO)
+
+        # Precio y cantidad: formato y conversión; los negativos, después, sobre el arreglo
+        # ya convertido
+        precios, malos = _convertir_columna(textos['precio'], 'd', float, _CARACTERES_PRECIO, _PRECIO)
+        anotar(malos, 'precio', _PRECIO_INVALIDO)
+        cantidades, malos = _convertir_columna(textos['cantidad'], 'q', int, _CARACTERES_ENTERO, _ENTERO)
+        anotar(malos, 'cantidad', _CANTIDAD_INVALIDA)
+        if np is not None:
+            anotar(np.flatnonzero(np.frombuffer(precios, dtype=np.float64) < 0).tolist(), 'precio', _NEGATIVO)
+            anotar(np.flatnonzero(np.frombuffer(cantidades, dtype=np.int64) < 0).tolist(), 'cantidad', _NEGATIVO)
+        else:
+            anotar([indice for indice, precio in enumerate(precios) if precio < 0], 'precio', _NEGATIVO)
+            anotar([indice for indice, cantidad in enumerate(cantidades) if cantidad < 0], 'cantidad', _NEGATIVO)
+
+        self._validar_isbn(textos['isbn'], np, anotar)
+
+        # Por posición, y los campos de cada fila en el orden de CAMPOS
+        errores = {indice: {campo: errores[indice][campo] for campo in CAMPOS if campo in errores[indice]}
+                   for indice in sorted(errores)}
+        if not errores:
+            indices = range(total)
+            lote = LoteLibros()
+            lote.codigos, lote.nombres, lote.autores, lote.ediciones, lote.isbns = (
+                textos['codigo'], textos['nombre'], textos['autor'], textos['edicion'], textos['isbn'])
+            lote.precios, lote.cantidades = precios, cantidades
+        else:
+            indices = [indice for indice in range(total) if indice not in errores]
+            lote = LoteLibros()
+            lote.codigos, lote.nombres, lote.autores, lote.ediciones, lote.isbns = (
+                [textos[campo][indice] for indice in indices]
+                for campo in ('codigo', 'nombre', 'autor', 'edicion', 'isbn'))
+            lote.precios = array('d', [precios[indice] for indice in indices])
+            lote.cantidades = array('q', [cantidades[indice] for indice in indices])
+        return ResultadoValidacion(lote, indices, errores)
+
+    def _validar_isbn(self, isbns, np, anotar):
+        """Longitud (10 o 13 dígitos, sin guiones ni espacios) y dígito de control."""
+        unida = '\n'.join(isbns)
+        if '-' in unida or ' ' in unida:
+            normales = [isbn.translate(_SEPARADORES_ISBN) for isbn in isbns]
+            unida = '\n'.join(normales)
+        else:
+            normales = isbns
+        if unida.count('\n') == len(isbns) - 1 and _COLUMNA_ISBN13.fullmatch(unida + '\n'):
+            # Caso habitual: todos ISBN-13 (o vacíos), sin revisar fila por fila
+            trece = [indice for indice, isbn in enumerate(normales) if isbn]
+            diez, largo = [], []
+        else:
+            diez, trece, largo = [], [], []
+            for indice, isbn in enumerate(normales):
+                if _ISBN13.fullmatch(isbn):
+                    trece.append(indice)
+                elif _ISBN10.fullmatch(isbn):
+                    diez.append(indice)
+                elif isbn:
+                    largo.append(indice)
+        anotar(largo, 'isbn', _ISBN_LARGO)
+        if not self.controlar_isbn:
+            return
+        if np is not None:
+            # Todos los ISBN de un mismo largo en una matriz de dígitos: una fila por libro
+            for indices, largo_isbn, pesos, modulo in ((trece, 13, [1, 3] * 6 + [1], 10),
+                                                        (diez, 10, list(range(10, 0, -1)), 11)):
+                if not indices:
+                    continue
+                texto = ''.join(normales[indice] for indice in indices).upper().encode('ascii')
+                # 'X' vale 10: se cambia por ':', el carácter siguiente a '9'
+                digitos = np.frombuffer(texto.replace(b'X', b':'), dtype=np.uint8).reshape(-1, largo_isbn)
+                sumas = (digitos.astype(np.int64) - 48) @ np.array(pesos, dtype=np.int64)
+                anotar(np.asarray(indices)[sumas % modulo != 0].tolist(), 'isbn', _ISBN_CONTROL)
+        else:
+            anotar([indice for indice in trece if not _control_isbn13(normales[indice])], 'isbn', _ISBN_CONTROL)
+            anotar([indice for indice in diez if not _control_isbn10(normales[indice])], 'isbn', _ISBN_CONTROL)
+
+
+# Validador con las reglas completas, compartido por el formulario, la grilla y la importación
+VALIDADOR = ValidadorLibros()
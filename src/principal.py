@@ -0,0 +1,67 @@
+# Integrantes del Grupo#1 : Joselyne Paulette Játiva Vera
+#                           Joselin Mariuxi Rodriguez Saldaña
+#                           Jemina Victoria Suárez Veintimilla
+#                           Rosa Angelica Bustamante Moreira
+
+"""
+Inicio de la aplicación. La ventana se muestra primero: el controlador de la base de
+datos se importa y la conexión se abre recién después, en un hilo de trabajo (ver
+LibroServicio.conectar). Si no hay conexión la ventana sigue abierta y cada operación
+vuelve a intentarlo.
+
+Uso:
+    python -m src.principal
+    python -m src.principal --medir --salir    (tiempos de arranque, ver src.benchmark.inicio)
+"""
+
+import time
+
+_INICIO = time.perf_counter()
+
+import argparse  # noqa: E402 (se mide el arranque desde aquí)
+import sys  # noqa: E402
+
+
+def _ms() -> float:
+    return (time.perf_counter() - _INICIO) * 1000
+
+
+def main(argumentos=None) -> int:
+    parser = argparse.ArgumentParser(description="Sistema de gestión de inventario de libros.")
+    parser.add_argument('--medir', action='store_true', help="Muestra los tiempos de arranque")
+    parser.add_argument('--salir', action='store_true', help="Cierra la aplicación al terminar de pintarla")
+    args = parser.parse_args(argumentos)
+
+    tiempos = {}
+    from PySide6.QtCore import QEvent, QObject, QTimer
+    from PySide6.QtWidgets import QApplication
+    tiempos['qt'] = _ms()
+    aplicacion = QApplication(sys.argv[:1])
+    from src.servicio.libro import LibroServicio
+    tiempos['importacion'] = _ms()
+    ventana = LibroServicio()
+    tiempos['ventana'] = _ms()
+
+    class _PrimerPintado(QObject):
+        def eventFilter(self, objeto, evento):
+            if evento.type() == QEvent.Paint and 'primer_pintado' not in tiempos:
+                tiempos['primer_pintado'] = _ms()
+                controlador.append('pyodbc' in sys.modules or 'sqlite3' in sys.modules)
+                if args.salir:
+                    QTimer.singleShot(0, aplicacion.quit)
+            return False
+
+    controlador = []  # Si el controlador de la base ya estaba importado al pintar
+    filtro = _PrimerPintado()
+    if args.medir or args.salir:
+        aplicacion.installEventFilter(filtro)
+    ventana.show()
+    resultado = aplicacion.exec()
+    if args.medir:
+        print(' '.join(f"{nombre}={valor:.1f}" for nombre, valor in tiempos.items()))
+        print(f"controlador_al_pintar={controlador[0] if controlador else None}")
+    return resultado
+
+
+if __name__ == '__main__':
+    sys.exit(main())
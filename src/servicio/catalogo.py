@@ -0,0 +1,236 @@
+# Integrantes del Grupo#1 : Joselyne Paulette Játiva Vera
+#                           Joselin Mariuxi Rodriguez Saldaña
+#                           Jemina Victoria Suárez Veintimilla
+#                           Rosa Angelica Bustamante Moreira
+
+"""
+Exportación e importación del catálogo de libros en CSV o JSONL desde la línea de comandos.
+
+Todo el proceso trabaja con generadores: la exportación lee la tabla en bloques con
+fetchmany y escribe fila por fila, y la importación lee, valida y graba en lotes, así que
+la memoria usada es la misma para 10 mil o para 10 millones de libros.
+
+Uso:
+    python -m src.servicio.catalogo exportar libros.csv
+    python -m src.servicio.catalogo importar libros.jsonl --modo upsert --lote 5000
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from contextlib import nullcontext
+from itertools import islice
+
+from src.datos.libroDao import LibroDao, ResultadoLote
+from src.dominio.libro import Libro
+from src.dominio.validacionLibros import CAMPOS, VALIDADOR, describir
+
+# Las columnas del archivo (CAMPOS) van en el mismo orden que las devuelve LibroDao.recorrer_libros
+FORMATOS = ('csv', 'jsonl')
+_BLOQUE_VALIDACION = 10_000  # Filas del archivo que se validan juntas
+_MENSAJES_ERROR = 20  # Errores de cada tipo que se guardan para mostrarlos
+
+
+def _formato_de(ruta: str, formato: str | None) -> str:
+    """Retorna el formato indicado o lo deduce de la extensión del archivo."""
+    formato = formato or ruta.rsplit('.', 1)[-1].lower()
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato} (use {' o '.join(FORMATOS)})")
+    return formato
+
+
+def _fila_a_dict(fila) -> dict:
+    """Convierte una fila de la base de datos en un diccionario serializable."""
+    codigo, nombre, precio, cantidad, autor, edicion, isbn = fila
+    return {'codigo': codigo, 'nombre': nombre, 'precio': float(precio), 'cantidad': int(cantidad),
+            'autor': autor, 'edicion': edicion, 'isbn': isbn}
+
+
+def exportar(ruta: str, formato: str | None = None, tamano_lote: int | None = None) -> int:
+    """
+    Escribe todo el catálogo en un archivo CSV o JSONL.
+
+    Args:
+        ruta (str): Archivo de destino.
+        formato (str, opcional): 'csv' o 'jsonl'; por defecto se deduce de la extensión.
+        tamano_lote (int, opcional): Filas que se piden al servidor en cada fetchmany.
+
+    Returns:
+        int: Número de libros exportados.
+    """
+    formato = _formato_de(ruta, formato)
+    total = 0
+    with open(ruta, 'w', newline='', encoding='utf-8') as archivo:
+        if formato == 'csv':
+            escritor = csv.writer(archivo)
+            escritor.writerow(CAMPOS)
+            for fila in LibroDao.recorrer_libros(tamano_lote):
+                escritor.writerow(_fila_a_dict(fila).values())
+                total += 1
+        else:
+            for fila in LibroDao.recorrer_libros(tamano_lote):
+                archivo.write(json.dumps(_fila_a_dict(fila), ensure_ascii=False))
+                archivo.write('\n')
+                total += 1
+    return total
+
+
+def leer_filas(archivo, formato: str, al_rechazar=None):
+    """
+    Lee un archivo abierto fila por fila.
+
+    Args:
+        archivo: Archivo de texto abierto.
+        formato (str): 'csv' o 'jsonl'.
+        al_rechazar (callable, opcional): Recibe (número de línea, texto, mensaje) por cada
+                                          línea JSONL que no es un objeto JSON; esa línea se
+                                          omite y la lectura sigue. Sin él se lanza ValueError.
+
+    Yields:
+        tuple: (número de línea, diccionario con los campos de la fila).
+    """
+    if formato == 'csv':
+        lector = csv.DictReader(archivo)
+        for fila in lector:
+            yield lector.line_num, fila
+    else:
+        for numero, linea in enumerate(archivo, 1):
+            if not linea.strip():
+                continue
+            try:
+                fila = json.loads(linea)
+                mensaje = None if isinstance(fila, dict) else "la línea no es un objeto JSON"
+            except json.JSONDecodeError as e:
+                mensaje = f"JSON inválido: {e}"
+            if mensaje is None:
+                yield numero, fila
+            elif al_rechazar is not None:
+                al_rechazar(numero, linea.rstrip('\r\n'), mensaje)
+            else:
+                raise ValueError(f"Línea {numero}: {mensaje}")
+
+
+def validar_fila(fila: dict) -> Libro:
+    """
+    Convierte una fila del archivo en un Libro con las reglas de validacionLibros
+    (las mismas del formulario y de la grilla).
+
+    Raises:
+        ErrorValidacion: Un ValueError con el mensaje de cada campo que no las cumple.
+    """
+    return VALIDADOR.convertir(fila)
+
+
+def _escritor_rechazos(archivo, formato: str):
+    """Retorna una función que escribe una fila rechazada (con su línea y su error) en `archivo`."""
+    if formato == 'csv':
+        escritor = csv.DictWriter(archivo, fieldnames=('linea', 'error') + CAMPOS, extrasaction='ignore')
+        escritor.writeheader()
+        return escritor.writerow
+
+    def escribir(fila):
+        archivo.write(json.dumps(fila, ensure_ascii=False))
+        archivo.write('\n')
+    return escribir
+
+
+def importar(ruta: str, formato: str | None = None, modo: str = 'insertar',
+             tamano_lote: int | None = None, rechazos: str | None = None):
+    """
+    Carga un archivo CSV o JSONL en la tabla Libro en lotes.
+
+    Los errores no se acumulan: de cada tipo se guardan solo los primeros _MENSAJES_ERROR
+    (y cuántos hubo), y con `rechazos` cada fila rechazada se escribe en ese archivo en
+    cuanto se detecta, en el mismo formato y con su línea y su error, para corregirla y
+    volver a importarla.
+
+    Args:
+        ruta (str): Archivo de origen.
+        formato (str, opcional): 'csv' o 'jsonl'; por defecto se deduce de la extensión.
+        modo (str): 'insertar' solo agrega libros nuevos; 'upsert' también actualiza los existentes.
+        tamano_lote (int, opcional): Filas por lote (y por commit).
+        rechazos (str, opcional): Archivo donde se escriben las filas rechazadas.
+
+    Returns:
+        tuple: (ResultadoLote de LibroDao, ResultadoLote de las filas rechazadas por la
+               validación, con el número de línea como posición).
+    """
+    formato = _formato_de(ruta, formato)
+    grabar = LibroDao.upsert_libros if modo == 'upsert' else LibroDao.insertar_libros
+    with open(ruta, newline='', encoding='utf-8') as archivo, \
+            (open(rechazos, 'w', newline='', encoding='utf-8') if rechazos else nullcontext()) as destino:
+        escribir = _escritor_rechazos(destino, formato) if destino is not None else None
+        al_fallar = None
+        if escribir is not None:
+            def al_fallar(_, codigo, mensaje):
+                # Los errores de la base de datos solo traen el código del libro, no la línea
+                escribir({'linea': '', 'error': mensaje, 'codigo': codigo})
+        rechazadas = ResultadoLote(_MENSAJES_ERROR)
+        resultado = ResultadoLote(_MENSAJES_ERROR, al_fallar)
+
+        def linea_invalida(linea, texto, mensaje):
+            # La línea no se pudo leer como fila: se guarda tal cual para corregirla
+            rechazadas.agregar_error(linea, None, mensaje)
+            if escribir is not None:
+                escribir({'linea': linea, 'error': mensaje, 'texto': texto})
+
+        def libros_validos():
+            # Se valida por bloques, columna por columna, y se entregan solo los libros válidos
+            filas = leer_filas(archivo, formato, linea_invalida)
+            while bloque := list(islice(filas, _BLOQUE_VALIDACION)):
+                validacion = VALIDADOR.validar_filas([fila for _, fila in bloque])
+                for indice, errores in validacion.errores.items():
+                    linea, fila = bloque[indice]
+                    mensaje = describir(errores)
+                    rechazadas.agregar_error(linea, fila.get('codigo'), mensaje)
+                    if escribir is not None:
+                        escribir({**fila, 'linea': linea, 'error': mensaje})
+                yield from validacion.lote
+
+        grabar(libros_validos(), tamano_lote, resultado)
+    return resultado, rechazadas
+
+
+def main(argumentos=None) -> int:
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Exporta o importa el catálogo de libros.")
+    subparsers = parser.add_subparsers(dest='accion', required=True)
+    for accion in ('exportar', 'importar'):
+        sub = subparsers.add_parser(accion)
+        sub.add_argument('ruta')
+        sub.add_argument('--formato', choices=FORMATOS)
+        sub.add_argument('--lote', type=int, default=None, help="Filas por lote")
+        if accion == 'importar':
+            sub.add_argument('--modo', choices=('insertar', 'upsert'), default='insertar')
+            sub.add_argument('--rechazos', help="Archivo donde escribir las filas rechazadas")
+    args = parser.parse_args(argumentos)
+
+    inicio = time.perf_counter()
+    try:
+        if args.accion == 'exportar':
+            total = exportar(args.ruta, args.formato, args.lote)
+            errores = 0
+        else:
+            resultado, rechazadas = importar(args.ruta, args.formato, args.modo, args.lote, args.rechazos)
+            total = resultado.procesados
+            errores = resultado.fallidos + rechazadas.fallidos
+            for numero, _, mensaje in rechazadas.errores:
+                print(f"Línea {numero} rechazada: {mensaje}")
+            for _, codigo, mensaje in resultado.errores:
+                print(f"Libro {codigo} no grabado: {mensaje}")
+            if errores > len(rechazadas.errores) + len(resultado.errores):
+                print("... y más errores" + (f" (todos en {args.rechazos})" if args.rechazos else ""))
+    except Exception as e:
+        print(f"Error al {args.accion} el catálogo: {e}")
+        return 1
+    segundos = time.perf_counter() - inicio
+    velocidad = total / segundos if segundos > 0 else 0.0
+    print(f"{args.accion.capitalize()}: {total} libros en {segundos:.2f} s "
+          f"({velocidad:,.0f} filas/s), {errores} con error")
+    return 0 if errores == 0 else 2
+
+
+if __name__ == '__main__':
+    sys.exit(main())
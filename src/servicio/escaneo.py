@@ -0,0 +1,169 @@
+# Integrantes del Grupo#1 : Joselyne Paulette Játiva Vera
+#                           Joselin Mariuxi Rodriguez Saldaña
+#                           Jemina Victoria Suárez Veintimilla
+#                           Rosa Angelica Bustamante Moreira
+
+"""
+Modo escáner de LibroServicio: búsquedas por código de barras en serie.
+
+El lector dispara los códigos más rápido de lo que tarda una consulta, así que las
+búsquedas no se hacen de a una: ColaEscaneos lanza cada una apenas llega (varias a la
+vez contra la base), guarda las respuestas que llegan adelantadas y las muestra en el
+orden en que se escanearon. Los códigos que ya están en la caché de lectura de LibroDao
+(ver LibroDao.usar_cache) se responden al instante, sin lanzar una búsqueda.
+HistogramaLatencia registra el tiempo desde el escaneo hasta que el libro se muestra.
+"""
+
+import bisect
+import threading
+import time
+from collections import deque
+
+from src.datos.libroDao import LibroDao
+
+
+class HistogramaLatencia:
+    """
+    Cuenta latencias (en milisegundos) por tramos y guarda las últimas para calcular
+    percentiles exactos.
+    """
+
+    LIMITES = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)  # Límite superior de cada tramo, en ms
+
+    def __init__(self, limites=LIMITES, recientes: int = 10_000):
+        """
+        Args:
+            limites (tuple): Límites superiores de los tramos, de menor a mayor; lo que pase
+                             del último cae en un tramo final abierto.
+            recientes (int): Cuántas latencias se guardan para los percentiles.
+        """
+        self.limites = tuple(limites)
+        self._cuentas = [0] * (len(self.limites) + 1)
+        self._recientes = deque(maxlen=recientes)
+        self._bloqueo = threading.Lock()
+
+    def registrar(self, milisegundos: float):
+        with self._bloqueo:
+            self._cuentas[bisect.bisect_left(self.limites, milisegundos)] += 1
+            self._recientes.append(milisegundos)
+
+    @property
+    def cantidad(self) -> int:
+        return sum(self._cuentas)
+
+    def percentil(self, fraccion: float) -> float | None:
+        """Percentil de las latencias recientes, o None si no hay ninguna."""
+        with self._bloqueo:
+            ordenadas = sorted(self._recientes)
+        if not ordenadas:
+            return None
+        return ordenadas[min(len(ordenadas) - 1, int(len(ordenadas) * fraccion))]
+
+    def fraccion_bajo(self, milisegundos: float) -> float:
+        """Fracción de las latencias recientes que no superan `milisegundos`."""
+        with self._bloqueo:
+            recientes = list(self._recientes)
+        return sum(1 for valor in recientes if valor <= milisegundos) / len(recientes) if recientes else 0.0
+
+    def texto(self, ancho: int = 40) -> str:
+        """El histograma dibujado con barras de texto, un tramo por línea."""
+        with self._bloqueo:
+            cuentas = list(self._cuentas)
+        total = sum(cuentas) or 1
+        mayor = max(cuentas) or 1
+        lineas = []
+        inferior = 0
+        for limite, cuenta in zip(self.limites + (None,), cuentas):
+            tramo = f"{inferior:g}-{limite:g} ms" if limite is not None else f"> {inferior:g} ms"
+            barra = '#' * round(ancho * cuenta / mayor)
+            lineas.append(f"{tramo:>14} {cuenta:>7} {cuenta / total:>6.1%} {barra}")
+            inferior = limite
+        return '\n'.join(lineas)
+
+
+class _Escaneo:
+    __slots__ = ('codigo', 'momento', 'listo', 'libro', 'error')
+
+    def __init__(self, codigo, momento):
+        self.codigo = codigo
+        self.momento = momento
+        self.listo = False
+        self.libro = None
+        self.error = None
+
+
+class ColaEscaneos:
+    """
+    Ordena las respuestas de búsquedas lanzadas en paralelo.
+
+    `lanzar(codigo, al_terminar, al_fallar)` debe ejecutar la búsqueda sin bloquear (por
+    ejemplo con EjecutorDao) y llamar a `al_terminar(libro)` o `al_fallar(mensaje)`.
+    `mostrar(codigo, libro, error, milisegundos)` recibe cada resultado en el orden de
+    escaneo; libro es None si el código no existe.
+
+    No tiene caché propia: un código que ya está en la caché de lectura de LibroDao se
+    responde sin llamar a `lanzar`, y las búsquedas lanzadas la llenan (y las escrituras
+    de LibroDao la invalidan) como cualquier otra lectura.
+    """
+
+    def __init__(self, lanzar, mostrar, histograma: HistogramaLatencia | None = None,
+                 reloj=time.perf_counter):
+        self._lanzar = lanzar
+        self._mostrar = mostrar
+        self.histograma = histograma if histograma is not None else HistogramaLatencia()
+        self._reloj = reloj
+        self._proximo = 0  # Número que recibirá el próximo escaneo
+        self._siguiente = 0  # Número del próximo escaneo a mostrar
+        self._pendientes = {}  # número -> _Escaneo
+        self._bloqueo = threading.RLock()
+
+    @property
+    def en_vuelo(self) -> int:
+        """Escaneos que todavía no se mostraron."""
+        return len(self._pendientes)
+
+    def escanear(self, codigo: str) -> int:
+        """
+        Registra un escaneo y lanza su búsqueda (o la responde desde la caché).
+
+        Returns:
+            int: Número de orden del escaneo.
+        """
+        with self._bloqueo:
+            numero = self._proximo
+            self._proximo += 1
+            self._pendientes[numero] = _Escaneo(codigo, self._reloj())
+        encontrado, libro = LibroDao.libro_en_cache(codigo)
+        if encontrado:
+            self._completar(numero, libro, None)
+            return numero
+        self._lanzar(codigo, lambda libro: self._completar(numero, libro, None),
+                     lambda mensaje: self._completar(numero, None, mensaje))
+        return numero
+
+    def _completar(self, numero, libro, error):
+        with self._bloqueo:
+            escaneo = self._pendientes.get(numero)
+            if escaneo is None:
+                return  # Descartado con vaciar()
+            escaneo.listo, escaneo.libro, escaneo.error = True, libro, error
+            # Se muestran los que ya están completos sin saltarse ninguno anterior
+            while self._siguiente in self._pendientes and self._pendientes[self._siguiente].listo:
+                escaneo = self._pendientes.pop(self._siguiente)
+                self._siguiente += 1
+                milisegundos = (self._reloj() - escaneo.momento) * 1000
+                self.histograma.registrar(milisegundos)
+                self._mostrar(escaneo.codigo, escaneo.libro, escaneo.error, milisegundos)
+
+    def vaciar(self) -> int:
+        """
+        Descarta los escaneos que todavía no se mostraron (sus respuestas se ignoran).
+
+        Returns:
+            int: Cuántos se descartaron.
+        """
+        with self._bloqueo:
+            descartados = len(self._pendientes)
+            self._pendientes.clear()
+            self._siguiente = self._proximo
+        return descartados
@@ -0,0 +1,455 @@
+# Integrantes del Grupo#1 : Joselyne Paulette Játiva Vera
+#                           Joselin Mariuxi Rodriguez Saldaña
+#                           Jemina Victoria Suárez Veintimilla
+#                           Rosa Angelica Bustamante Moreira
+
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt, Signal
+from PySide6.QtGui import QBrush, QColor, QKeySequence, QShortcut
+from PySide6.QtWidgets import (QAbstractItemView, QHBoxLayout, QHeaderView, QMainWindow, QMessageBox,
+                               QPushButton, QTableView, QVBoxLayout, QWidget)
+from src.datos.libroDao import LibroDao
+from src.dominio.loteLibros import LoteLibros
+from src.dominio.validacionLibros import CAMPOS, VALIDADOR, describir
+from src.servicio.trabajadores import EjecutorDao
+
+TITULOS = ('Código', 'Nombre', 'Precio', 'Cantidad', 'Autor', 'Edición', 'ISBN')
+_COLOR_NUEVA = QBrush(QColor(220, 245, 220))
+_COLOR_EDITADA = QBrush(QColor(255, 248, 205))
+_COLOR_ERROR = QBrush(QColor(250, 210, 210))
+
+
+class _Cambio:
+    """Fila editada en la grilla (textos de las 7 columnas) y sus errores de validación."""
+    __slots__ = ('valores', 'error', 'errores')
+
+    def __init__(self, valores):
+        self.valores = list(valores)
+        self.error = None  # Todos los errores de la fila en un texto
+        self.errores = {}  # Campo -> mensaje, para marcar la celda
+
+    def limpiar_errores(self):
+        self.error = None
+        self.errores = {}
+
+
+class ModeloLibros(QAbstractTableModel):
+    """
+    Modelo de la grilla de libros. Trae el catálogo por páginas a medida que la vista se
+    desplaza (canFetchMore/fetchMore), en un hilo de trabajo, y guarda las filas leídas
+    por columnas en un LoteLibros. Así abrir la grilla sobre un millón de libros solo lee
+    la primera página.
+
+    Lo editado no se graba al instante: las filas nuevas (arriba, en verde) y las
+    modificadas (en amarillo) quedan pendientes hasta grabar(), que las valida todas
+    juntas y las graba en una sola transacción con LibroDao.grabar_cambios. Las celdas
+    con error se marcan en rojo con el mensaje como ayuda emergente. Mientras se graba la
+    grilla es de solo lectura, para que nada editado en ese momento se dé por grabado.
+
+    Con usar_versiones activo, cada fila leída guarda su versión y la grabación falla (y
+    marca la fila) si otro usuario cambió el libro desde que se leyó.
+    """
+
+    pendientesCambiados = Signal(int)  # Número de filas con cambios sin grabar
+    cargaFallida = Signal(str)
+    grabado = Signal(int)  # Libros grabados
+    grabacionFallida = Signal(str)
+
+    def __init__(self, ejecutor: EjecutorDao, tamano_pagina: int = 500, padre=None):
+        super().__init__(padre)
+        self.ejecutor = ejecutor
+        self.tamano_pagina = tamano_pagina
+        self._cargados = LoteLibros()
+        self._versiones = []  # Versión de cada fila de _cargados (None sin usar_versiones)
+        self._ultimo = None  # Último código leído, para pedir la página siguiente
+        self._hay_mas = True
+        self._cargando = False
+        self._nuevas = []  # _Cambio por cada fila agregada (se muestran primero)
+        self._editadas = {}  # Posición en _cargados -> _Cambio
+        self._grabando = False
+
+    # --- Lectura por páginas ---
+
+    def canFetchMore(self, padre=QModelIndex()):
+        return not padre.isValid() and self._hay_mas
+
+    def fetchMore(self, padre=QModelIndex()):
+        if padre.isValid() or self._cargando or not self._hay_mas:
+            return
+        self._cargando = True
+        self.ejecutor.ejecutar(('pagina', self._ultimo), LibroDao.seleccionar_pagina, self._ultimo,
+                               self.tamano_pagina, al_terminar=self._alCargar, al_fallar=self._alFallarCarga)
+
+    def _alCargar(self, filas):
+        self._cargando = False
+        if filas is None:
+            self._alFallarCarga("No se pudo leer el catálogo")
+            return
+        if len(filas) < self.tamano_pagina:
+            self._hay_mas = False
+        if not filas:
+            return
+        if len(filas[0]) > 7:
+            # Con usar_versiones la versión llega como octavo valor
+            self._versiones.extend(fila[7] for fila in filas)
+            filas = [fila[:7] for fila in filas]
+        else:
+            self._versiones.extend([None] * len(filas))
+        inicio = self.rowCount()
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(filas) - 1)
+        self._cargados.extender(filas)
+        self.endInsertRows()
+        self._ultimo = filas[-1][0]
+
+    def _alFallarCarga(self, mensaje):
+        # No se reintenta solo, para no repetir el error en cada desplazamiento (ver recargar)
+        self._cargando = False
+        self._hay_mas = False
+        self.cargaFallida.emit(mensaje)
+
+    def recargar(self):
+        """Descarta lo leído y lo pendiente y vuelve a leer desde la primera página."""
+        self.ejecutor.cancelar(('pagina', self._ultimo))
+        self.beginResetModel()
+        self._cargados = LoteLibros()
+        self._versiones = []
+        self._ultimo = None
+        self._hay_mas = True
+        self._cargando = False
+        self._nuevas = []
+        self._editadas = {}
+        self.endResetModel()
+        self.pendientesCambiados.emit(0)
+
+    @property
+    def cargados(self) -> int:
+        return len(self._cargados)
+
+    @property
+    def grabando(self) -> bool:
+        return self._grabando
+
+    # --- Interfaz de QAbstractTableModel ---
+
+    def rowCount(self, padre=QModelIndex()):
+        return 0 if padre.isValid() else len(self._nuevas) + len(self._cargados)
+
+    def columnCount(self, padre=QModelIndex()):
+        return 0 if padre.isValid() else len(TITULOS)
+
+    def headerData(self, seccion, orientacion, rol=Qt.DisplayRole):
+        if rol == Qt.DisplayRole and orientacion == Qt.Horizontal:
+            return TITULOS[seccion]
+        return None
+
+    def _cambio(self, fila: int) -> _Cambio | None:
+        if fila < len(self._nuevas):
+            return self._nuevas[fila]
+        return self._editadas.get(fila - len(self._nuevas))
+
+    def _valores(self, fila: int) -> list:
+        cambio = self._cambio(fila)
+        if cambio is not None:
+            return cambio.valores
+        return [str(valor) for valor in self._cargados.fila(fila - len(self._nuevas))]
+
+    def data(self, indice, rol=Qt.DisplayRole):
+        if not indice.isValid():
+            return None
+        fila = indice.row()
+        if rol in (Qt.DisplayRole, Qt.EditRole):
+            if fila >= len(self._nuevas) and fila - len(self._nuevas) not in self._editadas:
+                # Camino habitual al desplazarse: una sola columna, sin copiar la fila
+                posicion = fila - len(self._nuevas)
+                columna = (self._cargados.codigos, self._cargados.nombres, self._cargados.precios,
+                           self._cargados.cantidades, self._cargados.autores, self._cargados.ediciones,
+                           self._cargados.isbns)[indice.column()]
+                return str(columna[posicion])
+            return self._valores(fila)[indice.column()]
+        cambio = self._cambio(fila)
+        if cambio is None:
+            return None
+        campo = CAMPOS[indice.column()]
+        if rol == Qt.BackgroundRole:
+            # Sin errores por campo (código repetido) se marca la fila entera
+            if campo in cambio.errores or (cambio.error is not None and not cambio.errores):
+                return _COLOR_ERROR
+            return _COLOR_NUEVA if fila < len(self._nuevas) else _COLOR_EDITADA
+        if rol == Qt.ToolTipRole:
+            return cambio.errores.get(campo, cambio.error)
+        return None
+
+    def flags(self, indice):
+        banderas = super().flags(indice)
+        if not indice.isValid():
+            return banderas
+        # El código identifica al libro: solo se escribe en las filas nuevas
+        if not self._grabando and (indice.column() != 0 or indice.row() < len(self._nuevas)):
+            banderas |= Qt.ItemIsEditable
+        return banderas
+
+    def setData(self, indice, valor, rol=Qt.EditRole):
+        if not indice.isValid() or rol != Qt.EditRole or self._grabando:
+            return False
+        fila, columna = indice.row(), indice.column()
+        texto = str(valor).strip()
+        valores = self._valores(fila)
+        if valores[columna] == texto:
+            return False
+        if fila < len(self._nuevas):
+            cambio = self._nuevas[fila]
+            cambio.valores[columna] = texto
+        else:
+            posicion = fila - len(self._nuevas)
+            cambio = self._editadas.get(posicion) or _Cambio(valores)
+            cambio.valores[columna] = texto
+            if cambio.valores == [str(valor) for valor in self._cargados.fila(posicion)]:
+                # Volvió al valor leído: deja de estar pendiente
+                self._editadas.pop(posicion, None)
+            else:
+                self._editadas[posicion] = cambio
+        cambio.limpiar_errores()
+        self.dataChanged.emit(self.index(fila, 0), self.index(fila, len(TITULOS) - 1))
+        self.pendientesCambiados.emit(self.pendientes)
+        return True
+
+    # --- Edición por lotes ---
+
+    @property
+    def pendientes(self) -> int:
+        return len(self._nuevas) + len(self._editadas)
+
+    def agregar_fila(self) -> QModelIndex:
+        """Agrega una fila vacía al principio y retorna su primera celda."""
+        self.beginInsertRows(QModelIndex(), 0, 0)
+        self._nuevas.insert(0, _Cambio([''] * len(TITULOS)))
+        self.endInsertRows()
+        self.pendientesCambiados.emit(self.pendientes)
+        return self.index(0, 0)
+
+    def descartar(self):
+        """Quita las filas nuevas y deshace las ediciones pendientes."""
+        self.beginResetModel()
+        self._nuevas = []
+        self._editadas = {}
+        self.endResetModel()
+        self.pendientesCambiados.emit(0)
+
+    def validar(self) -> tuple[list, list, int]:
+        """
+        Valida todas las filas pendientes juntas, con las reglas de validacionLibros
+        (las del formulario y la importación), y marca las celdas con error. Las filas
+        nuevas que quedaron vacías se ignoran.
+
+        Returns:
+            tuple: (libros nuevos, libros modificados, número de filas con error).
+        """
+        for fila in range(len(self._nuevas) - 1, -1, -1):
+            if not any(self._nuevas[fila].valores):
+                self.beginRemoveRows(QModelIndex(), fila, fila)
+                del self._nuevas[fila]
+                self.endRemoveRows()
+        cambios = self._nuevas + list(self._editadas.values())
+        resultado = VALIDADOR.validar_filas([dict(zip(CAMPOS, cambio.valores)) for cambio in cambios])
+        for posicion, cambio in enumerate(cambios):
+            errores = resultado.errores.get(posicion, {})
+            cambio.errores = errores
+            cambio.error = describir(errores) if errores else None
+        nuevos, modificados, errores = [], [], resultado.invalidos
+        codigos = set()
+        for orden, posicion in enumerate(resultado.indices):
+            libro = resultado.lote[orden]
+            if posicion < len(self._nuevas):
+                if libro.codigo in codigos:
+                    cambios[posicion].error = f"El código {libro.codigo} está repetido en la grilla"
+                    errores += 1
+                    continue
+                codigos.add(libro.codigo)
+                nuevos.append(libro)
+            else:
+                modificados.append(libro)
+        self._repintar()
+        self.pendientesCambiados.emit(self.pendientes)
+        return nuevos, modificados, errores
+
+    def _repintar(self):
+        """Un solo aviso a la vista para todas las filas, no uno por fila cambiada."""
+        if self.rowCount():
+            self.dataChanged.emit(self.index(0, 0), self.index(self.rowCount() - 1, len(TITULOS) - 1))
+
+    def grabar(self) -> bool:
+        """
+        Valida lo pendiente y, si no hay errores, lo graba todo en una sola transacción
+        (en un hilo de trabajo). El resultado llega con las señales grabado o
+        grabacionFallida; hasta entonces la grilla no se puede editar.
+
+        Returns:
+            bool: False si hay filas con error, nada que grabar o ya se está grabando.
+        """
+        if self._grabando:
+            return False
+        nuevos, modificados, errores = self.validar()
+        if errores or not (nuevos or modificados):
+            return False
+        # Cada libro modificado lleva la versión con que se leyó su fila
+        posiciones = {self._cargados.codigos[posicion]: posicion for posicion in self._editadas}
+        enviados = []  # (posición en _cargados, libro enviado)
+        for libro in modificados:
+            posicion = posiciones[libro.codigo]
+            libro.version = self._versiones[posicion]
+            enviados.append((posicion, libro))
+        self._grabando = True
+        self.ejecutor.ejecutar(('grabar',), LibroDao.grabar_cambios, nuevos, modificados,
+                               al_terminar=lambda resultado: self._alGrabar(resultado, bool(nuevos), enviados),
+                               al_fallar=self._alFallarGrabacion, escritura=True)
+        return True
+
+    def _alFallarGrabacion(self, mensaje):
+        self._grabando = False
+        self.grabacionFallida.emit(mensaje)
+
+    def _alGrabar(self, resultado, hubo_nuevos, enviados):
+        self._grabando = False
+        if resultado is None:
+            self.grabacionFallida.emit("No se pudo abrir la transacción")
+            return
+        if resultado.errores:
+            # No se grabó nada: se marcan las filas que rechazó la base
+            por_codigo = {codigo: mensaje for _, codigo, mensaje in resultado.errores if codigo is not None}
+            for cambio in list(self._nuevas) + list(self._editadas.values()):
+                codigo = cambio.valores[0]
+                if codigo in por_codigo:
+                    cambio.error = por_codigo[codigo]
+            self._repintar()
+            self.grabacionFallida.emit(resultado.errores[0][2])
+            return
+        grabados = resultado.procesados
+        if hubo_nuevos:
+            # Los libros nuevos tienen que quedar en su lugar según el código
+            self.recargar()
+        else:
+            # Se aplica exactamente lo que se envió (con la versión nueva de cada libro)
+            lote = self._cargados
+            for posicion, libro in enviados:
+                lote.nombres[posicion] = libro.nombre
+                lote.precios[posicion] = float(libro.precio)
+                lote.cantidades[posicion] = int(libro.cantidad)
+                lote.autores[posicion] = libro.autor
+                lote.ediciones[posicion] = libro.edicion
+                lote.isbns[posicion] = libro.Isbn
+                self._versiones[posicion] = libro.version
+                self._editadas.pop(posicion, None)
+            self._repintar()
+            self.pendientesCambiados.emit(self.pendientes)
+        self.grabado.emit(grabados)
+
+
+class VentanaGrilla(QMainWindow):
+    """
+    Modo grilla de LibroServicio: muestra el catálogo en una tabla para cargar o corregir
+    muchos libros y grabarlos de una sola vez (por ejemplo, al recibir un pedido).
+    """
+
+    def __init__(self, padre=None):
+        super().__init__(padre)
+        self.setWindowTitle("Libros - modo grilla")
+        self.resize(900, 600)
+        self.ejecutor = EjecutorDao(self)
+        self.modelo = ModeloLibros(self.ejecutor, padre=self)
+        self.tabla = QTableView()
+        self.tabla.setModel(self.modelo)
+        self.tabla.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.tabla.setEditTriggers(QAbstractItemView.DoubleClicked | QAbstractItemView.EditKeyPressed
+                                   | QAbstractItemView.AnyKeyPressed)
+        # Filas de alto fijo: la vista no tiene que medir cada fila para desplazarse
+        self.tabla.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.tabla.verticalHeader().setDefaultSectionSize(22)
+        self.tabla.horizontalHeader().setStretchLastSection(True)
+
+        botones = QHBoxLayout()
+        for texto, accion in (("Agregar fila", self.agregarFila), ("Validar", self.validar),
+                              ("Grabar", self.grabar), ("Descartar", self.descartar),
+                              ("Recargar", self.recargar)):
+            boton = QPushButton(texto)
+            boton.clicked.connect(accion)
+            botones.addWidget(boton)
+        botones.addStretch()
+        contenido = QWidget()
+        disposicion = QVBoxLayout(contenido)
+        disposicion.addWidget(self.tabla)
+        disposicion.addLayout(botones)
+        self.setCentralWidget(contenido)
+        QShortcut(QKeySequence.New, self, activated=self.agregarFila)
+        QShortcut(QKeySequence.Save, self, activated=self.grabar)
+
+        self.modelo.pendientesCambiados.connect(self.mostrarEstado)
+        self.modelo.rowsInserted.connect(lambda *args: self.mostrarEstado(self.modelo.pendientes))
+        self.modelo.cargaFallida.connect(self.alFallar)
+        self.modelo.grabacionFallida.connect(self.alFallar)
+        self.modelo.grabado.connect(self.alGrabar)
+        self.mostrarEstado(0)
+
+    def mostrarEstado(self, pendientes):
+        self.statusBar().showMessage(f"{self.modelo.cargados:,} libros leídos   "
+                                     f"{pendientes} filas con cambios sin grabar")
+
+    def _grabando(self) -> bool:
+        if self.modelo.grabando:
+            self.statusBar().showMessage("Espere a que termine de grabar", 3000)
+        return self.modelo.grabando
+
+    def agregarFila(self):
+        if self._grabando():
+            return
+        indice = self.modelo.agregar_fila()
+        self.tabla.scrollToTop()
+        self.tabla.setCurrentIndex(indice)
+        self.tabla.edit(indice)
+
+    def validar(self):
+        if self._grabando():
+            return
+        _, _, errores = self.modelo.validar()
+        if errores:
+            QMessageBox.warning(self, "Advertencia", f"Hay {errores} filas con errores (en rojo).")
+        else:
+            self.statusBar().showMessage("Todas las filas pendientes son válidas", 3000)
+
+    def grabar(self):
+        if self._grabando():
+            return
+        if not self.modelo.grabar():
+            if self.modelo.pendientes:
+                QMessageBox.warning(self, "Advertencia", "Corrija las filas en rojo antes de grabar.")
+            else:
+                self.statusBar().showMessage("No hay cambios para grabar", 3000)
+
+    def alGrabar(self, grabados):
+        self.statusBar().showMessage(f"Se grabaron {grabados} libros", 5000)
+
+    def descartar(self):
+        if self._grabando():
+            return
+        if self.modelo.pendientes and QMessageBox.question(
+                self, "Confirmacion", "Desea descartar los cambios sin grabar") != QMessageBox.Yes:
+            return
+        self.modelo.descartar()
+
+    def recargar(self):
+        if self._grabando():
+            return
+        if self.modelo.pendientes and QMessageBox.question(
+                self, "Confirmacion", "Se perderán los cambios sin grabar. Desea recargar") != QMessageBox.Yes:
+            return
+        self.modelo.recargar()
+
+    def alFallar(self, mensaje):
+        QMessageBox.critical(self, "ERROR", f"Error de base de datos: {mensaje}")
+
+    def closeEvent(self, event):
+        if self.modelo.pendientes and QMessageBox.question(
+                self, "Confirmacion", "Hay cambios sin grabar. Desea cerrar de todos modos") != QMessageBox.Yes:
+            event.ignore()
+            return
+        self.ejecutor.cancelar_todo()
+        self.ejecutor.esperar(5000)
+        super().closeEvent(event)
@@ -3,10 +3,17 @@
 #                           Jemina Victoria Suárez Veintimilla
 #                           Rosa Angelica Bustamante Moreira
 
-from PySide6.QtGui import QIntValidator, QDoubleValidator
-from PySide6.QtWidgets import QMainWindow, QMessageBox
-from src.dominio.libro import Libro
-from src.datos.libroDao import LibroDao
+import os
+
+from PySide6.QtCore import QRegularExpression, Qt, QTimer
+from PySide6.QtGui import (QIntValidator, QDoubleValidator, QKeySequence, QRegularExpressionValidator,
+                           QShortcut)
+from PySide6.QtWidgets import QApplication, QMainWindow, QMessageBox, QProgressBar, QPushButton
+from src.dominio.validacionLibros import PATRON_ISBN, VALIDADOR, ErrorValidacion
+from src.datos.cacheLibros import CacheTTL
+from src.datos.conexiones import Conexiones
+from src.datos.libroDao import ConflictoVersion, LibroDao
+from src.servicio.trabajadores import EjecutorDao
 from src.ui.vtnLibro import Ui_vtnLibro
 
 class LibroServicio(QMainWindow):
@@ -23,84 +30,129 @@ class LibroServicio(QMainWindow):
         self.ui.txtCodigo.setValidator(QIntValidator())
         self.ui.txtPrecio.setValidator(QDoubleValidator())
         self.ui.txtCantidad.setValidator(QIntValidator())
-        self.ui.txtIsbn.setValidator(QIntValidator())
-
+        # ISBN-10 (puede terminar en X) o ISBN-13, como los acepta validacionLibros
+        self.ui.txtIsbn.setValidator(QRegularExpressionValidator(QRegularExpression(PATRON_ISBN), self))
+        # Caché de búsquedas: los cambios hechos aquí la invalidan al instante y los de
+        # otras cajas se ven como máximo a los 30 segundos.
+        LibroDao.usar_cache(CacheTTL(capacidad=5000, ttl=30, ttl_ausentes=5))
+        # Con LIBRERIA_SNAPSHOT las búsquedas responden desde la copia local al arrancar
+        # y si se pierde la conexión
+        self.snapshot = None
+        ruta_snapshot = os.environ.get('LIBRERIA_SNAPSHOT')
+        if ruta_snapshot and os.path.exists(ruta_snapshot):
+            from src.datos.snapshotLibros import SnapshotLibros
+            try:
+                self.snapshot = SnapshotLibros.abrir(ruta_snapshot)
+                LibroDao.usar_snapshot(self.snapshot)
+            except (OSError, ValueError) as e:
+                print(f"No se pudo abrir el snapshot {ruta_snapshot}: {e}")
+        # Las llamadas a la base de datos van a hilos de trabajo para no congelar la ventana
+        self.ejecutor = EjecutorDao(self)
+        self.ejecutor.ocupado.connect(self.mostrarOcupado)
+        self.indicador = QProgressBar()
+        self.indicador.setRange(0, 0)  # Sin rango: barra animada de "trabajando"
+        self.indicador.setMaximumWidth(120)
+        self.indicador.setVisible(False)
+        self.ui.statusbar.addPermanentWidget(self.indicador)
+        # Esc cancela las operaciones pendientes
+        QShortcut(QKeySequence(Qt.Key_Escape), self, activated=self.cancelar)
+        # Modo grilla (Ctrl+G) para cargar o corregir muchos libros y grabarlos juntos
+        self.grilla = None
+        self.btnGrilla = QPushButton("Modo grilla")
+        self.btnGrilla.clicked.connect(self.abrirGrilla)
+        self.ui.statusbar.addPermanentWidget(self.btnGrilla)
+        QShortcut(QKeySequence("Ctrl+G"), self, activated=self.abrirGrilla)
+        # Modo escáner (F2): cada código leído se busca sin esperar al anterior
+        self.escaner = None
+        self.btnEscaner = QPushButton("Modo escáner")
+        self.btnEscaner.setCheckable(True)
+        self.btnEscaner.toggled.connect(self.alternarEscaner)
+        self.ui.statusbar.addPermanentWidget(self.btnEscaner)
+        QShortcut(QKeySequence(Qt.Key_F2), self, activated=self.btnEscaner.toggle)
+        # Si el lector no envía Enter, el código se toma cuando deja de escribir
+        self.esperaEscaneo = QTimer(self)
+        self.esperaEscaneo.setSingleShot(True)
+        self.esperaEscaneo.setInterval(40)
+        self.esperaEscaneo.timeout.connect(self.escanearCodigo)
+        # Último libro buscado: al actualizarlo solo se graban los campos que se cambiaron
+        self.libroBuscado = None
+        # La conexión se abre en un hilo de trabajo cuando la ventana ya está en pantalla
+        QTimer.singleShot(0, self.conectar)
 
-    def nuevo(self):
-        if (self.ui.txtCodigo.text() == "" or self.ui.txtNombre.text() == ""
-                or self.ui.txtPrecio.text() == "" or self.ui.txtCantidad.text() == ""
-                or self.ui.txtAutor.text() == "" or len(self.ui.txtIsbn.text()) < 10
-                or self.ui.txtIsbn == "" or self.ui.txtEdicion.text() == ""):
-            QMessageBox.warning(self, 'Advertencia',
-                            "COMPLETAR DATOS")  # MENSAJE DE ADVERTENCIA POR CONSOLA self significa se levante al frente de ventana principal
-        # QMessageBox.critical(self,'Titulo Ventana','Mensaje') #
 
-        else:
+    def leerFormulario(self):
+        # Las mismas reglas que la grilla y la importación (validacionLibros)
+        cajas = {'codigo': self.ui.txtCodigo, 'nombre': self.ui.txtNombre, 'precio': self.ui.txtPrecio,
+                 'cantidad': self.ui.txtCantidad, 'autor': self.ui.txtAutor, 'edicion': self.ui.txtEdicion,
+                 'isbn': self.ui.txtIsbn}
+        try:
+            return VALIDADOR.convertir({campo: caja.text() for campo, caja in cajas.items()})
+        except ErrorValidacion as e:
+            QMessageBox.warning(self, 'Advertencia', "COMPLETAR DATOS\n\n" + "\n".join(
+                f"{campo.capitalize()}: {mensaje}" for campo, mensaje in e.errores.items()))
+            cajas[next(iter(e.errores))].setFocus()
+            return None
 
-            precio_str = self.ui.txtPrecio.text().replace(',', '.')
-            try:
-                precio = float(precio_str)
-            except ValueError:
-                QMessageBox.critical(self, 'ERROR', "El precio debe ser un número válido (ej. 10.50).")
-                return
-            libro = Libro(codigo=self.ui.txtCodigo.text(),
-                          nombre=self.ui.txtNombre.text(),
-                          precio= precio,
-                          cantidad=self.ui.txtCantidad.text(),
-                          autor=self.ui.txtAutor.text(),
-                          edicion =self.ui.txtEdicion.text(),
-                          Isbn = self.ui.txtIsbn.text(),)
-
-            if LibroDao.insertar_libro(libro) == -1:
-                QMessageBox.critical(self, 'ERROR', "ERROR AL GRABAR")
-            else:
-                self.ui.statusbar.showMessage("Se Guardo correctamente", 3000)
-                self.limpiar()
+    def nuevo(self):
+        libro = self.leerFormulario()
+        if libro is None:
+            return
+        self.ejecutor.ejecutar(('insertar', libro.codigo), LibroDao.insertar_libro, libro,
+                               al_terminar=self.alGrabar, al_fallar=self.alFallar,
+                               escritura=True)
 
 
     def actualizar(self):
-        if (self.ui.txtCodigo.text() == "" or self.ui.txtNombre.text() == ""
-                or self.ui.txtPrecio.text() == "" or self.ui.txtCantidad.text() == ""
-                or self.ui.txtAutor.text() == "" or len(self.ui.txtIsbn.text()) < 10 or self.ui.txtIsbn.text()==""
-                or self.ui.txtEdicion.text() == ""):
-            QMessageBox.warning(self, 'Advertencia',
-                            "COMPLETAR DATOS")  # MENSAJE DE ADVERTENCIA POR CONSOLA self significa se levante al frente de ventana principal
-
+        leido = self.leerFormulario()
+        if leido is None:
+            return
+        libro = self.libroBuscado
+        if libro is not None and libro.codigo == leido.codigo:
+            # Los setters anotan qué campos cambiaron respecto de lo que se buscó
+            libro.nombre = leido.nombre
+            libro.precio = leido.precio
+            libro.cantidad = leido.cantidad
+            libro.autor = leido.autor
+            libro.edicion = leido.edicion
+            libro.Isbn = leido.Isbn
         else:
+            libro = leido
 
-            precio_str = self.ui.txtPrecio.text().replace(',', '.')
-            try:
-                precio = float(precio_str)
-            except ValueError:
-                QMessageBox.critical(self, 'ERROR', "El precio debe ser un número válido (ej. 10.50).")
-                return
-
-            libro = Libro(codigo=self.ui.txtCodigo.text(),
-                          nombre=self.ui.txtNombre.text(),
-                          precio=precio,
-                          cantidad=self.ui.txtCantidad.text(),
-                          autor=self.ui.txtAutor.text(),
-                          edicion =self.ui.txtEdicion.text(),
-                          Isbn = self.ui.txtIsbn.text(),
-                          )
-
-            if LibroDao.actualizar_libro(libro) == -1:
-                QMessageBox.critical(self, 'ERROR', "ERROR AL GRABAR")
-            else:
-                self.ui.statusbar.showMessage("Se Guardo correctamente", 3000)
-                self.limpiar()
+        self.ejecutor.ejecutar(('actualizar', libro.codigo), LibroDao.actualizar_libro, libro,
+                               al_terminar=self.alGrabar, al_fallar=self.alFallar,
+                               escritura=True)
+
+    def alGrabar(self, retorno):
+        if isinstance(retorno, ConflictoVersion):
+            self.alConflicto(retorno)
+        elif retorno == -1:
+            QMessageBox.critical(self, 'ERROR', "ERROR AL GRABAR")
+        else:
+            self.ui.statusbar.showMessage("Se Guardo correctamente", 3000)
+            self.limpiar()
 
     def borrar(self):
 
         if QMessageBox.question(self, "Confirmacion", "Desea borrar el registro") == QMessageBox.Yes:
-            retorno = LibroDao.eliminar_libro(self.ui.txtCodigo.text())
-            if retorno != -1:
-                self.ui.statusbar.showMessage("Registro Eliminado con éxito", 3000)
-                self.limpiar()
-            else:
-                QMessageBox.critical(self, "Error", "No se pudo Eliminar")
+            codigo = self.ui.txtCodigo.text()
+            # Con la versión buscada, no se borra un libro que otro cajero acaba de cambiar
+            libro = self.libroBuscado
+            version = libro.version if libro is not None and libro.codigo == codigo else None
+            self.ejecutor.ejecutar(('eliminar', codigo), LibroDao.eliminar_libro, codigo, version,
+                                   al_terminar=self.alBorrar, al_fallar=self.alFallar,
+                                   escritura=True)
+
+    def alBorrar(self, retorno):
+        if isinstance(retorno, ConflictoVersion):
+            self.alConflicto(retorno)
+        elif retorno != -1:
+            self.ui.statusbar.showMessage("Registro Eliminado con éxito", 3000)
+            self.limpiar()
+        else:
+            QMessageBox.critical(self, "Error", "No se pudo Eliminar")
 
     def limpiar(self):
+        self.libroBuscado = None
         self.ui.txtCodigo.setText("")
         self.ui.txtNombre.setText("")
         self.ui.txtPrecio.setText("")
@@ -115,17 +167,143 @@ class LibroServicio(QMainWindow):
             QMessageBox.warning(self,'Advertencia',"COMPLETAR DATOS" ) #MENSAJE DE ADVERTENCIA POR CONSOLA self significa se levante al frente de ventana principal
             #QMessageBox.critical(self,'Titulo Ventana','Mensaje') #
         else:
-            libros = LibroDao.seleccionar_libro(self.ui.txtCodigo.text())
-            if libros :
-                self.ui.txtNombre.setText(libros.nombre)
-                self.ui.txtPrecio.setText(str(libros.precio))
-                self.ui.txtCantidad.setText(str(libros.cantidad))
-                self.ui.txtAutor.setText(libros.autor)
-                self.ui.txtEdicion.setText(libros.edicion)
-                self.ui.txtIsbn.setText(str(libros.Isbn))
-
-            else:
-                QMessageBox.warning(self,"Advertencia","No se encontro el Libro que Buscaba")
+            codigo = self.ui.txtCodigo.text()
+            # Si ya se está buscando este código, no se repite la consulta
+            self.ejecutor.ejecutar(('buscar', codigo), LibroDao.seleccionar_libro, codigo,
+                                   al_terminar=lambda libros: self.alBuscar(codigo, libros),
+                                   al_fallar=self.alFallar)
+
+    def alBuscar(self, codigo, libros):
+        if self.ui.txtCodigo.text() != codigo:
+            return  # El usuario ya escribió otro código mientras se buscaba
+        if libros :
+            self.libroBuscado = libros
+            self.ui.txtNombre.setText(libros.nombre)
+            self.ui.txtPrecio.setText(str(libros.precio))
+            self.ui.txtCantidad.setText(str(libros.cantidad))
+            self.ui.txtAutor.setText(libros.autor)
+            self.ui.txtEdicion.setText(libros.edicion)
+            self.ui.txtIsbn.setText(str(libros.Isbn))
+
+        else:
+            QMessageBox.warning(self,"Advertencia","No se encontro el Libro que Buscaba")
+
+    def alConflicto(self, conflicto):
+        # Otro cajero grabó el libro mientras se editaba: se muestran sus datos y la
+        # versión nueva, y el usuario decide si vuelve a aplicar sus cambios
+        QMessageBox.warning(self, "Advertencia",
+                            "Otro usuario modificó este libro mientras lo editaba. "
+                            "Se cargaron sus datos actuales; revise y vuelva a grabar.")
+        self.alBuscar(conflicto.codigo, conflicto.actual)
+
+    def abrirGrilla(self):
+        if self.grilla is None:
+            # Se importa al usarla, para no demorar el arranque
+            from src.servicio.grillaLibros import VentanaGrilla
+            self.grilla = VentanaGrilla(self)
+        self.grilla.show()
+        self.grilla.raise_()
+        self.grilla.activateWindow()
+
+    def alternarEscaner(self, activo):
+        if activo:
+            self.limpiar()
+            from src.servicio.escaneo import ColaEscaneos
+            self.escaner = ColaEscaneos(self.lanzarEscaneo, self.mostrarEscaneo)
+            self.ui.txtCodigo.returnPressed.connect(self.escanearCodigo)
+            self.ui.txtCodigo.textEdited.connect(self.esperaEscaneo.start)
+            self.ui.txtCodigo.setFocus()
+            self.ui.statusbar.showMessage("Modo escáner: lea los códigos de barras", 3000)
+        elif self.escaner is not None:
+            self.esperaEscaneo.stop()
+            self.ui.txtCodigo.returnPressed.disconnect(self.escanearCodigo)
+            self.ui.txtCodigo.textEdited.disconnect(self.esperaEscaneo.start)
+            self.escaner.vaciar()
+            histograma = self.escaner.histograma
+            if histograma.cantidad:
+                self.ui.statusbar.showMessage(
+                    f"Modo escáner: {histograma.cantidad} lecturas, p50 {histograma.percentil(0.5):.1f} ms, "
+                    f"p99 {histograma.percentil(0.99):.1f} ms", 5000)
+            self.escaner = None
+
+    def escanearCodigo(self):
+        self.esperaEscaneo.stop()
+        codigo = self.ui.txtCodigo.text().strip()
+        if self.escaner is None or len(codigo) < 10:
+            return
+        # Se libera el campo para el siguiente código antes de que llegue la respuesta
+        self.ui.txtCodigo.clear()
+        self.escaner.escanear(codigo)
+
+    def lanzarEscaneo(self, codigo, al_terminar, al_fallar):
+        # Cada código va a un hilo de trabajo (varios a la vez); el repetido se une al que está en curso
+        self.ejecutor.ejecutar(('buscar', codigo), LibroDao.seleccionar_libro, codigo,
+                               al_terminar=al_terminar, al_fallar=al_fallar)
+
+    def mostrarEscaneo(self, codigo, libro, error, milisegundos):
+        # Llega en el orden de lectura; sin ventanas emergentes para no frenar al cajero
+        if error is not None:
+            QApplication.beep()
+            self.ui.statusbar.showMessage(f"{codigo}: error de base de datos ({error})", 5000)
+        elif libro is None:
+            QApplication.beep()
+            self.ui.statusbar.showMessage(f"{codigo}: no se encontró el libro", 5000)
+        else:
+            self.libroBuscado = libro
+            self.ui.txtNombre.setText(libro.nombre)
+            self.ui.txtPrecio.setText(str(libro.precio))
+            self.ui.txtCantidad.setText(str(libro.cantidad))
+            self.ui.txtAutor.setText(libro.autor)
+            self.ui.txtEdicion.setText(libro.edicion)
+            self.ui.txtIsbn.setText(str(libro.Isbn))
+            self.ui.statusbar.showMessage(f"{codigo}: {libro.nombre} ({milisegundos:.0f} ms)", 5000)
+        histograma = self.escaner.histograma
+        self.btnEscaner.setToolTip(f"p50 {histograma.percentil(0.5):.1f} ms, p99 {histograma.percentil(0.99):.1f} ms\n"
+                                   f"{histograma.texto(20)}")
+
+    def conectar(self):
+        if Conexiones.conectado() or self.ejecutor.en_curso(('conectar',)):
+            return
+        self.ui.statusbar.showMessage("Conectando a la base de datos...")
+        self.ejecutor.ejecutar(('conectar',), Conexiones.obtenerPool,
+                               al_terminar=self.alConectar, al_fallar=self.alFallarConexion)
+
+    def alConectar(self, pool):
+        self.ui.statusbar.showMessage("Conectado a la base de datos", 3000)
+
+    def alFallarConexion(self, mensaje):
+        # Sin cerrar la aplicación: cada operación vuelve a intentar conectarse
+        aviso = "Sin conexión a la base de datos; se reintentará en la próxima operación"
+        if self.snapshot is not None:
+            aviso += " (las búsquedas usan la copia local)"
+        self.ui.statusbar.showMessage(aviso)
+        print(mensaje)
+
+    def alFallar(self, mensaje):
+        QMessageBox.critical(self, "ERROR", f"Error de base de datos: {mensaje}")
+
+    def mostrarOcupado(self, ocupado):
+        # Indicador de actividad mientras hay consultas pendientes
+        self.indicador.setVisible(ocupado)
+        if ocupado:
+            QApplication.setOverrideCursor(Qt.BusyCursor)
+        else:
+            QApplication.restoreOverrideCursor()
+
+    def cancelar(self):
+        cantidad = self.ejecutor.cancelar_todo()
+        if self.escaner is not None:
+            # Las búsquedas canceladas ya no responden: no se espera por ellas para mostrar las siguientes
+            self.escaner.vaciar()
+        if cantidad:
+            self.ui.statusbar.showMessage(f"Se cancelaron {cantidad} operaciones pendientes", 3000)
+
+    def closeEvent(self, event):
+        self.btnEscaner.setChecked(False)
+        # Se descartan las operaciones pendientes y se espera a las que ya están en curso
+        self.ejecutor.cancelar_todo()
+        self.ejecutor.esperar(5000)
+        super().closeEvent(event)
 
 
 
@@ -0,0 +1,234 @@
+# Integrantes del Grupo#1 : Joselyne Paulette Játiva Vera
+#                           Joselin Mariuxi Rodriguez Saldaña
+#                           Jemina Victoria Suárez Veintimilla
+#                           Rosa Angelica Bustamante Moreira
+
+"""
+Reporte de inventario: valor total (precio * cantidad), valor por autor y por edición,
+percentiles de precio y libros con poco stock.
+
+Se puede calcular de tres formas (motores):
+    numpy   recorre el catálogo en lotes por columnas (LoteLibros) y calcula cada lote
+            con operaciones vectorizadas de NumPy. Es el predeterminado si NumPy está
+            instalado.
+    python  recorre los mismos lotes, fila por fila en Python puro.
+    sql     deja que el servidor agregue (group by) y solo trae los resultados.
+
+Los tres dan el mismo reporte. Los motores que recorren el catálogo guardan un lote a
+la vez, más los precios de todos los libros para los percentiles (8 bytes por libro con
+NumPy; unas cuatro veces más en Python puro).
+
+Uso:
+    python -m src.servicio.reportes --umbral 5
+    python -m src.servicio.reportes --motor sql --json inventario.json
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from src.datos.libroDao import LibroDao
+
+MOTORES = ('numpy', 'python', 'sql')
+PERCENTILES = (0.5, 0.9, 0.99)
+_TAMANO_LOTE = 50_000  # Filas por lote al recorrer el catálogo
+
+
+def _importar_numpy():
+    try:
+        import numpy as np
+    except ImportError:
+        raise ImportError("El motor 'numpy' necesita NumPy (pip install numpy); use --motor python o sql.") from None
+    return np
+
+
+def motor_predeterminado() -> str:
+    """'numpy' si NumPy está instalado; si no, 'python'."""
+    try:
+        _importar_numpy()
+    except ImportError:
+        return 'python'
+    return 'numpy'
+
+
+def _posicion(cantidad: int, fraccion: float) -> int:
+    """Posición (desde 0) del percentil en una lista ordenada; la misma regla en los tres motores."""
+    return min(cantidad - 1, int(cantidad * fraccion))
+
+
+class ReporteInventario:
+    """
+    Resultado del reporte. Los totales por grupo son tuplas (libros, unidades, valor)
+    y bajo_stock es una lista de (codigo, nombre, cantidad) ordenada por cantidad y código.
+    """
+
+    def __init__(self, umbral: int, motor: str):
+        self.umbral = umbral
+        self.motor = motor
+        self.libros = 0
+        self.unidades = 0
+        self.valor = 0.0
+        self.por_autor = {}  # autor -> (libros, unidades, valor)
+        self.por_edicion = {}  # edicion -> (libros, unidades, valor)
+        self.percentiles = {}  # fracción -> precio
+        self.bajo_stock = []
+        self.segundos = 0.0
+
+    def a_dict(self) -> dict:
+        """El reporte como diccionario serializable en JSON."""
+        grupos = lambda totales: {clave: {'libros': libros, 'unidades': unidades, 'valor': round(valor, 2)}
+                                  for clave, (libros, unidades, valor) in totales.items()}
+        return {'umbral': self.umbral, 'motor': self.motor, 'segundos': round(self.segundos, 3),
+                'libros': self.libros, 'unidades': self.unidades, 'valor': round(self.valor, 2),
+                'por_autor': grupos(self.por_autor), 'por_edicion': grupos(self.por_edicion),
+                'percentiles_precio': {str(fraccion): precio for fraccion, precio in self.percentiles.items()},
+                'bajo_stock': [{'codigo': codigo, 'nombre': nombre, 'cantidad': cantidad}
+                               for codigo, nombre, cantidad in self.bajo_stock]}
+
+    def __repr__(self):
+        return (f"ReporteInventario(libros={self.libros}, valor={self.valor:,.2f}, "
+                f"bajo_stock={len(self.bajo_stock)}, motor={self.motor!r})")
+
+
+def _reporte_python(reporte, lotes, fracciones):
+    precios = []
+    acumulados = {'autores': {}, 'ediciones': {}}
+    for lote in lotes:
+        for codigo, nombre, precio, cantidad, autor, edicion, _ in lote.filas():
+            valor = precio * cantidad
+            reporte.libros += 1
+            reporte.unidades += cantidad
+            reporte.valor += valor
+            for grupos, clave in ((acumulados['autores'], autor), (acumulados['ediciones'], edicion)):
+                totales = grupos.get(clave)
+                if totales is None:
+                    grupos[clave] = [1, cantidad, valor]
+                else:
+                    totales[0] += 1
+                    totales[1] += cantidad
+                    totales[2] += valor
+            if cantidad <= reporte.umbral:
+                reporte.bajo_stock.append((codigo, nombre, cantidad))
+        precios.extend(lote.precios)
+    reporte.por_autor = {clave: tuple(totales) for clave, totales in acumulados['autores'].items()}
+    reporte.por_edicion = {clave: tuple(totales) for clave, totales in acumulados['ediciones'].items()}
+    if precios:
+        precios.sort()
+        reporte.percentiles = {fraccion: precios[_posicion(len(precios), fraccion)] for fraccion in fracciones}
+
+
+def _reporte_numpy(reporte, lotes, fracciones):
+    np = _importar_numpy()
+    precios = []  # Copias de los precios de cada lote (el lote se libera al pasar al siguiente)
+    acumulados = {}
+    for columna in ('autores', 'ediciones'):
+        # Cada grupo recibe un número; los totales se suman por número con bincount
+        acumulados[columna] = ({}, np.zeros(0, np.int64), np.zeros(0, np.int64), np.zeros(0, np.float64))
+    for lote in lotes:
+        precios_lote, cantidades = lote.a_numpy()
+        valores = precios_lote * cantidades
+        reporte.libros += len(lote)
+        reporte.unidades += int(cantidades.sum())
+        reporte.valor += float(valores.sum())
+        for columna, (numeros, libros, unidades, valor) in list(acumulados.items()):
+            ids = np.fromiter((numeros.setdefault(clave, len(numeros)) for clave in getattr(lote, columna)),
+                              dtype=np.intp, count=len(lote))
+            grupos = len(numeros)
+            libros = np.pad(libros, (0, grupos - len(libros))) + np.bincount(ids, minlength=grupos)
+            unidades = np.pad(unidades, (0, grupos - len(unidades))) + np.bincount(ids, cantidades, grupos).astype(np.int64)
+            valor = np.pad(valor, (0, grupos - len(valor))) + np.bincount(ids, valores, grupos)
+            acumulados[columna] = (numeros, libros, unidades, valor)
+        for indice in np.flatnonzero(cantidades <= reporte.umbral).tolist():
+            reporte.bajo_stock.append((lote.codigos[indice], lote.nombres[indice], lote.cantidades[indice]))
+        precios.append(precios_lote.copy())
+        del precios_lote, cantidades  # El lote no puede liberarse mientras haya vistas de NumPy
+    for destino, columna in (('por_autor', 'autores'), ('por_edicion', 'ediciones')):
+        numeros, libros, unidades, valor = acumulados[columna]
+        setattr(reporte, destino, {clave: (int(libros[numero]), int(unidades[numero]), float(valor[numero]))
+                                   for clave, numero in numeros.items()})
+    if precios:
+        todos = np.concatenate(precios)
+        posiciones = [_posicion(len(todos), fraccion) for fraccion in fracciones]
+        todos.partition(posiciones)  # Solo ordena lo necesario para esas posiciones
+        reporte.percentiles = {fraccion: float(todos[posicion]) for fraccion, posicion in zip(fracciones, posiciones)}
+
+
+def _reporte_sql(reporte, fracciones):
+    agregados = LibroDao.agregados_inventario(reporte.umbral, fracciones)
+    libros, unidades, valor = agregados['totales']
+    reporte.libros, reporte.unidades, reporte.valor = int(libros), int(unidades), float(valor)
+    for destino, clave in (('por_autor', 'por_autor'), ('por_edicion', 'por_edicion')):
+        setattr(reporte, destino, {grupo: (int(libros), int(unidades), float(valor))
+                                   for grupo, libros, unidades, valor in agregados[clave]})
+    reporte.bajo_stock = [(codigo, nombre, int(cantidad)) for codigo, nombre, cantidad in agregados['bajo_stock']]
+    reporte.percentiles = {fraccion: float(precio) for fraccion, precio in agregados['percentiles'].items()}
+
+
+def generar_reporte(umbral: int = 5, motor: str | None = None, fracciones=PERCENTILES, lotes=None,
+                    tamano_lote: int = _TAMANO_LOTE) -> ReporteInventario:
+    """
+    Calcula el reporte de inventario.
+
+    Args:
+        umbral (int): Un libro tiene poco stock si su cantidad es menor o igual a este valor.
+        motor (str, opcional): 'numpy', 'python' o 'sql'; por defecto motor_predeterminado().
+        fracciones (tuple): Percentiles de precio que se calculan (0.5 = mediana).
+        lotes (Iterable[LoteLibros], opcional): Lotes ya leídos; por defecto se recorre la
+                                                tabla con LibroDao.recorrer_lotes. No se usa con 'sql'.
+        tamano_lote (int): Filas por lote al recorrer la tabla.
+
+    Returns:
+        ReporteInventario: El reporte, con el tiempo que tomó calcularlo.
+    """
+    motor = motor or motor_predeterminado()
+    if motor not in MOTORES:
+        raise ValueError(f"Motor de reporte no válido: {motor} (use {', '.join(MOTORES)})")
+    reporte = ReporteInventario(umbral, motor)
+    inicio = time.perf_counter()
+    if motor == 'sql':
+        _reporte_sql(reporte, fracciones)
+    else:
+        lotes = lotes if lotes is not None else LibroDao.recorrer_lotes(tamano_lote)
+        (_reporte_numpy if motor == 'numpy' else _reporte_python)(reporte, lotes, fracciones)
+        reporte.bajo_stock.sort(key=lambda alerta: (alerta[2], alerta[0]))
+    reporte.segundos = time.perf_counter() - inicio
+    return reporte
+
+
+def main(argumentos=None) -> int:
+    """Punto de entrada de la línea de comandos."""
+    parser = argparse.ArgumentParser(description="Reporte de valor del inventario y libros con poco stock.")
+    parser.add_argument('--umbral', type=int, default=5, help="Cantidad desde la que se avisa poco stock")
+    parser.add_argument('--motor', choices=MOTORES, default=None)
+    parser.add_argument('--lote', type=int, default=_TAMANO_LOTE, help="Filas por lote")
+    parser.add_argument('--json', help="Archivo donde guardar el reporte completo")
+    args = parser.parse_args(argumentos)
+
+    try:
+        reporte = generar_reporte(args.umbral, args.motor, tamano_lote=args.lote)
+    except Exception as e:
+        print(f"Error al generar el reporte: {e}")
+        return 1
+    print(f"Libros: {reporte.libros:,}   Unidades: {reporte.unidades:,}   Valor total: {reporte.valor:,.2f}")
+    for fraccion, precio in reporte.percentiles.items():
+        print(f"Precio p{fraccion * 100:g}: {precio:,.2f}")
+    print("Valor por autor (10 mayores):")
+    for autor, (libros, unidades, valor) in sorted(reporte.por_autor.items(), key=lambda g: -g[1][2])[:10]:
+        print(f"  {autor:<35} {libros:>10,} libros {valor:>18,.2f}")
+    print("Valor por edición:")
+    for edicion, (libros, unidades, valor) in sorted(reporte.por_edicion.items(), key=lambda g: -g[1][2]):
+        print(f"  {edicion:<35} {libros:>10,} libros {valor:>18,.2f}")
+    print(f"Libros con {reporte.umbral} unidades o menos: {len(reporte.bajo_stock):,}")
+    for codigo, nombre, cantidad in reporte.bajo_stock[:20]:
+        print(f"  {codigo} {nombre[:40]:<40} {cantidad:>5}")
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as archivo:
+            json.dump(reporte.a_dict(), archivo, indent=2, ensure_ascii=False)
+        print(f"Reporte guardado en {args.json}")
+    print(f"Calculado con el motor '{reporte.motor}' en {reporte.segundos:.2f} s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
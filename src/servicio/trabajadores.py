@@ -0,0 +1,177 @@
+# Integrantes del Grupo#1 : Joselyne Paulette Játiva Vera
+#                           Joselin Mariuxi Rodriguez Saldaña
+#                           Jemina Victoria Suárez Veintimilla
+#                           Rosa Angelica Bustamante Moreira
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+
+class _SenalesTarea(QObject):
+    """
+    Señales de una tarea. QRunnable no hereda de QObject, así que no puede emitir señales
+    por sí mismo. Ambas señales envían la tarea para que el receptor sepa cuál terminó.
+    """
+    terminado = Signal(object, object)
+    fallo = Signal(object, str)
+
+
+class _TareaDao(QRunnable):
+    """Ejecuta una llamada a LibroDao en un hilo del QThreadPool."""
+
+    def __init__(self, clave, funcion, args, escritura=False):
+        super().__init__()
+        self.clave = clave
+        self.escritura = escritura
+        # Se conserva la referencia para poder cancelarla con tryTake antes de que empiece
+        self.setAutoDelete(False)
+        self.senales = _SenalesTarea()
+        self.cancelada = False
+        self._funcion = funcion
+        self._args = args
+
+    def run(self):
+        if self.cancelada:
+            return
+        try:
+            resultado = self._funcion(*self._args)
+        except Exception as e:
+            self.senales.fallo.emit(self, str(e))
+            return
+        self.senales.terminado.emit(self, resultado)
+
+
+class EjecutorDao(QObject):
+    """
+    Ejecuta las llamadas a la base de datos fuera del hilo de la interfaz, para que una
+    consulta lenta o un tiempo de conexión agotado no congele la ventana.
+
+    Cada llamada se identifica con una clave, por ejemplo ('buscar', codigo). Si llega una
+    lectura con la misma clave mientras la anterior sigue en curso, no se repite la
+    consulta: las dos esperan el mismo resultado. Las escrituras (escritura=True) nunca se
+    unen, porque dos grabaciones del mismo libro pueden llevar datos distintos: cada una
+    es una llamada propia. La señal `ocupado` indica cuándo hay llamadas pendientes, para
+    mostrar un indicador de actividad.
+
+    Al cancelar, las llamadas que aún no empezaron no se ejecutan. Una lectura que ya
+    estaba en la base de datos termina, pero su resultado se descarta; una escritura que
+    ya empezó no se puede cancelar (igual se confirmará), así que sigue en curso y avisa
+    su resultado.
+    """
+
+    ocupado = Signal(bool)
+
+    def __init__(self, padre=None, max_hilos=4):
+        super().__init__(padre)
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max_hilos)
+        self._en_curso = {}  # clave -> (tarea, funciones al terminar, funciones al fallar), lecturas
+        self._escrituras = {}  # tarea -> (tarea, funciones al terminar, funciones al fallar)
+
+    def ejecutar(self, clave, funcion, *args, al_terminar=None, al_fallar=None, escritura=False) -> bool:
+        """
+        Ejecuta `funcion(*args)` en un hilo de trabajo.
+
+        Args:
+            clave: Identifica la llamada para unir las lecturas repetidas.
+            funcion (callable): Función bloqueante, normalmente un método de LibroDao.
+            al_terminar (callable, opcional): Recibe el resultado en el hilo de la interfaz.
+            al_fallar (callable, opcional): Recibe el mensaje si la función lanza una excepción.
+            escritura (bool): True si la llamada modifica la base de datos: siempre se lanza
+                              una llamada nueva, aunque haya otra con la misma clave.
+
+        Returns:
+            bool: True si se lanzó una llamada nueva, False si se unió a una en curso.
+        """
+        if not escritura and clave in self._en_curso:
+            _, terminar, fallar = self._en_curso[clave]
+            if al_terminar is not None:
+                terminar.append(al_terminar)
+            if al_fallar is not None:
+                fallar.append(al_fallar)
+            return False
+
+        tarea = _TareaDao(clave, funcion, args, escritura)
+        # Los receptores son slots de este objeto, que vive en el hilo de la interfaz:
+        # Qt encola la llamada y la ejecuta allí aunque la señal se emita en otro hilo.
+        tarea.senales.terminado.connect(self._al_terminar_tarea)
+        tarea.senales.fallo.connect(self._al_fallar_tarea)
+        entrada = (tarea,
+                   [al_terminar] if al_terminar is not None else [],
+                   [al_fallar] if al_fallar is not None else [])
+        libre = not self._en_curso and not self._escrituras
+        if escritura:
+            self._escrituras[tarea] = entrada
+        else:
+            self._en_curso[clave] = entrada
+        if libre:
+            self.ocupado.emit(True)
+        self._pool.start(tarea)
+        return True
+
+    @Slot(object, object)
+    def _al_terminar_tarea(self, tarea, resultado):
+        self._finalizar(tarea, resultado, None)
+
+    @Slot(object, str)
+    def _al_fallar_tarea(self, tarea, mensaje):
+        self._finalizar(tarea, None, mensaje)
+
+    def _finalizar(self, tarea, resultado, error):
+        """Entrega el resultado de una tarea a quienes lo esperaban (en el hilo de la interfaz)."""
+        if tarea.escritura:
+            entrada = self._escrituras.pop(tarea, None)
+        else:
+            entrada = self._en_curso.get(tarea.clave)
+            if entrada is not None and entrada[0] is tarea:
+                del self._en_curso[tarea.clave]
+            else:
+                entrada = None
+        if entrada is None:
+            return  # La tarea fue cancelada
+        _, terminar, fallar = entrada
+        if not self._en_curso and not self._escrituras:
+            self.ocupado.emit(False)
+        if error is None:
+            for funcion in terminar:
+                funcion(resultado)
+        else:
+            for funcion in fallar:
+                funcion(error)
+
+    def en_curso(self, clave) -> bool:
+        """Indica si hay una llamada pendiente con esa clave."""
+        return clave in self._en_curso or any(tarea.clave == clave for tarea in self._escrituras)
+
+    def cancelar(self, clave) -> int:
+        """
+        Cancela las llamadas con esa clave: la lectura pendiente y las escrituras que
+        todavía no empezaron.
+
+        Returns:
+            int: Cuántas llamadas se cancelaron (0 si no había ninguna o si las escrituras
+                 con esa clave ya estaban en la base de datos).
+        """
+        canceladas = 0
+        entrada = self._en_curso.pop(clave, None)
+        if entrada is not None:
+            entrada[0].cancelada = True
+            self._pool.tryTake(entrada[0])
+            canceladas += 1
+        for tarea in [tarea for tarea in self._escrituras if tarea.clave == clave]:
+            # Solo se cancela si se saca de la cola antes de que un hilo la tome
+            if self._pool.tryTake(tarea):
+                del self._escrituras[tarea]
+                canceladas += 1
+        if canceladas and not self._en_curso and not self._escrituras:
+            self.ocupado.emit(False)
+        return canceladas
+
+    def cancelar_todo(self) -> int:
+        """Cancela todas las llamadas que se pueden cancelar y retorna cuántas eran."""
+        claves = set(self._en_curso)
+        claves.update(tarea.clave for tarea in self._escrituras)
+        return sum(self.cancelar(clave) for clave in claves)
+
+    def esperar(self, milisegundos=-1) -> bool:
+        """Espera a que terminen los hilos de trabajo (por ejemplo, al cerrar la ventana)."""
+        return self._pool.waitForDone(milisegundos)
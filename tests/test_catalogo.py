@@ -0,0 +1,37 @@
+import json
+
+import pytest
+
+from src.datos.backends import BackendSqlite
+from src.datos.conexiones import Conexiones
+from src.datos.libroDao import LibroDao
+from src.servicio import catalogo
+
+
+@pytest.fixture
+def base(tmp_path):
+    Conexiones.configurar(backend=BackendSqlite(str(tmp_path / 'libreria.db')))
+    yield
+    Conexiones.cerrar()
+
+
+def _fila(codigo):
+    return {'codigo': codigo, 'nombre': f'Libro {codigo}', 'precio': '10.5', 'cantidad': '3',
+            'autor': 'Autor', 'edicion': '1ra', 'isbn': '0306406152'}
+
+
+def test_importar_jsonl_rechaza_lineas_mal_formadas(base, tmp_path):
+    ruta = tmp_path / 'libros.jsonl'
+    ruta.write_text('\n'.join([json.dumps(_fila('0000000001')), '{"codigo": ', '[1, 2]',
+                               json.dumps(_fila('0000000002'))]) + '\n', encoding='utf-8')
+    ruta_rechazos = tmp_path / 'rechazadas.jsonl'
+
+    resultado, rechazadas = catalogo.importar(str(ruta), rechazos=str(ruta_rechazos))
+
+    assert resultado.procesados == 2
+    assert LibroDao.seleccionar_libro('0000000001') is not None
+    assert LibroDao.seleccionar_libro('0000000002') is not None
+    assert rechazadas.fallidos == 2
+    assert [linea for linea, _, _ in rechazadas.errores] == [2, 3]
+    escritas = [json.loads(linea) for linea in ruta_rechazos.read_text(encoding='utf-8').splitlines()]
+    assert [(fila['linea'], fila['texto']) for fila in escritas] == [(2, '{"codigo": '), (3, '[1, 2]')]
@@ -0,0 +1,37 @@
+import os
+
+from src.datos.snapshotLibros import SnapshotLibros
+
+
+def _filas(cantidad, edicion='1ra'):
+    return [(f'{numero:010d}', f'Libro {numero}', 10.5, numero, f'Autor {numero}', edicion, '0306406152')
+            for numero in range(cantidad)]
+
+
+def test_aplicar_repetido_no_hace_crecer_el_archivo(tmp_path):
+    ruta = str(tmp_path / 'libros.snap')
+    snapshot = SnapshotLibros.construir(ruta, _filas(2000))
+    inicial = os.path.getsize(ruta)
+
+    for vuelta in range(20):
+        cambios = {fila[0]: fila for fila in _filas(1000, edicion=f'edición {vuelta}')}
+        snapshot = snapshot.aplicar(cambios)
+        assert os.path.getsize(ruta) < 2 * inicial
+
+    assert len(snapshot) == 2000
+    assert snapshot.fila('0000000999')[5] == 'edición 19'
+    assert snapshot.fila('0000001999') == _filas(2000)[-1]
+    snapshot.cerrar()
+
+
+def test_aplicar_quita_y_agrega_libros(tmp_path):
+    ruta = str(tmp_path / 'libros.snap')
+    snapshot = SnapshotLibros.construir(ruta, _filas(10))
+    nueva = ('0000000100', 'Nuevo', 1.0, 1, 'Autor', '1ra', '0306406152')
+    snapshot = snapshot.aplicar({'0000000003': None, nueva[0]: nueva})
+
+    assert len(snapshot) == 10
+    assert '0000000003' not in snapshot
+    assert snapshot.fila(nueva[0]) == nueva
+    assert list(snapshot.filas())[:3] == _filas(3)
+    snapshot.cerrar()